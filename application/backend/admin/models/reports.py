@@ -1,7 +1,7 @@
 """
 Report model representing reports submited to admin.
 """
-from sqlalchemy import Column, Integer, ForeignKey, Text, Enum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Text, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from search.database import Base
 from datetime import datetime
@@ -19,8 +19,15 @@ class Reports(Base):
     __tablename__ ="reports"
 
     report_id = Column(Integer, primary_key=True, index=True)
-    reporter_id = Column(Integer, ForeignKey("users.user_id"))
+    reporter_id = Column(Integer, ForeignKey("users.user_id"), index=True)
     reported_user_id = Column(Integer, ForeignKey("users.user_id"))
     reason = Column(Text, nullable =True)
     status = Column(Enum("submitted", "reviewing", "closed"), default="submitted")
     created_at = Column(DateTime, default = datetime.utcnow)
+
+    # Reports about a user (optionally by status) are read by the moderation
+    # pages and the per-user summary; the leading column also serves plain
+    # reported_user_id lookups
+    __table_args__ = (
+        Index('idx_reports_reported_status', 'reported_user_id', 'status'),
+    )
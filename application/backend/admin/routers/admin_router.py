@@ -1,15 +1,15 @@
-from admin.schemas.report_schema import ReportCreate, ReportResponse
+from admin.schemas.report_schema import ReportCreate, ReportResponse, ReportSummary
 from admin.schemas.course_schema import CourseCreate, CourseResponse
 from admin.schemas.course_request_schema import CourseRequestCreate, CourseRequestResponse, CourseUpdate
 from admin.schemas.tutor_schema import TutorProfileResponse
 from admin.models.tutor_application import TutorApplication
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 from search.database import get_db
 from auth.services.auth_service import get_user
 from admin.schemas.tutor_course_schema import TutorCourseRequestCreate, TutorCourseRequestResponse
 from admin.schemas.tutor_application_schema import TutorApplicationCreate, TutorApplicationResponse, TutorApplicationUpdateStatus
-from admin.schemas.user_schema import DropUserRequest, DropUserResponse
+from admin.schemas.user_schema import DropUserRequest, DropUserResponse, DropUsersRequest, DropUsersResponse
 from admin.services.admin_service import (
     create_tutor_course_request,
     get_all_tutor_course_requests,
@@ -25,14 +25,29 @@ from admin.services.admin_service import (
     update_report_status,
     get_all_reports,
     get_user_id_by_name,
+    resolve_users_by_name,
+    get_report_summary,
     create_report,
     get_user_reports,
+    get_all_tutor_applications,
+    get_all_courses as list_courses,
     drop_user, 
-    create_course
+    drop_users,
+    create_course,
+    get_registered_students
+)
+from admin.services.listing import listing_params, page_items
+from admin.services.catalog_import import CatalogImportError, import_catalog, read_catalog_rows
+from admin.schemas.bulk_schema import BulkStatusUpdate, BulkStatusResponse
+from admin.services.bulk_service import (
+    bulk_update_application_status,
+    bulk_update_tutor_course_request_status,
+    bulk_update_course_request_status
 )
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+import io
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -45,10 +60,11 @@ def submit_application(data: TutorApplicationCreate, db: Session = Depends(get_d
     return create_application(db, data)
 
 # gets all tutor applications for admin view
+# listing params (status, sort, order, limit, cursor) are shared by the admin list endpoints
 @router.get("/all-tutor-applications")
-def get_all_tutor_applications(db: Session = Depends(get_db)):
-    apps = db.query(TutorApplication).order_by(TutorApplication.created_at.desc()).all()
-    return {"items": [TutorApplicationResponse.from_orm(app) for app in apps]}
+def get_all_tutor_applications_endpoint(listing: dict = Depends(listing_params), db: Session = Depends(get_db)):
+    page = get_all_tutor_applications(db, **listing)
+    return {"items": page.items, "next_cursor": page.next_cursor}
 
 #updates status of tutor_application entry(if approved, adds tutor_profile entry)
 @router.patch("/tutor-applications/{application_id}/status", response_model=TutorApplicationResponse)
@@ -62,13 +78,18 @@ def update_status(application_id: int, body: TutorApplicationUpdateStatus, db: S
     
     return updated
 
+# approve or reject many tutor applications at once, with a result per application
+@router.post("/tutor-applications/bulk-status", response_model=BulkStatusResponse)
+def bulk_update_application_status_endpoint(body: BulkStatusUpdate, db: Session = Depends(get_db)):
+    return bulk_update_application_status(db, body.ids, body.status)
+
 #-------------------------------------------------------------------
 # ADMIN: Course Coverage Requests
 
 # for admin to see all course_coverage_requests
 @router.get("/all-coverage-requests", response_model=list[CourseRequestResponse])
-def list_course_requests(db: Session = Depends(get_db)):
-    return get_all_course_requests(db)
+def list_course_requests(response: Response, listing: dict = Depends(listing_params), db: Session = Depends(get_db)):
+    return page_items(response, get_all_course_requests(db, **listing))
 
 #submit a course_coverage_request and add entry to table
 @router.post("/submit-coverage-request")
@@ -81,6 +102,11 @@ def submit_create_course_request(data: CourseRequestCreate, db: Session = Depend
 def update_status(request_id: int, data: CourseUpdate, db: Session = Depends(get_db)):
     return update_course_request_status(db, request_id, data.status)
 
+# approve or reject many coverage requests at once (approved courses are added to the catalog)
+@router.post("/coverage-requests/bulk-status", response_model=BulkStatusResponse)
+def bulk_update_course_request_status_endpoint(body: BulkStatusUpdate, db: Session = Depends(get_db)):
+    return bulk_update_course_request_status(db, body.ids, body.status)
+
 
 
 @router.get("/debug/courses")
@@ -93,18 +119,12 @@ async def list_all_courses(db: Session = Depends(get_db)):
         return {"error": str(e)}
 
 @router.get("/allcourses")
-async def get_all_courses(db: Session = Depends(get_db)):
-    """Get all courses for the course catalog"""
-    from search.models.course import Course
+def get_all_courses(response: Response, listing: dict = Depends(listing_params), db: Session = Depends(get_db)):
+    """Get all courses for the course catalog (status: active or inactive)"""
     try:
-        courses = db.query(Course).all()
-        return [{
-            "course_id": c.course_id,
-            "department_code": c.department_code,
-            "course_number": c.course_number,
-            "title": c.title,
-            "is_active": c.is_active if hasattr(c, 'is_active') else True
-        } for c in courses]
+        return page_items(response, list_courses(db, **listing))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch courses: {str(e)}")
     
@@ -123,12 +143,39 @@ def add_course_endpoint(
     return create_course(db, department_code, course_number, title)
 
 
+# replace the course catalog from a CSV (department_code, course_number, title)
+@router.post("/import-catalog")
+def import_catalog_endpoint(
+    file: UploadFile = File(...),
+    deactivate_missing: bool = Query(True, description="Deactivate active courses not in the file"),
+    dry_run: bool = Query(False, description="Report what would change without saving"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import the course catalog. Rows are upserted in batches inside one
+    transaction; invalid rows are skipped and reported (and then nothing is
+    deactivated).
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_catalog(
+            db,
+            read_catalog_rows(stream),
+            deactivate_missing=deactivate_missing,
+            dry_run=dry_run,
+        )
+    except (CatalogImportError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        stream.detach()
+
+
 #----------------------------------------------------------
 # Tutor Course Request Endpoints (Restored)
 
 @router.get("/all-tutor-course-requests", response_model=list[TutorCourseRequestResponse])
-def get_all_requests(db: Session = Depends(get_db)):
-    return get_all_tutor_course_requests(db)
+def get_all_requests(response: Response, listing: dict = Depends(listing_params), db: Session = Depends(get_db)):
+    return page_items(response, get_all_tutor_course_requests(db, **listing))
 
 @router.post("/tutor-course-request", response_model=TutorCourseRequestResponse)
 def new_tutor_course_request(request: TutorCourseRequestCreate, db: Session = Depends(get_db)):
@@ -142,6 +189,11 @@ def approve_request(request_id: int, db: Session = Depends(get_db)):
 def reject_request(request_id: int, db: Session = Depends(get_db)):
     return reject_tutor_course_request(db=db, request_id=request_id)
 
+# approve or reject many tutor course requests at once
+@router.post("/tutor-course-requests/bulk-status", response_model=BulkStatusResponse)
+def bulk_update_tutor_course_request_status_endpoint(body: BulkStatusUpdate, db: Session = Depends(get_db)):
+    return bulk_update_tutor_course_request_status(db, body.ids, body.status)
+
 @router.delete("/remove-tutor-course")
 def remove_course(tutor_id: int, course_id: int, db: Session = Depends(get_db)):
     return remove_tutor_course(db=db, tutor_id=tutor_id, course_id=course_id)
@@ -156,8 +208,8 @@ def create_report_endpoint(data:ReportCreate, db:Session=Depends(get_db)):
 
 #GET reports- view all reports for admin
 @router.get("/allreports", response_model=list[ReportResponse])
-def get_reports_endpoint(db:Session = Depends(get_db)):
-    return get_all_reports(db)
+def get_reports_endpoint(response: Response, listing: dict = Depends(listing_params), db:Session = Depends(get_db)):
+    return page_items(response, get_all_reports(db, **listing))
 
 #get user specific report
 @router.get("/userreports", response_model=list[ReportResponse])
@@ -171,7 +223,24 @@ def get_user_reports_endpoint(user_id: int = Query(None), name: str = Query(None
     if user_id:
         return get_user_reports(db, user_id)
         
-    return get_all_reports(db)
+    return get_all_reports(db).items
+
+# report counts by status per reported user (most open reports first)
+@router.get("/report-summary", response_model=list[ReportSummary])
+def get_report_summary_endpoint(
+    user_id: Optional[int] = Query(None),
+    name: Optional[str] = Query(None, description="First, last or full name prefix; summarizes the best matches"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    user_ids = None
+    if name:
+        user_ids = [user.user_id for user in resolve_users_by_name(db, name)]
+        if not user_ids:
+            return []
+    elif user_id:
+        user_ids = [user_id]
+    return get_report_summary(db, user_ids=user_ids, limit=limit)
 
 #a way to update report status
 @router.patch("/report/{report_id}/status", response_model= ReportResponse)
@@ -193,60 +262,32 @@ def drop_user_endpoint(user_id: int, role: Optional[str] = None, db: Session = D
     """
     return drop_user(db=db, user_id=user_id, role=role)
 
+
+@router.post("/drop-users", response_model=DropUsersResponse)
+def drop_users_endpoint(data: DropUsersRequest, db: Session = Depends(get_db)):
+    """
+    Soft delete several users in one transaction.
+    Users that are missing, already deleted or fail the optional role check
+    are skipped and reported per user.
+    """
+    if not data.user_ids:
+        raise HTTPException(status_code=400, detail="user_ids must not be empty")
+    return drop_users(db=db, user_ids=data.user_ids, role=data.role)
+
 #----------------------------------------------------------
 # Admin: Get All Students Endpoint
 
 @router.get("/registered-students")
-def get_all_students(db: Session = Depends(get_db)):
+def get_all_students(
+    search: Optional[str] = Query(None, description="Match on first name, last name or email"),
+    sort: str = Query("name", description="name, sessions, email or date"),
+    page: Optional[int] = Query(None, ge=1, description="1-based page; omit to get every student"),
+    page_size: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
     """
-    Get all registered students with their session counts and information.
+    Get registered students with their session counts and information.
     Returns students who are not deleted and not tutors.
+    Session counts come from a single grouped query over bookings.
     """
-    from search.models.user import User
-    from search.models.tutor_profile import TutorProfile
-    from schedule.models.booking import Booking
-    from sqlalchemy import func, and_
-    
-    # Get all non-deleted users who are NOT tutors
-    students_query = db.query(User).outerjoin(
-        TutorProfile, User.user_id == TutorProfile.tutor_id
-    ).filter(
-        and_(
-            User.is_deleted == False,
-            TutorProfile.tutor_id == None  # Not a tutor
-        )
-    )
-    
-    students = students_query.all()
-    
-    result = []
-    for student in students:
-        # Count total sessions (confirmed + completed bookings where user is student)
-        total_sessions = db.query(func.count(Booking.booking_id)).filter(
-            and_(
-                Booking.student_id == student.user_id,
-                Booking.status.in_(['confirmed', 'completed'])
-            )
-        ).scalar() or 0
-        
-        # Count pending sessions
-        pending_sessions = db.query(func.count(Booking.booking_id)).filter(
-            and_(
-                Booking.student_id == student.user_id,
-                Booking.status == 'pending'
-            )
-        ).scalar() or 0
-        
-        result.append({
-            "user_id": student.user_id,
-            "first_name": student.first_name,
-            "last_name": student.last_name,
-            "email": student.sfsu_email,
-            "role": student.role,
-            "total_sessions": total_sessions,
-            "pending_sessions": pending_sessions,
-            "created_at": student.created_at.isoformat() if student.created_at else None
-        })
-    
-    return {"items": result}
-
+    return get_registered_students(db=db, search=search, sort=sort, page=page, page_size=page_size)
@@ -0,0 +1,23 @@
+"""
+Pydantic schemas for bulk approve/reject requests & responses.
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BulkStatusUpdate(BaseModel):
+    ids: List[int]
+    status: str  # approved or rejected
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    success: bool
+    status: Optional[str] = None  # status after the update (or current status if skipped)
+    detail: Optional[str] = None  # why the item was skipped
+
+
+class BulkStatusResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkItemResult]
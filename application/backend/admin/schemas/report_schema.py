@@ -3,6 +3,7 @@ Pydantic schemas for report responses.
 """
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class ReportCreate(BaseModel):
     reporter_id: int
@@ -20,4 +21,16 @@ class ReportResponse(BaseModel):
     reported_user_id: int
     reason: str
     status:str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class ReportSummary(BaseModel):
+    user_id: int
+    first_name: str
+    last_name: str
+    email: str
+    is_deleted: bool
+    total: int
+    submitted: int
+    reviewing: int
+    closed: int
+    last_reported_at: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class DropUserRequest(BaseModel):
     user_id: int
@@ -13,3 +13,23 @@ class DropUserResponse(BaseModel):
     deleted_role: str
     related_records_deleted: dict
 
+
+class DropUsersRequest(BaseModel):
+    user_ids: List[int]
+    role: Optional[str] = None  # Optional role every user must have
+
+
+class DropUserResult(BaseModel):
+    user_id: int
+    status: str  # deleted, not_found, already_deleted, role_mismatch
+    detail: Optional[str] = None
+    deleted_email: Optional[str] = None
+    deleted_name: Optional[str] = None
+    deleted_role: Optional[str] = None
+    related_records: Optional[Dict[str, int]] = None
+
+
+class DropUsersResponse(BaseModel):
+    deleted_count: int
+    results: List[DropUserResult]
+    related_records_deleted: Dict[str, int]
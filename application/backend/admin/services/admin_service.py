@@ -11,11 +11,15 @@ from search.models.tutor_profile import TutorProfile
 from search.models.tutor_course import TutorCourse
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from sqlalchemy import or_, func
+from sqlalchemy import and_, or_, func, case, literal, select, union_all
 from schedule.models.booking import Booking
+from schedule.models.student_session_count import StudentSessionCount, SESSION_STATUSES, PENDING_STATUSES
+from search.config import settings
 from schedule.models.availability_slot import AvailabilitySlot
 from chat.models.chat_message import ChatMessage
 from chat.models.chat_media import ChatMedia
+from admin.services.listing import ListingSpec, ListingPage, list_rows
+from auth.identity_cache import identity_cache
 import re
 
 DEFAULT_TUTOR_IMAGE = "/media/default_silhouette.png"
@@ -64,6 +68,7 @@ def approve_application(db: Session, application_id: int):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    identity_cache.invalidate_user(app.user_id)
 
     db.refresh(app)
     return app
@@ -80,17 +85,85 @@ def reject_application(db: Session, application_id: int):
     db.refresh(app)
     return app
 
+TUTOR_APPLICATION_LISTING = ListingSpec(
+    columns={
+        "application_id": TutorApplication.application_id,
+        "user_id": TutorApplication.user_id,
+        "full_name": TutorApplication.full_name,
+        "email": TutorApplication.email,
+        "gpa": TutorApplication.gpa,
+        "courses": TutorApplication.courses,
+        "bio": TutorApplication.bio,
+        "status": TutorApplication.status,
+        "created_at": TutorApplication.created_at,
+    },
+    id_column="application_id",
+    sorts={"date": ["created_at"], "name": ["full_name"], "gpa": ["gpa"], "status": ["status"]},
+    default_sort="date",
+    default_orders={"date": "desc", "gpa": "desc"},
+    status_column=TutorApplication.status,
+)
+
+# for admin view of tutor applications, newest first (filter/sort/page via listing params)
+def get_all_tutor_applications(db: Session, **listing) -> ListingPage:
+    return list_rows(db, TUTOR_APPLICATION_LISTING, **listing)
+
 
 
 #--------------------------------------------------------------------
 # Admin: Manage Tutor_Courses
+def _tutor_course_request_item(row):
+    return {
+        "request_id": row["request_id"],
+        "tutor_id": row["tutor_id"],
+        "status": row["status"],
+        "created_at": row["created_at"],
+        "course": {
+            "course_id": row["course_id"],
+            "department_code": row["department_code"],
+            "course_number": row["course_number"],
+            "title": row["title"],
+        },
+        "tutor": {
+            "tutor_id": row["tutor_id"],
+            "user": {"user_id": row["user_id"], "first_name": row["first_name"], "last_name": row["last_name"]},
+        },
+    }
+
+TUTOR_COURSE_REQUEST_LISTING = ListingSpec(
+    columns={
+        "request_id": TutorCourseRequest.request_id,
+        "tutor_id": TutorCourseRequest.tutor_id,
+        "status": TutorCourseRequest.status,
+        "created_at": TutorCourseRequest.created_at,
+        "course_id": Course.course_id,
+        "department_code": Course.department_code,
+        "course_number": Course.course_number,
+        "title": Course.title,
+        "user_id": User.user_id,
+        "first_name": User.first_name,
+        "last_name": User.last_name,
+    },
+    id_column="request_id",
+    sorts={"date": ["created_at"], "course": ["department_code", "course_number"], "tutor": ["last_name", "first_name"]},
+    default_sort="date",
+    default_orders={"date": "desc"},
+    joins=[
+        (Course, Course.course_id == TutorCourseRequest.course_id),
+        (TutorProfile, TutorProfile.tutor_id == TutorCourseRequest.tutor_id),
+        (User, User.user_id == TutorProfile.tutor_id),
+    ],
+    status_column=TutorCourseRequest.status,
+    shape=_tutor_course_request_item,
+)
+
 #for admin to view all tutor course requests, ordered by creation time
-def get_all_tutor_course_requests(db:Session):
-    return db.query(TutorCourseRequest).order_by(TutorCourseRequest.created_at.desc()).all()
+def get_all_tutor_course_requests(db: Session, **listing) -> ListingPage:
+    return list_rows(db, TUTOR_COURSE_REQUEST_LISTING, **listing)
 
 #tutor will send request to admin to add more courses to tutor_courses
 def create_tutor_course_request(db: Session, tutor_id: int, data):
-    tutor = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
+    tutor = identity_cache.get_tutor_profile(db, tutor_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="tutor not found")
 
@@ -147,11 +220,11 @@ def reject_tutor_course_request(db: Session, request_id: int):
 
 #for admin to remove tutor_course entry that already exists
 def remove_tutor_course(db: Session, tutor_id: int, course_id: int):
-    tutor_profile = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
+    tutor_profile = identity_cache.get_tutor_profile(db, tutor_id)
     if not tutor_profile:
         raise HTTPException(status_code=404, detail="Tutor not found")
 
-    tutor_user = db.query(User).filter(User.user_id == tutor_id).first()
+    tutor_user = identity_cache.get_user(db, tutor_id)
 
     course = db.query(Course).filter(Course.course_id == course_id).first()
     if not course:
@@ -182,37 +255,57 @@ def remove_tutor_course(db: Session, tutor_id: int, course_id: int):
 # Admin: Manage Courses
 # only courses, not tutor_courses
 
-#for admin viewing of all courses
-def get_all_courses(db:Session):
-    return db.query(Course).order_by(Course.department_code, Course.course_number).all()
+COURSE_LISTING = ListingSpec(
+    columns={
+        "course_id": Course.course_id,
+        "department_code": Course.department_code,
+        "course_number": Course.course_number,
+        "title": Course.title,
+        "is_active": Course.is_active,
+    },
+    id_column="course_id",
+    sorts={"code": ["department_code", "course_number"], "title": ["title"], "id": []},
+    default_sort="code",
+    status_column=Course.is_active,
+    status_values={"active": True, "inactive": False},
+)
 
-#for admin to easily view all course requests
-def get_all_course_requests(db: Session):
-    from admin.schemas.course_request_schema import CourseRequestResponse
-    
-    # Join CourseRequest with User to get email and name
-    results = db.query(CourseRequest, User).join(
-        User, CourseRequest.user_id == User.user_id
-    ).all()
-    
-    # Manually construct response objects with user info
-    requests_with_user_info = []
-    for course_req, user in results:
-        req_dict = {
-            "course_req_id": course_req.course_req_id,
-            "user_id": course_req.user_id,
-            "course_number": course_req.course_number,
-            "title": course_req.title,
-            "notes": course_req.notes,
-            "status": course_req.status,
-            "created_at": course_req.created_at,
-            "updated_at": course_req.updated_at,
-            "email": user.sfsu_email,
-            "user_name": f"{user.first_name} {user.last_name}"
-        }
-        requests_with_user_info.append(CourseRequestResponse(**req_dict))
-    
-    return requests_with_user_info
+#for admin viewing of all courses
+def get_all_courses(db: Session, **listing) -> ListingPage:
+    return list_rows(db, COURSE_LISTING, **listing)
+
+def _course_request_item(row):
+    first_name = row.pop("first_name")
+    last_name = row.pop("last_name")
+    row["user_name"] = f"{first_name} {last_name}"
+    return row
+
+COURSE_REQUEST_LISTING = ListingSpec(
+    columns={
+        "course_req_id": CourseRequest.course_req_id,
+        "user_id": CourseRequest.user_id,
+        "course_number": CourseRequest.course_number,
+        "title": CourseRequest.title,
+        "notes": CourseRequest.notes,
+        "status": CourseRequest.status,
+        "created_at": CourseRequest.created_at,
+        "updated_at": CourseRequest.updated_at,
+        "email": User.sfsu_email,
+        "first_name": User.first_name,
+        "last_name": User.last_name,
+    },
+    id_column="course_req_id",
+    sorts={"id": [], "date": ["created_at"], "course": ["course_number"], "status": ["status"]},
+    default_sort="id",
+    default_orders={"date": "desc"},
+    joins=[(User, CourseRequest.user_id == User.user_id)],
+    status_column=CourseRequest.status,
+    shape=_course_request_item,
+)
+
+#for admin to easily view all course requests, with requester email and name
+def get_all_course_requests(db: Session, **listing) -> ListingPage:
+    return list_rows(db, COURSE_REQUEST_LISTING, **listing)
 
 #adding course_request entry to db table
 def create_course_request(db: Session, data: CourseRequestCreate):
@@ -316,9 +409,25 @@ def create_report(db: Session, data: ReportInfo):
     return report
 
 
-#all reports for all users
-def get_all_reports(db:Session):
-    return db.query(Reports).order_by(Reports.created_at.desc()).all()
+REPORT_LISTING = ListingSpec(
+    columns={
+        "report_id": Reports.report_id,
+        "reporter_id": Reports.reporter_id,
+        "reported_user_id": Reports.reported_user_id,
+        "reason": Reports.reason,
+        "status": Reports.status,
+        "created_at": Reports.created_at,
+    },
+    id_column="report_id",
+    sorts={"date": ["created_at"], "status": ["status"]},
+    default_sort="date",
+    default_orders={"date": "desc"},
+    status_column=Reports.status,
+)
+
+#all reports for all users, newest first
+def get_all_reports(db: Session, **listing) -> ListingPage:
+    return list_rows(db, REPORT_LISTING, **listing)
 
 #user specific reports
 def get_user_reports(db:Session, user_id:int):
@@ -342,19 +451,178 @@ def update_report_status(db: Session, report_id: int, status: str):
     return report
 
 
-def get_user_id_by_name(db: Session, name: str):
-    # Case-insensitive search for first or last name
-    user = db.query(User).filter(
-        or_(
-            func.lower(User.first_name).contains(func.lower(name)),
-            func.lower(User.last_name).contains(func.lower(name))
+def _prefix_pattern(text: str) -> str:
+    """LIKE pattern matching values that start with text (wildcards escaped)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def resolve_users_by_name(db: Session, name: str, limit: int = 10):
+    """
+    Users matching a typed name, best match first.
+
+    Matches are prefix-only on the raw first_name/last_name columns so the
+    idx_users_first_name, idx_users_last_name and idx_users_full_name indexes
+    can serve them (no leading wildcard, no LOWER() on the column). A two-part
+    name like "ana lo" also matches first name "Ana..." with last name "Lo...".
+    Ranking: exact full name, exact first or last name, full-name prefix, then
+    first or last name prefix; ties by last name, first name, user_id.
+
+    Returns:
+        List of User objects (at most limit)
+    """
+    name = " ".join((name or "").split())
+    if not name:
+        return []
+    lowered = name.lower()
+    parts = name.split(" ", 1)
+
+    conditions = [
+        User.first_name.like(_prefix_pattern(name), escape="\\"),
+        User.last_name.like(_prefix_pattern(name), escape="\\"),
+    ]
+    ranks = [(or_(func.lower(User.first_name) == lowered, func.lower(User.last_name) == lowered), 1)]
+    if len(parts) == 2:
+        first, last = parts
+        full_prefix = and_(
+            User.first_name.like(_prefix_pattern(first), escape="\\"),
+            User.last_name.like(_prefix_pattern(last), escape="\\")
         )
-    ).first()
-    return user.user_id if user else None
+        conditions.append(full_prefix)
+        ranks = [
+            (and_(func.lower(User.first_name) == first.lower(), func.lower(User.last_name) == last.lower()), 0),
+            *ranks,
+            (full_prefix, 2),
+        ]
+    rank = case(*ranks, else_=3)
+
+    return db.query(User).filter(or_(*conditions)).order_by(
+        rank, User.last_name, User.first_name, User.user_id
+    ).limit(limit).all()
+
+
+def get_user_id_by_name(db: Session, name: str):
+    # Best ranked match for a first, last or full name
+    users = resolve_users_by_name(db, name, limit=1)
+    return users[0].user_id if users else None
+
+
+def get_report_summary(db: Session, user_ids=None, limit: int = None):
+    """
+    Report counts by status for each reported user, in one grouped query.
+
+    The counts are aggregated from reports alone (served by
+    idx_reports_reported_status) and then joined to users for the names.
+    Users with the most open (submitted or reviewing) reports come first.
+
+    Args:
+        db: Database session
+        user_ids: Optional reported user ids to limit the summary to
+        limit: Optional maximum number of users
+
+    Returns:
+        List of dicts with user info, per-status counts, total and last_reported_at
+    """
+    counts = db.query(
+        Reports.reported_user_id.label("user_id"),
+        func.count().label("total"),
+        func.sum(case((Reports.status == "submitted", 1), else_=0)).label("submitted"),
+        func.sum(case((Reports.status == "reviewing", 1), else_=0)).label("reviewing"),
+        func.sum(case((Reports.status == "closed", 1), else_=0)).label("closed"),
+        func.max(Reports.created_at).label("last_reported_at"),
+    )
+    if user_ids is not None:
+        counts = counts.filter(Reports.reported_user_id.in_(user_ids))
+    counts = counts.group_by(Reports.reported_user_id).subquery()
+
+    open_reports = counts.c.submitted + counts.c.reviewing
+    query = db.query(
+        counts, User.first_name, User.last_name, User.sfsu_email, User.is_deleted
+    ).join(
+        User, User.user_id == counts.c.user_id
+    ).order_by(open_reports.desc(), counts.c.total.desc(), counts.c.user_id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [
+        {
+            "user_id": row.user_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "email": row.sfsu_email,
+            "is_deleted": row.is_deleted,
+            "total": row.total,
+            "submitted": row.submitted or 0,
+            "reviewing": row.reviewing or 0,
+            "closed": row.closed or 0,
+            "last_reported_at": row.last_reported_at,
+        }
+        for row in query.all()
+    ]
 
 #----------------------------------------------------------
 # Admin: Drop/Delete User
 
+RELATED_RECORD_KINDS = ("bookings", "messages", "reports_submitted", "reports_received")
+
+
+def count_related_records(db: Session, user_ids):
+    """
+    Related-record counts for several users in one UNION ALL aggregate.
+
+    Each branch filters a single indexed column (bookings.student_id/tutor_id,
+    chat_messages.sender_id/receiver_id, reports.reporter_id/reported_user_id)
+    instead of OR-ing two columns, which no single index can serve. Rows where
+    the user is on both sides (e.g. a message to self) are only counted once.
+
+    Returns:
+        {user_id: {"bookings": n, "messages": n, "reports_submitted": n, "reports_received": n}}
+    """
+    user_ids = list(set(user_ids))
+    counts = {user_id: dict.fromkeys(RELATED_RECORD_KINDS, 0) for user_id in user_ids}
+    if not user_ids:
+        return counts
+
+    def branch(kind, user_column, *criteria):
+        return select(
+            user_column.label("user_id"),
+            literal(kind).label("kind"),
+            func.count().label("n")
+        ).where(user_column.in_(user_ids), *criteria).group_by(user_column)
+
+    statement = union_all(
+        branch("bookings", Booking.student_id),
+        branch("bookings", Booking.tutor_id, Booking.student_id != Booking.tutor_id),
+        branch("messages", ChatMessage.sender_id),
+        branch("messages", ChatMessage.receiver_id, ChatMessage.sender_id != ChatMessage.receiver_id),
+        branch("reports_submitted", Reports.reporter_id),
+        branch("reports_received", Reports.reported_user_id),
+    )
+    for user_id, kind, n in db.execute(statement):
+        counts[user_id][kind] += n
+    return counts
+
+
+def _soft_delete(db: Session, user: User, tutor_profile: TutorProfile = None):
+    """Flag a user as deleted and free their email; returns the details needed for the response."""
+    details = {
+        "email": user.sfsu_email,
+        "name": f"{user.first_name} {user.last_name}",
+        "role": user.role
+    }
+
+    # Soft delete: set the flag
+    user.is_deleted = True
+
+    # Anonymize email to prevent reuse (keeps unique constraint happy)
+    user.sfsu_email = f"deleted_{user.user_id}_{user.sfsu_email}"
+
+    # If tutor, deactivate their profile
+    if tutor_profile is not None and user.role in ["tutor", "both"]:
+        tutor_profile.status = "rejected"  # Hide from search
+
+    return details
+
+
 def drop_user(db: Session, user_id: int, role: str = None):
     """
     Soft delete a user by setting is_deleted flag.
@@ -380,48 +648,200 @@ def drop_user(db: Session, user_id: int, role: str = None):
             detail=f"User role mismatch. Expected {role}, but user has role {user.role}"
         )
     
-    user_email = user.sfsu_email
-    user_name = f"{user.first_name} {user.last_name}"
-    user_role = user.role
-    
-    # Soft delete: set the flag
-    user.is_deleted = True
-    
-    # Anonymize email to prevent reuse (keeps unique constraint happy)
-    user.sfsu_email = f"deleted_{user_id}_{user.sfsu_email}"
-    
-    # If tutor, deactivate their profile
+    tutor_profile = None
     if user.role in ["tutor", "both"]:
         tutor_profile = db.query(TutorProfile).filter(
             TutorProfile.tutor_id == user_id
         ).first()
-        if tutor_profile:
-            tutor_profile.status = "rejected"  # Hide from search
+    details = _soft_delete(db, user, tutor_profile)
     
     db.commit()
+    identity_cache.invalidate_user(user_id)
     db.refresh(user)
     
     # Count related records (for informational purposes)
-    related_records = {
-        "bookings": db.query(Booking).filter(
-            (Booking.student_id == user_id) | (Booking.tutor_id == user_id)
-        ).count(),
-        "messages": db.query(ChatMessage).filter(
-            (ChatMessage.sender_id == user_id) | (ChatMessage.receiver_id == user_id)
-        ).count(),
-        "reports_submitted": db.query(Reports).filter(
-            Reports.reporter_id == user_id
-        ).count(),
-        "reports_received": db.query(Reports).filter(
-            Reports.reported_user_id == user_id
-        ).count()
-    }
+    related_records = count_related_records(db, [user_id])[user_id]
     
     return {
-        "message": f"User {user_name} ({user_email}) successfully deleted",
+        "message": f"User {details['name']} ({details['email']}) successfully deleted",
         "deleted_user_id": user_id,
         "deleted_email": user.sfsu_email,
-        "deleted_name": user_name,
-        "deleted_role": user_role,
+        "deleted_name": details["name"],
+        "deleted_role": details["role"],
         "related_records_deleted": related_records
-    }
\ No newline at end of file
+    }
+
+
+def drop_users(db: Session, user_ids, role: str = None):
+    """
+    Soft delete many users in one transaction.
+
+    Users that don't exist, are already deleted or fail the role check are
+    reported and skipped; the rest are deleted together. Related-record counts
+    for all deleted users come from a single aggregate query.
+
+    Args:
+        db: Database session
+        user_ids: IDs of the users to delete
+        role: Optional role every user must have (tutor, student, admin, both)
+
+    Returns:
+        Dictionary with a per-user result list, the number deleted and the summed related-record counts
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    users = {user.user_id: user for user in db.query(User).filter(User.user_id.in_(user_ids))}
+    profiles = {
+        profile.tutor_id: profile
+        for profile in db.query(TutorProfile).filter(TutorProfile.tutor_id.in_(user_ids))
+    }
+
+    results = []
+    deleted = {}
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if user is None:
+            results.append({"user_id": user_id, "status": "not_found", "detail": "User not found"})
+        elif user.is_deleted:
+            results.append({"user_id": user_id, "status": "already_deleted", "detail": "User already deleted"})
+        elif role and user.role != role:
+            results.append({
+                "user_id": user_id,
+                "status": "role_mismatch",
+                "detail": f"User role mismatch. Expected {role}, but user has role {user.role}"
+            })
+        else:
+            deleted[user_id] = _soft_delete(db, user, profiles.get(user_id))
+            results.append({"user_id": user_id, "status": "deleted"})
+
+    if deleted:
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        identity_cache.invalidate_user(*deleted)
+
+    related = count_related_records(db, deleted)
+    totals = dict.fromkeys(RELATED_RECORD_KINDS, 0)
+    for result in results:
+        user_id = result["user_id"]
+        if user_id in deleted:
+            result.update(
+                deleted_email=users[user_id].sfsu_email,
+                deleted_name=deleted[user_id]["name"],
+                deleted_role=deleted[user_id]["role"],
+                related_records=related[user_id]
+            )
+            for kind, n in related[user_id].items():
+                totals[kind] += n
+
+    return {
+        "deleted_count": len(deleted),
+        "results": results,
+        "related_records_deleted": totals
+    }
+
+#----------------------------------------------------------
+# Admin: Registered Students
+
+def _session_counts_subquery(db: Session):
+    """Per-student session counts, aggregated from bookings or read from the counters table."""
+    if settings.USE_SESSION_COUNTERS:
+        return db.query(
+            StudentSessionCount.student_id.label("student_id"),
+            StudentSessionCount.total_sessions.label("total_sessions"),
+            StudentSessionCount.pending_sessions.label("pending_sessions")
+        ).subquery()
+
+    # One pass over bookings, both counts via conditional aggregation
+    return db.query(
+        Booking.student_id.label("student_id"),
+        func.sum(case((Booking.status.in_(SESSION_STATUSES), 1), else_=0)).label("total_sessions"),
+        func.sum(case((Booking.status.in_(PENDING_STATUSES), 1), else_=0)).label("pending_sessions")
+    ).filter(
+        Booking.status.in_(SESSION_STATUSES + PENDING_STATUSES)
+    ).group_by(Booking.student_id).subquery()
+
+
+def get_registered_students(db: Session, search: str = None, sort: str = "name", page: int = None, page_size: int = 50):
+    """
+    Registered students (not deleted, no tutor profile) with their session counts.
+
+    Served by a single query joining a grouped count of bookings (or the
+    student_session_counts table when USE_SESSION_COUNTERS is on), instead of
+    two COUNT queries per student.
+
+    Args:
+        db: Database session
+        search: Optional case-insensitive match on first name, last name or email
+        sort: name, sessions (most first), email or date (newest first)
+        page: Optional 1-based page; all matching students are returned when omitted
+        page_size: Students per page when page is given
+
+    Returns:
+        Dictionary with items and total (plus page and page_size when paginated)
+    """
+    counts = _session_counts_subquery(db)
+    total_sessions = func.coalesce(counts.c.total_sessions, 0)
+    pending_sessions = func.coalesce(counts.c.pending_sessions, 0)
+
+    sort_orders = {
+        "name": [User.first_name.asc(), User.last_name.asc()],
+        "sessions": [total_sessions.desc()],
+        "email": [User.sfsu_email.asc()],
+        "date": [User.created_at.desc()],
+    }
+    if sort not in sort_orders:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Must be one of: {', '.join(sort_orders)}")
+
+    query = db.query(
+        User.user_id,
+        User.first_name,
+        User.last_name,
+        User.sfsu_email,
+        User.role,
+        User.created_at,
+        total_sessions.label("total_sessions"),
+        pending_sessions.label("pending_sessions")
+    ).outerjoin(
+        TutorProfile, User.user_id == TutorProfile.tutor_id
+    ).outerjoin(
+        counts, counts.c.student_id == User.user_id
+    ).filter(
+        User.is_deleted == False,
+        TutorProfile.tutor_id == None  # Not a tutor
+    )
+
+    if search:
+        term = f"%{search.strip().lower()}%"
+        query = query.filter(or_(
+            func.lower(User.first_name).like(term),
+            func.lower(User.last_name).like(term),
+            func.lower(User.sfsu_email).like(term)
+        ))
+
+    result = {}
+    if page is not None:
+        result["total"] = query.order_by(None).count()
+        result["page"] = page
+        result["page_size"] = page_size
+        query = query.order_by(*sort_orders[sort], User.user_id).offset((page - 1) * page_size).limit(page_size)
+    else:
+        query = query.order_by(*sort_orders[sort], User.user_id)
+
+    items = [
+        {
+            "user_id": row.user_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "email": row.sfsu_email,
+            "role": row.role,
+            "total_sessions": int(row.total_sessions),
+            "pending_sessions": int(row.pending_sessions),
+            "created_at": row.created_at.isoformat() if row.created_at else None
+        }
+        for row in query.all()
+    ]
+    if page is None:
+        result["total"] = len(items)
+    return {"items": items, **result}
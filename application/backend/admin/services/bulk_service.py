@@ -0,0 +1,224 @@
+"""
+Bulk approve/reject for tutor applications, tutor course requests and course
+coverage requests.
+
+Each operation loads every item it needs with a handful of IN queries,
+validates the items in Python, applies all inserts and updates and commits
+once. Items that can't be processed (missing, no longer pending, invalid
+course number) are skipped and reported; they never abort the batch.
+"""
+import re
+from typing import Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from admin.models.course_request import CourseRequest
+from admin.models.tutor_application import TutorApplication
+from admin.models.tutor_course_request import TutorCourseRequest
+from admin.services.admin_service import DEFAULT_TUTOR_IMAGE
+from auth.identity_cache import identity_cache
+from search.models.course import Course
+from search.models.tutor_course import TutorCourse
+from search.models.tutor_profile import TutorProfile
+from search.models.user import User
+
+BULK_STATUSES = ("approved", "rejected")
+MAX_BULK_ITEMS = 500
+COURSE_NUMBER_PATTERN = re.compile(r"([A-Za-z]+)\s*[-]?\s*(\d+)")
+
+
+def _check_request(ids: List[int], status: str) -> List[int]:
+    if status not in BULK_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(BULK_STATUSES)}")
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(ids) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} ids per request")
+    return list(dict.fromkeys(ids))
+
+
+def _result(item_id: int, success: bool, status: str = None, detail: str = None) -> Dict:
+    return {"id": item_id, "success": success, "status": status, "detail": detail}
+
+
+def _commit(db: Session, results: List[Dict], ids: List[int]) -> Dict:
+    """Commit the batch once and build the report, results in request order."""
+    if any(result["success"] for result in results):
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    position = {item_id: index for index, item_id in enumerate(ids)}
+    results.sort(key=lambda result: position[result["id"]])
+    return {
+        "updated": sum(result["success"] for result in results),
+        "failed": sum(not result["success"] for result in results),
+        "results": results,
+    }
+
+
+def _pending_items(items: Dict, ids: List[int], id_label: str, results: List[Dict]):
+    """Split ids into pending items to process, recording a result for the rest."""
+    pending = []
+    for item_id in ids:
+        item = items.get(item_id)
+        if item is None:
+            results.append(_result(item_id, False, detail=f"{id_label} not found"))
+        elif item.status != "pending":
+            results.append(_result(item_id, False, item.status, f"{id_label} already {item.status}"))
+        else:
+            pending.append(item)
+    return pending
+
+
+#----------------------------------------------------------
+# Tutor applications
+
+def bulk_update_application_status(db: Session, ids: List[int], status: str) -> Dict:
+    """
+    Approve or reject many tutor applications in one transaction.
+
+    Approving creates the tutor profile (unless the user already has one) and
+    promotes students to tutors, as approve_application does for one.
+    """
+    ids = _check_request(ids, status)
+    applications = {
+        app.application_id: app
+        for app in db.query(TutorApplication).filter(TutorApplication.application_id.in_(ids))
+    }
+    results = []
+    pending = _pending_items(applications, ids, "Application", results)
+
+    if status == "approved" and pending:
+        user_ids = {app.user_id for app in pending}
+        has_profile = {
+            tutor_id for (tutor_id,) in
+            db.query(TutorProfile.tutor_id).filter(TutorProfile.tutor_id.in_(user_ids))
+        }
+        for app in pending:
+            if app.user_id not in has_profile:
+                db.add(TutorProfile(
+                    tutor_id=app.user_id,
+                    bio=app.bio,
+                    status="approved",
+                    profile_image_path_full=DEFAULT_TUTOR_IMAGE,
+                    profile_image_path_thumb=DEFAULT_TUTOR_IMAGE
+                ))
+                has_profile.add(app.user_id)
+
+        # Students become tutors; 'tutor' and 'both' stay as they are
+        db.query(User).filter(
+            User.user_id.in_(user_ids), User.role == "student"
+        ).update({User.role: "tutor"}, synchronize_session=False)
+
+    for app in pending:
+        app.status = status
+        results.append(_result(app.application_id, True, status))
+
+    report = _commit(db, results, ids)
+    if status == "approved" and pending:
+        # roles and tutor profiles changed
+        identity_cache.invalidate_user(*{app.user_id for app in pending})
+    return report
+
+
+#----------------------------------------------------------
+# Tutor course requests
+
+def bulk_update_tutor_course_request_status(db: Session, ids: List[int], status: str) -> Dict:
+    """
+    Approve or reject many tutor course requests in one transaction.
+
+    Approving adds the tutor_courses rows; a request whose tutor already
+    teaches the course is reported instead, as approve_tutor_course_request does.
+    """
+    ids = _check_request(ids, status)
+    requests = {
+        request.request_id: request
+        for request in db.query(TutorCourseRequest).filter(TutorCourseRequest.request_id.in_(ids))
+    }
+    results = []
+    pending = _pending_items(requests, ids, "Request", results)
+
+    if status == "approved" and pending:
+        # Fetch candidate pairs by both columns, then match exact pairs in Python
+        existing = {
+            tuple(row) for row in db.query(TutorCourse.tutor_id, TutorCourse.course_id).filter(
+                TutorCourse.tutor_id.in_({request.tutor_id for request in pending}),
+                TutorCourse.course_id.in_({request.course_id for request in pending})
+            )
+        }
+        approved = []
+        for request in pending:
+            pair = (request.tutor_id, request.course_id)
+            if pair in existing:
+                results.append(_result(request.request_id, False, request.status,
+                                       "tutor already has this course approved and added."))
+                continue
+            db.add(TutorCourse(tutor_id=request.tutor_id, course_id=request.course_id))
+            existing.add(pair)
+            approved.append(request)
+        pending = approved
+
+    for request in pending:
+        request.status = status
+        results.append(_result(request.request_id, True, status))
+
+    return _commit(db, results, ids)
+
+
+#----------------------------------------------------------
+# Course coverage requests
+
+def bulk_update_course_request_status(db: Session, ids: List[int], status: str) -> Dict:
+    """
+    Approve or reject many course coverage requests in one transaction.
+
+    Approving adds each requested course to the catalog unless it already
+    exists (or was added earlier in the same batch).
+    """
+    ids = _check_request(ids, status)
+    course_requests = {
+        course_req.course_req_id: course_req
+        for course_req in db.query(CourseRequest).filter(CourseRequest.course_req_id.in_(ids))
+    }
+    results = []
+    pending = _pending_items(course_requests, ids, "Request", results)
+
+    if status == "approved" and pending:
+        parsed = {}
+        valid = []
+        for course_req in pending:
+            match = COURSE_NUMBER_PATTERN.match(course_req.course_number)
+            if not match:
+                results.append(_result(course_req.course_req_id, False, course_req.status, "Invalid course_number format"))
+                continue
+            parsed[course_req.course_req_id] = match.groups()
+            valid.append(course_req)
+        pending = valid
+
+        codes = set(parsed.values())
+        existing = {
+            tuple(row) for row in db.query(Course.department_code, Course.course_number).filter(
+                Course.department_code.in_({dept for dept, _ in codes}),
+                Course.course_number.in_({number for _, number in codes})
+            )
+        }
+        for course_req in pending:
+            code = parsed[course_req.course_req_id]
+            if code not in existing:
+                db.add(Course(
+                    department_code=code[0],
+                    course_number=code[1],
+                    title=course_req.title or "TBD",
+                    is_active=True
+                ))
+                existing.add(code)
+
+    for course_req in pending:
+        course_req.status = status
+        results.append(_result(course_req.course_req_id, True, status))
+
+    return _commit(db, results, ids)
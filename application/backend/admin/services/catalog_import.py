@@ -0,0 +1,162 @@
+"""
+Bulk course catalog import from CSV.
+
+The CSV needs department_code, course_number and title columns (header row
+required, extra columns ignored). Rows are streamed and upserted in batches:
+each batch does one existence probe on (department_code, course_number),
+inserts the new courses, updates changed titles and reactivates courses that
+were inactive. Once every row is in, active courses that were not in the
+file can be deactivated, so a semester's catalog replaces the previous one.
+
+Everything runs in one transaction: a failed import leaves the catalog as it
+was. Used by POST /api/admin/import-catalog and scripts/import_course_catalog.py.
+"""
+import csv
+from typing import Dict, IO, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from search.models.course import Course
+
+REQUIRED_COLUMNS = ("department_code", "course_number", "title")
+DEFAULT_BATCH_SIZE = 500
+# Keep IN lists for the deactivation update at a size every driver accepts
+UPDATE_CHUNK_SIZE = 1000
+MAX_ERRORS_REPORTED = 50
+
+
+class CatalogImportError(ValueError):
+    """The file can't be imported at all (e.g. required columns missing)."""
+
+
+def read_catalog_rows(stream: IO[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (line number, row) from a CSV text stream, validating the header."""
+    reader = csv.DictReader(stream)
+    header = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise CatalogImportError(f"CSV is missing required columns: {', '.join(missing)}")
+    reader.fieldnames = header
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _clean(row: Dict[str, str]) -> Tuple[str, str, str]:
+    department_code = (row.get("department_code") or "").strip().upper()
+    course_number = (row.get("course_number") or "").strip()
+    title = (row.get("title") or "").strip()
+    if not department_code or not course_number or not title:
+        raise ValueError("department_code, course_number and title are required")
+    if len(department_code) > 10 or len(course_number) > 10 or len(title) > 255:
+        raise ValueError("value too long (department_code/course_number max 10, title max 255)")
+    return department_code, course_number, title
+
+
+def import_catalog(
+    db: Session,
+    rows: Iterable[Tuple[int, Dict[str, str]]],
+    deactivate_missing: bool = True,
+    dry_run: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict:
+    """
+    Upsert (line number, row) pairs into the courses table.
+
+    Invalid rows are skipped and listed in the report. If any row was invalid
+    nothing is deactivated, since the file may be incomplete. Repeated
+    courses keep the first row.
+
+    Returns:
+        Dictionary with inserted, updated, unchanged, deactivated, duplicate and error counts
+    """
+    report = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0, "deactivated": 0, "duplicates": 0, "errors": [], "error_count": 0}
+    seen_ids = set()
+    seen_keys = set()
+
+    try:
+        for batch in _batches(rows, batch_size):
+            courses = {}
+            for line, row in batch:
+                report["rows"] += 1
+                try:
+                    department_code, course_number, title = _clean(row)
+                except ValueError as e:
+                    report["error_count"] += 1
+                    if len(report["errors"]) < MAX_ERRORS_REPORTED:
+                        report["errors"].append({"line": line, "error": str(e)})
+                    continue
+                # course_number compares case-insensitively, as it does under MySQL's collation
+                key = (department_code, course_number.upper())
+                if key in seen_keys:
+                    # the first row for a course wins
+                    report["duplicates"] += 1
+                    continue
+                seen_keys.add(key)
+                courses[key] = (course_number, title)
+
+            if not courses:
+                continue
+
+            # One existence probe for the whole batch
+            existing = db.query(Course).filter(
+                tuple_(Course.department_code, Course.course_number).in_(
+                    [(key[0], course_number) for key, (course_number, _) in courses.items()]
+                )
+            ).all()
+            found = {}
+            for course in existing:
+                found[(course.department_code.upper(), course.course_number.upper())] = course
+                seen_ids.add(course.course_id)
+
+            new_courses = []
+            for key, (course_number, title) in courses.items():
+                course = found.get(key)
+                if course is None:
+                    new_courses.append(Course(department_code=key[0], course_number=course_number, title=title, is_active=True))
+                elif course.title != title or not course.is_active:
+                    course.title = title
+                    course.is_active = True
+                    report["updated"] += 1
+                else:
+                    report["unchanged"] += 1
+
+            if new_courses:
+                db.add_all(new_courses)
+                db.flush()
+                seen_ids.update(course.course_id for course in new_courses)
+                report["inserted"] += len(new_courses)
+
+        if deactivate_missing and report["error_count"] == 0 and report["rows"] > 0:
+            active_ids = [course_id for (course_id,) in db.query(Course.course_id).filter(Course.is_active == True)]
+            missing = [course_id for course_id in active_ids if course_id not in seen_ids]
+            for start in range(0, len(missing), UPDATE_CHUNK_SIZE):
+                chunk = missing[start:start + UPDATE_CHUNK_SIZE]
+                db.query(Course).filter(Course.course_id.in_(chunk)).update(
+                    {Course.is_active: False}, synchronize_session=False
+                )
+            report["deactivated"] = len(missing)
+        elif deactivate_missing:
+            report["deactivation_skipped"] = True
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    report["dry_run"] = dry_run
+    return report
@@ -0,0 +1,186 @@
+"""
+Shared listing layer for the admin list endpoints.
+
+Each listing is described by a ListingSpec: the columns to fetch (rows come
+back as plain dicts, no ORM objects), the joins they need, the sort keys an
+admin may pick and the column behind the status filter. list_rows() applies
+the filter and sort in SQL and pages with an opaque keyset cursor, so page N
+costs the same as page 1 however large the table gets.
+
+Pagination is opt-in: without a limit every matching row is returned, which
+keeps the existing dashboard pages working unchanged.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm import Session
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class ListingSpec:
+    """
+    Args:
+        columns: Output name -> column expression (the projection)
+        id_column: Name in columns of a unique key, used as the sort tie-breaker
+        sorts: Sort key -> names in columns to order by
+        default_sort: Sort key used when none is given
+        default_orders: Sort key -> "desc" for keys that default to descending
+        joins: (target, onclause) pairs joined in order
+        status_column: Column compared with the status filter
+        status_values: Maps accepted status strings to column values; defaults to the column's enum values
+        shape: Optional function turning a flat row dict into the response item
+    """
+    columns: Dict[str, Any]
+    id_column: str
+    sorts: Dict[str, List[str]]
+    default_sort: str
+    default_orders: Dict[str, str] = field(default_factory=dict)
+    joins: List[Tuple[Any, Any]] = field(default_factory=list)
+    status_column: Any = None
+    status_values: Optional[Dict[str, Any]] = None
+    shape: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+@dataclass
+class ListingPage:
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(sort: str, order: str, values: List[Any]) -> str:
+    payload = [sort, order, [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, List[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, order, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort, order, values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _cursor_value(column, value):
+    """Turn a JSON cursor value back into the column's Python type."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def _beyond(column, value, descending: bool):
+    # MySQL and SQLite sort NULLs first ascending and last descending
+    if descending:
+        return false() if value is None else or_(column < value, column.is_(None))
+    return column.isnot(None) if value is None else column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _keyset_filter(sort_columns, values, descending: bool):
+    """Rows strictly after values in (sort columns..., id) order."""
+    branches = []
+    for index, (column, value) in enumerate(zip(sort_columns, values)):
+        prefix = [_equal(c, v) for c, v in zip(sort_columns[:index], values[:index])]
+        branches.append(and_(*prefix, _beyond(column, value, descending)))
+    return or_(*branches)
+
+
+def list_rows(
+    db: Session,
+    spec: ListingSpec,
+    status: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> ListingPage:
+    """
+    Fetch one page of a listing.
+
+    Raises:
+        HTTPException: 400 for an unknown status, sort, order or a bad cursor
+    """
+    sort = sort or spec.default_sort
+    if sort not in spec.sorts:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Must be one of: {', '.join(spec.sorts)}")
+    order = order or spec.default_orders.get(sort, "asc")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Invalid order. Must be asc or desc")
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    names = list(spec.columns)
+    query = db.query(*[spec.columns[name].label(name) for name in names])
+    for target, onclause in spec.joins:
+        query = query.join(target, onclause)
+
+    if status is not None:
+        if spec.status_column is None:
+            raise HTTPException(status_code=400, detail="This listing has no status filter")
+        allowed = spec.status_values or {value: value for value in getattr(spec.status_column.type, "enums", [])}
+        if status not in allowed:
+            raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(allowed)}")
+        query = query.filter(spec.status_column == allowed[status])
+
+    key_names = spec.sorts[sort] + [spec.id_column]
+    key_columns = [spec.columns[name] for name in key_names]
+    descending = order == "desc"
+
+    if cursor:
+        cursor_sort, cursor_order, values = decode_cursor(cursor)
+        if (cursor_sort, cursor_order) != (sort, order) or len(values) != len(key_columns):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+        values = [_cursor_value(column, value) for column, value in zip(key_columns, values)]
+        query = query.filter(_keyset_filter(key_columns, values, descending))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in key_columns])
+    if limit is not None:
+        # one extra row tells us whether there is a next page
+        query = query.limit(limit + 1)
+
+    rows = [dict(zip(names, row)) for row in query.all()]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, order, [rows[-1][name] for name in key_names])
+
+    items = [spec.shape(row) for row in rows] if spec.shape else rows
+    return ListingPage(items=items, next_cursor=next_cursor)
+
+
+def listing_params(
+    status: Optional[str] = Query(None, description="Only rows with this status"),
+    sort: Optional[str] = Query(None, description="Sort key (endpoint specific)"),
+    order: Optional[str] = Query(None, description="asc or desc"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to get every row"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+) -> Dict[str, Any]:
+    """FastAPI dependency collecting the shared listing query parameters."""
+    return {"status": status, "sort": sort, "order": order, "limit": limit, "cursor": cursor}
+
+
+def page_items(response: Response, page: ListingPage) -> List[Dict[str, Any]]:
+    """Items of a page, with the next page's cursor exposed as a response header."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -16,7 +16,13 @@ class AIConfig:
     # OpenRouter API configuration
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
     OPENROUTER_MODEL: str = os.getenv("OPENROUTER_MODEL", "openai/gpt-3.5-turbo")
-    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+    OPENROUTER_BASE_URL: str = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+    
+    # Upstream LLM calls: shared connection pool, in-flight cap and retry backoff
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "4"))
+    REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("AI_REQUEST_TIMEOUT_SECONDS", "60"))
+    MAX_RETRIES: int = int(os.getenv("AI_MAX_RETRIES", "2"))
+    RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("AI_RETRY_BASE_DELAY_SECONDS", "2"))
     
     # Safety settings - only allow SELECT queries
     ALLOWED_SQL_KEYWORDS = ["SELECT"]
@@ -26,11 +32,33 @@ class AIConfig:
         "EXEC", "CALL", "SET", "SHOW", "DESCRIBE"
     ]
     
-    # Maximum results to return from queries
+    # Maximum results to return from queries (enforced with an injected LIMIT)
     MAX_QUERY_RESULTS = 100
     
+    # Dedicated pool for generated SQL (defaults to the application database)
+    DATABASE_URL: str = os.getenv("AI_DATABASE_URL", "")
+    DB_POOL_SIZE: int = int(os.getenv("AI_DB_POOL_SIZE", "4"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("AI_DB_POOL_TIMEOUT_SECONDS", "5"))
+    # Server-side time limit per generated query (MySQL MAX_EXECUTION_TIME)
+    QUERY_TIMEOUT_MS: int = int(os.getenv("AI_QUERY_TIMEOUT_MS", "5000"))
+    # Queries from one model turn that may run at the same time (each on its own connection)
+    MAX_PARALLEL_QUERIES: int = int(os.getenv("AI_MAX_PARALLEL_QUERIES", "3"))
+    # Reject plans whose EXPLAIN row estimate exceeds this (0 disables the check)
+    MAX_ESTIMATED_ROWS: int = int(os.getenv("AI_MAX_ESTIMATED_ROWS", "1000000"))
+    
     # Maximum number of function calls in a single conversation
     MAX_FUNCTION_CALLS = 5
+    
+    # Optional max age for the cached schema snapshot (0 = until migrations change)
+    SCHEMA_CACHE_TTL_SECONDS: float = float(os.getenv("AI_SCHEMA_CACHE_TTL_SECONDS", "0"))
+    
+    # Cache of answers to repeated prompts (exact and token-similarity matches)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("AI_RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("AI_RESPONSE_CACHE_TTL_SECONDS", "600"))
+    RESPONSE_CACHE_SIMILARITY: float = float(os.getenv("AI_RESPONSE_CACHE_SIMILARITY", "0.8"))
+    # How long one data version stamp is reused before the tables are checked again
+    DATA_VERSION_TTL_SECONDS: float = float(os.getenv("AI_DATA_VERSION_TTL_SECONDS", "5"))
 
 
 ai_config = AIConfig()
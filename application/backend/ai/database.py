@@ -0,0 +1,57 @@
+"""
+Dedicated database pool for model-generated SQL.
+
+AI queries get their own small engine so a slow generated query can only tie
+up these connections, never the pool that serves regular user traffic. On
+MySQL every connection is read-only and has MAX_EXECUTION_TIME set, so the
+server aborts any SELECT that runs longer than the limit.
+
+Set AI_DATABASE_URL to point at a read-only user or a replica; it defaults
+to the application database.
+"""
+from typing import Generator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, Session
+
+from search.config import settings
+from .config import ai_config
+
+
+def create_ai_engine(database_url: str):
+    engine_options = {"pool_pre_ping": True, "pool_recycle": 3600, "echo": False}
+    if not database_url.startswith("sqlite"):
+        engine_options.update(
+            pool_size=ai_config.DB_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=ai_config.DB_POOL_TIMEOUT_SECONDS,
+        )
+    engine = create_engine(database_url, **engine_options)
+
+    if engine.dialect.name == "mysql":
+        @event.listens_for(engine, "connect")
+        def limit_session(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(ai_config.QUERY_TIMEOUT_MS)}")
+                cursor.execute("SET SESSION TRANSACTION READ ONLY")
+            finally:
+                cursor.close()
+
+    return engine
+
+
+ai_engine = create_ai_engine(ai_config.DATABASE_URL or settings.database_url)
+
+AISessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ai_engine)
+
+
+def get_ai_db() -> Generator[Session, None, None]:
+    """
+    Dependency function to get a session from the AI query pool.
+    """
+    db = AISessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,284 @@
+"""
+Async client for the OpenRouter chat completions API.
+
+A single pooled httpx.AsyncClient is shared by every request in the worker,
+and a semaphore caps how many LLM calls are in flight at once so a burst of
+/api/ai/query calls queues up instead of opening dozens of slow upstream
+connections. Rate limits (429) and transient upstream failures are retried
+with exponential backoff using asyncio.sleep, so waiting never blocks the
+event loop. Cancelling the calling task aborts the upstream request and
+frees its slot.
+
+stream_chat_completion() asks for a server-sent-events response and yields
+the answer text as it arrives. Retries only happen before the first byte of
+the stream; once text has been handed out a failure is raised instead, so
+the caller never sees duplicated output. The upstream response is read by a
+separate task into a buffer, so a slow SSE client downstream never keeps a
+concurrency slot busy; the slot is freed as soon as the model has finished.
+"""
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
+
+import httpx
+from fastapi import Request
+
+from .config import ai_config
+
+T = TypeVar("T")
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OpenRouterError(ValueError):
+    """Non-retryable (or retries exhausted) error from the OpenRouter API."""
+
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"OpenRouter API error {status_code}: {detail}")
+
+
+class LLMClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+    ):
+        self.base_url = (base_url or ai_config.OPENROUTER_BASE_URL).rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency or ai_config.MAX_CONCURRENT_REQUESTS
+        self.timeout = timeout or ai_config.REQUEST_TIMEOUT_SECONDS
+        self.max_retries = max_retries if max_retries is not None else ai_config.MAX_RETRIES
+        self.retry_base_delay = retry_base_delay if retry_base_delay is not None else ai_config.RETRY_BASE_DELAY_SECONDS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self):
+        # the pool and semaphore belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+    @property
+    def in_flight(self) -> int:
+        if self._semaphore is None:
+            return 0
+        return self.max_concurrency - self._semaphore._value
+
+    async def aclose(self):
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = self.retry_base_delay * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key or ai_config.OPENROUTER_API_KEY}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "http://localhost:3000",
+            "X-Title": "Tutor Platform AI",
+        }
+
+    async def chat_completion(self, messages: List[Dict[str, Any]], model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        POST /chat/completions and return the decoded JSON body.
+
+        Raises:
+            OpenRouterError: On an error response once retries are exhausted
+            httpx.HTTPError: On network failures once retries are exhausted
+        """
+        self._ensure_started()
+        request_data = {"model": model or ai_config.OPENROUTER_MODEL, "messages": messages}
+        headers = self._headers()
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                # hold a slot only while the request is actually in flight, not while backing off
+                async with self._semaphore:
+                    response = await self._client.post(
+                        f"{self.base_url}/chat/completions", headers=headers, json=request_data
+                    )
+                if response.status_code < 400:
+                    return response.json()
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    raise OpenRouterError(response.status_code, _error_detail(response))
+                print(f"[AI] OpenRouter returned {response.status_code}, retry {attempt + 1}/{self.max_retries}")
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[AI] OpenRouter request failed ({e!r}), retry {attempt + 1}/{self.max_retries}")
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        raise AssertionError("unreachable")
+
+    async def stream_chat_completion(
+        self, messages: List[Dict[str, Any]], model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        POST /chat/completions with "stream": true and yield content deltas.
+
+        The concurrency slot is held only while the upstream response is being
+        read, not while the caller is busy with a delta. Closing the generator
+        early aborts the upstream request.
+
+        Raises:
+            OpenRouterError: On an error response (or an error sent mid-stream)
+            httpx.HTTPError: On network failures
+        """
+        self._ensure_started()
+        buffer: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for delta in self._read_stream(messages, model):
+                    buffer.put_nowait(delta)
+            finally:
+                buffer.put_nowait(_STREAM_DONE)
+
+        reader = asyncio.create_task(pump())
+        try:
+            while True:
+                delta = await buffer.get()
+                if delta is _STREAM_DONE:
+                    break
+                yield delta
+            await reader  # raises the upstream error, if any
+        finally:
+            if not reader.done():
+                reader.cancel()
+                try:
+                    await reader
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    async def _read_stream(self, messages: List[Dict[str, Any]], model: Optional[str]) -> AsyncIterator[str]:
+        """Content deltas of one streamed completion, read under a concurrency slot (with retries)."""
+        request_data = {"model": model or ai_config.OPENROUTER_MODEL, "messages": messages, "stream": True}
+        headers = self._headers()
+        started = False
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    async with self._client.stream(
+                        "POST", f"{self.base_url}/chat/completions", headers=headers, json=request_data
+                    ) as response:
+                        if response.status_code < 400:
+                            async for line in response.aiter_lines():
+                                delta = _parse_stream_line(line)
+                                if delta is None:
+                                    continue
+                                if delta is _STREAM_DONE:
+                                    return
+                                started = True
+                                yield delta
+                            return
+                        await response.aread()
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    raise OpenRouterError(response.status_code, _error_detail(response))
+                print(f"[AI] OpenRouter returned {response.status_code}, retry {attempt + 1}/{self.max_retries}")
+            except httpx.TransportError as e:
+                if started or attempt == self.max_retries:
+                    raise
+                print(f"[AI] OpenRouter stream failed ({e!r}), retry {attempt + 1}/{self.max_retries}")
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        raise AssertionError("unreachable")
+
+
+_STREAM_DONE = object()
+
+
+def _parse_stream_line(line: str):
+    """
+    Content delta from one SSE line, None for lines to skip, or _STREAM_DONE.
+
+    OpenRouter sends ": OPENROUTER PROCESSING" comments while the model is
+    queued, "data: {json}" chunks, and "data: [DONE]" at the end.
+    """
+    if not line.startswith("data:"):
+        return None
+    payload = line[len("data:"):].strip()
+    if payload == "[DONE]":
+        return _STREAM_DONE
+    try:
+        chunk = json.loads(payload)
+    except ValueError:
+        return None
+    error = chunk.get("error")
+    if error:
+        message = error.get("message", "Unknown API error") if isinstance(error, dict) else str(error)
+        code = error.get("code") if isinstance(error, dict) else None
+        raise OpenRouterError(code if isinstance(code, int) else 502, message)
+    choices = chunk.get("choices") or []
+    if not choices:
+        return None
+    content = (choices[0].get("delta") or {}).get("content")
+    return content or None
+
+
+def _error_detail(response: httpx.Response) -> str:
+    try:
+        error = response.json().get("error")
+        if isinstance(error, dict) and error.get("message"):
+            return error["message"]
+    except ValueError:
+        pass
+    return response.text
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """
+    Await awaitable, cancelling it if the HTTP client goes away first.
+
+    Raises:
+        asyncio.CancelledError: If the client disconnected
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print("[AI] Client disconnected, cancelling query")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise asyncio.CancelledError()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+llm_client = LLMClient()
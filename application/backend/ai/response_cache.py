@@ -0,0 +1,243 @@
+"""
+Response cache for repeated AI assistant questions.
+
+Most /api/ai/query prompts are near-duplicates ("find math tutors on
+Thursday"), and each one costs several LLM round trips plus SQL. Successful
+answers are cached under:
+
+- scope: the user role, plus the user id for tutors (their own profile is
+  excluded from results) and for prompts about the user's own data ("my
+  bookings", "what do I have...")
+- data version: a stamp from one query over the tables the assistant reads,
+  so new tutors, slots or bookings make older answers unreachable. The stamp
+  is computed in a worker thread and reused for AI_DATA_VERSION_TTL_SECONDS,
+  so a change can take that long to be noticed
+- the normalized prompt
+
+Lookup tries an exact match on the normalized prompt first and then the
+most similar cached prompt in the same scope and data version (Jaccard
+similarity of content tokens). A similar prompt only matches when its key
+terms (numbers such as course numbers or times, weekdays, times of day and
+capitalized words such as names or department codes) are exactly the same,
+since those change the answer while barely moving the similarity. Entries
+expire after a TTL, and the least recently used entry is evicted once the
+cache is full.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .config import ai_config
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "to", "in", "on", "at", "with",
+    "is", "are", "be", "can", "could", "would", "please", "show", "find", "get",
+    "list", "give", "me", "any", "some", "who", "what", "which", "there", "that",
+    "this", "all", "do", "does", "you",
+}
+# Prompts containing these are about the asking user's own data
+PERSONAL_WORDS = {"my", "mine", "myself", "i", "im", "ive", "id"}
+# Words that must match exactly for a near-duplicate prompt to share an answer
+KEY_WORDS = {
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "weekday", "weekend", "today", "tonight", "tomorrow", "morning", "afternoon",
+    "evening", "night", "am", "pm", "before", "after", "cheapest", "most", "least",
+    "not", "no", "without",
+}
+
+DATA_VERSION_QUERY = text("""
+    SELECT
+        (SELECT COUNT(*) FROM users),
+        (SELECT MAX(updated_at) FROM users),
+        (SELECT COUNT(*) FROM tutor_profiles),
+        (SELECT COUNT(*) FROM tutor_courses),
+        (SELECT COUNT(*) FROM courses),
+        (SELECT COUNT(*) FROM availability_slots),
+        (SELECT COUNT(*) FROM bookings),
+        (SELECT MAX(updated_at) FROM bookings)
+""")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9\s]", "", prompt.lower()).split())
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def prompt_tokens(normalized: str) -> FrozenSet[str]:
+    """Content tokens used for similarity matching."""
+    return frozenset(_stem(word) for word in normalized.split() if word not in STOPWORDS)
+
+
+def key_terms(prompt: str) -> FrozenSet[str]:
+    """
+    Terms a near-match must share exactly: numbers, KEY_WORDS and words
+    capitalized mid-sentence in the raw prompt (names, department codes).
+    """
+    terms = set()
+    sentence_start = True
+    for word in prompt.split():
+        token = re.sub(r"[^a-z0-9]", "", word.lower())
+        if token and (any(ch.isdigit() for ch in token) or _stem(token) in KEY_WORDS
+                      or (word[:1].isupper() and not sentence_start and token not in PERSONAL_WORDS)):
+            terms.add(_stem(token))
+        sentence_start = word.endswith((".", "!", "?"))
+    return frozenset(terms)
+
+
+def cache_scope(normalized: str, user_id: Optional[int], user_role: Optional[str]) -> Tuple:
+    """Which users may share an answer to this prompt."""
+    if user_id and (user_role == "tutor" or PERSONAL_WORDS & set(normalized.split())):
+        return (user_role, user_id)
+    return (user_role, None)
+
+
+def get_data_version(db: Session) -> Optional[Tuple]:
+    """Stamp that changes when the data the assistant reads changes; None if unavailable."""
+    try:
+        return tuple(str(value) for value in db.execute(DATA_VERSION_QUERY).one())
+    except Exception as e:
+        print(f"[AI cache] data version check failed: {e}")
+        return None
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class CacheEntry:
+    __slots__ = ("scope", "version", "normalized", "tokens", "key_terms", "response", "expires_at")
+
+    def __init__(self, scope, version, normalized, tokens, key_terms, response, expires_at):
+        self.scope = scope
+        self.version = version
+        self.normalized = normalized
+        self.tokens = tokens
+        self.key_terms = key_terms
+        self.response = response
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        data_version_ttl_seconds: Optional[float] = None,
+    ):
+        self.max_entries = max_entries or ai_config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or ai_config.RESPONSE_CACHE_TTL_SECONDS
+        self.similarity_threshold = similarity_threshold or ai_config.RESPONSE_CACHE_SIMILARITY
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.data_version_ttl_seconds = (
+            ai_config.DATA_VERSION_TTL_SECONDS if data_version_ttl_seconds is None else data_version_ttl_seconds
+        )
+        self._version: Optional[Tuple] = None
+        self._version_expires_at = 0.0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def data_version(self, db: Session) -> Optional[Tuple]:
+        """
+        get_data_version(), run in a worker thread so the event loop never waits
+        on the database, and reused for data_version_ttl_seconds.
+        """
+        now = time.monotonic()
+        if self._version is not None and self._version_expires_at > now:
+            return self._version
+        version = await asyncio.to_thread(get_data_version, db)
+        if version is not None:
+            self._version, self._version_expires_at = version, now + self.data_version_ttl_seconds
+        return version
+
+    def _key(self, scope, version, normalized) -> Tuple:
+        return (scope, version, normalized)
+
+    def _expire(self, now: float):
+        for key in [k for k, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[key]
+            self.expirations += 1
+
+    def get(self, prompt: str, version: Tuple, user_id: Optional[int] = None, user_role: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        normalized = normalize_prompt(prompt)
+        scope = cache_scope(normalized, user_id, user_role)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+
+            key = self._key(scope, version, normalized)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.response
+
+            tokens = prompt_tokens(normalized)
+            terms = key_terms(prompt)
+            best_key, best_score = None, 0.0
+            for candidate_key, candidate in self._entries.items():
+                if candidate.scope != scope or candidate.version != version or candidate.key_terms != terms:
+                    continue
+                score = jaccard(tokens, candidate.tokens)
+                if score > best_score:
+                    best_key, best_score = candidate_key, score
+            if best_key is not None and best_score >= self.similarity_threshold:
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                return self._entries[best_key].response
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt: str, version: Tuple, response: Dict[str, Any], user_id: Optional[int] = None, user_role: Optional[str] = None):
+        normalized = normalize_prompt(prompt)
+        scope = cache_scope(normalized, user_id, user_role)
+        key = self._key(scope, version, normalized)
+        entry = CacheEntry(scope, version, normalized, prompt_tokens(normalized), key_terms(prompt), response,
+                           time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._version = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+response_cache = ResponseCache()
@@ -1,9 +1,16 @@
 """
 FastAPI router for AI query endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from search.database import get_db
+from typing import Optional
+from auth.dependencies import get_optional_user, require_role
+from auth.tokens import TokenClaims
+from .database import get_ai_db
 from .schemas import (
     AIQueryRequest, 
     AIQueryResponse, 
@@ -14,12 +21,27 @@ from .schemas import (
 )
 from .sql_executor import SQLExecutor
 from .config import ai_config
+from .http_client import cancel_on_disconnect, llm_client
+from .schema_cache import schema_cache
+from .response_cache import response_cache
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
 
+def caller_identity(request: AIQueryRequest, caller: Optional[TokenClaims]):
+    """(user_id, user_role) for personalization: the signed token wins over the request body."""
+    if caller is not None:
+        return caller.user_id, caller.role
+    return request.user_id, request.user_role
+
+
 @router.post("/query", response_model=AIQueryResponse)
-async def ai_query(request: AIQueryRequest, db: Session = Depends(get_db)):
+async def ai_query(
+    request: AIQueryRequest,
+    http_request: Request,
+    db: Session = Depends(get_ai_db),
+    caller: Optional[TokenClaims] = Depends(get_optional_user)
+):
     """
     Process a natural language query using OpenRouter AI (DeepSeek R1).
     
@@ -30,16 +52,18 @@ async def ai_query(request: AIQueryRequest, db: Session = Depends(get_db)):
     4. Provide a helpful response
     
     Only SELECT queries are allowed - no data modification.
+    If the client disconnects, the in-flight LLM call is cancelled.
     """
     try:
         from .service import GeminiSQLService
         
         service = GeminiSQLService(db)
-        result = await service.query(
+        user_id, user_role = caller_identity(request, caller)
+        result = await cancel_on_disconnect(http_request, service.query(
             user_prompt=request.prompt,
-            user_id=request.user_id,
-            user_role=request.user_role
-        )
+            user_id=user_id,
+            user_role=user_role
+        ))
         
         # Convert to response model
         queries = [
@@ -58,7 +82,8 @@ async def ai_query(request: AIQueryRequest, db: Session = Depends(get_db)):
             response=result.get("response"),
             error=result.get("error"),
             queries_executed=queries,
-            function_calls=result.get("function_calls", 0)
+            function_calls=result.get("function_calls", 0),
+            cached=result.get("cached", False)
         )
         
     except ImportError as e:
@@ -90,17 +115,74 @@ async def ai_query(request: AIQueryRequest, db: Session = Depends(get_db)):
         )
 
 
+def format_sse(event: str, data) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/query/stream")
+async def ai_query_stream(
+    request: AIQueryRequest,
+    db: Session = Depends(get_ai_db),
+    caller: Optional[TokenClaims] = Depends(get_optional_user)
+):
+    """
+    Streaming variant of /query, as server-sent events.
+    
+    A status event is sent straight away, followed by query / query_result
+    progress events while SQL runs, token events carrying the answer text as
+    the model writes it, and finally a done event whose data has the same
+    shape as the /query response. Configuration errors are still returned as
+    plain HTTP errors before the stream starts.
+    
+    If the client disconnects, the stream (and the in-flight LLM call) is cancelled.
+    """
+    try:
+        from .service import GeminiSQLService
+        
+        service = GeminiSQLService(db)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=503, 
+            detail=f"AI service not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=503, 
+            detail=f"AI service configuration error: {str(e)}"
+        )
+    
+    user_id, user_role = caller_identity(request, caller)
+
+    async def events():
+        async for name, data in service.stream(
+            user_prompt=request.prompt,
+            user_id=user_id,
+            user_role=user_role
+        ):
+            if name == "done":
+                data = AIQueryResponse(**data).model_dump()
+            yield format_sse(name, data)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/schema", response_model=SchemaInfoResponse)
-async def get_schema(db: Session = Depends(get_db)):
+async def get_schema(db: Session = Depends(get_ai_db)):
     """
     Get database schema information.
     
     Returns table and column information for the database.
     Useful for understanding what data is available.
+    Served from the same per-process cache as the AI prompt context.
     """
     try:
-        executor = SQLExecutor(db)
-        result = executor.get_schema_info()
+        result = await asyncio.to_thread(schema_cache.get_schema, db)
         
         return SchemaInfoResponse(
             success=result.get("success", False),
@@ -114,8 +196,30 @@ async def get_schema(db: Session = Depends(get_db)):
         )
 
 
+@router.post("/schema/refresh")
+async def refresh_schema(admin: TokenClaims = Depends(require_role("admin"))):
+    """
+    Drop the cached schema snapshot and cached answers, e.g. after a manual
+    schema change. The next AI query or /schema call reloads it. Admin only.
+    """
+    schema_cache.invalidate()
+    response_cache.clear()
+    return {"success": True}
+
+
+@router.get("/cache-stats")
+async def cache_stats(admin: TokenClaims = Depends(require_role("admin"))):
+    """
+    Hit rates for the AI response cache and the schema cache (this worker only). Admin only.
+    """
+    return {
+        "response_cache": response_cache.stats(),
+        "schema_cache": schema_cache.stats()
+    }
+
+
 @router.post("/sql", response_model=SQLExecuteResponse)
-async def execute_sql(request: SQLExecuteRequest, db: Session = Depends(get_db)):
+async def execute_sql(request: SQLExecuteRequest, db: Session = Depends(get_ai_db)):
     """
     Execute a SQL SELECT query directly.
     
@@ -152,5 +256,8 @@ async def ai_health():
     return {
         "status": "ok" if has_api_key else "not_configured",
         "api_key_configured": has_api_key,
-        "model": ai_config.OPENROUTER_MODEL if has_api_key else None
+        "model": ai_config.OPENROUTER_MODEL if has_api_key else None,
+        "llm_requests_in_flight": llm_client.in_flight,
+        "llm_max_concurrency": llm_client.max_concurrency,
+        "schema_cache": schema_cache.stats()
     }
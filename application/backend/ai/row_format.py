@@ -0,0 +1,109 @@
+"""
+Row conversion for AI query results.
+
+Rows are converted to JSON-safe dicts with one converter per column, picked
+once per result set from the first non-NULL value in that column, instead
+of probing every value with hasattr(). DB-API type codes in
+cursor.description are driver specific (SQLite reports none at all), so the
+values themselves are the reliable type source.
+
+Results are passed back to the model as a compact CSV table rather than one
+JSON object per row, so column names are sent once instead of on every row.
+"""
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def _isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _format_timedelta(value: timedelta) -> str:
+    # MySQL TIME columns come back as timedelta; render as HH:MM:SS
+    total_seconds = int(value.total_seconds())
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _format_decimal(value: Decimal):
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def _decode_bytes(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace")
+
+
+CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    datetime: _isoformat,
+    date: _isoformat,
+    time: _isoformat,
+    timedelta: _format_timedelta,
+    Decimal: _format_decimal,
+    bytes: _decode_bytes,
+}
+# Values of these types are already JSON-safe
+PASSTHROUGH = (str, int, float, bool)
+
+
+def converter_for(value: Any) -> Optional[Callable[[Any], Any]]:
+    """Converter for a sample value, or None if it can be used as is."""
+    if isinstance(value, PASSTHROUGH):
+        return None
+    value_type = type(value)
+    if value_type in CONVERTERS:
+        return CONVERTERS[value_type]
+    for base, converter in CONVERTERS.items():
+        if isinstance(value, base):
+            return converter
+    if hasattr(value, "isoformat"):
+        return _isoformat
+    return str
+
+
+def convert_rows(columns: List[str], rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Convert fetched rows to JSON-safe dicts using per-column converters."""
+    converters: List[Optional[Callable[[Any], Any]]] = []
+    for index in range(len(columns)):
+        sample = next((row[index] for row in rows if row[index] is not None), None)
+        converters.append(converter_for(sample) if sample is not None else None)
+
+    if not any(converters):
+        return [dict(zip(columns, row)) for row in rows]
+
+    plan = list(zip(columns, converters))
+    try:
+        return [
+            {
+                column: value if converter is None or value is None else converter(value)
+                for (column, converter), value in zip(plan, row)
+            }
+            for row in rows
+        ]
+    except (AttributeError, TypeError, ValueError):
+        # a column mixed value types (possible with SQLite or untyped expressions)
+        return [
+            {column: _convert_value(value) for column, value in zip(columns, row)}
+            for row in rows
+        ]
+
+
+def _convert_value(value: Any) -> Any:
+    if value is None:
+        return None
+    converter = converter_for(value)
+    return value if converter is None else converter(value)
+
+
+def rows_to_prompt_table(columns: List[str], rows: List[Dict[str, Any]]) -> str:
+    """Compact CSV rendering of result rows for the LLM prompt (NULL as empty)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(["" if row.get(column) is None else row.get(column) for column in columns])
+    return buffer.getvalue()
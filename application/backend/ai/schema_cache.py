@@ -0,0 +1,119 @@
+"""
+Per-process cache of the database schema used as AI prompt context.
+
+The schema only changes when a migration is applied, so it is read from
+INFORMATION_SCHEMA once and the rendered prompt fragment is reused by every
+AI query. The snapshot is rebuilt when:
+- the SQL migrations directory changes (a file is added, removed or edited), or
+- invalidate() is called (e.g. through POST /api/ai/schema/refresh), or
+- AI_SCHEMA_CACHE_TTL_SECONDS is set and the snapshot is older than that.
+
+Failed lookups are never cached.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import ai_config
+from .sql_executor import SQLExecutor
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
+
+
+def migrations_fingerprint(migrations_dir: Path = MIGRATIONS_DIR) -> Tuple:
+    """Cheap version stamp for the schema: name, size and mtime of every .sql migration."""
+    try:
+        entries = sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(migrations_dir)
+            if entry.is_file() and entry.name.endswith(".sql")
+        )
+    except FileNotFoundError:
+        return ()
+    return tuple(entries)
+
+
+def format_schema_context(schema: Dict[str, Any]) -> str:
+    """Render schema info as the prompt fragment given to the AI."""
+    schema_text = "Database Schema:\n\n"
+    for table_name, table_info in schema.items():
+        schema_text += f"Table: {table_name}\n"
+        if table_info["description"]:
+            schema_text += f"Description: {table_info['description']}\n"
+        schema_text += "Columns:\n"
+        for col in table_info["columns"]:
+            key_info = f" ({col['key']})" if col['key'] else ""
+            nullable = " NULL" if col['nullable'] else " NOT NULL"
+            desc = f" - {col['description']}" if col['description'] else ""
+            schema_text += f"  - {col['name']}: {col['type']}{nullable}{key_info}{desc}\n"
+        schema_text += "\n"
+    return schema_text
+
+
+class SchemaCache:
+    def __init__(self, migrations_dir: Path = MIGRATIONS_DIR, ttl_seconds: Optional[float] = None):
+        self.migrations_dir = migrations_dir
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else ai_config.SCHEMA_CACHE_TTL_SECONDS
+        self._lock = threading.Lock()
+        self._schema: Optional[Dict[str, Any]] = None
+        self._prompt: Optional[str] = None
+        self._version: Optional[Tuple] = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._schema = None
+            self._prompt = None
+            self._version = None
+
+    def _is_fresh(self, version: Tuple) -> bool:
+        if self._schema is None or version != self._version:
+            return False
+        return not self.ttl_seconds or time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def get_schema(self, db: Session) -> Dict[str, Any]:
+        """
+        Schema info in the shape of SQLExecutor.get_schema_info().
+
+        Returns:
+            {"success": True, "schema": {...}} or {"success": False, "error": ...}
+        """
+        version = migrations_fingerprint(self.migrations_dir)
+        with self._lock:
+            if self._is_fresh(version):
+                self.hits += 1
+                return {"success": True, "schema": self._schema}
+
+            self.misses += 1
+            result = SQLExecutor(db).get_schema_info()
+            if result["success"]:
+                self._schema = result["schema"]
+                self._prompt = format_schema_context(self._schema)
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return result
+
+    def get_prompt(self, db: Session) -> str:
+        """Pre-rendered schema prompt fragment."""
+        result = self.get_schema(db)
+        if not result["success"]:
+            return "Unable to retrieve database schema."
+        with self._lock:
+            return self._prompt or format_schema_context(result["schema"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": self._schema is not None,
+            "tables": len(self._schema or {}),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+schema_cache = SchemaCache()
@@ -28,6 +28,7 @@ class AIQueryResponse(BaseModel):
     error: Optional[str] = None
     queries_executed: List[QueryExecution] = []
     function_calls: int = 0
+    cached: bool = False
 
 
 class SchemaInfoResponse(BaseModel):
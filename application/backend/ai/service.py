@@ -1,16 +1,26 @@
 """
 OpenRouter AI service for intelligent SQL query generation and execution.
 """
+import asyncio
 import json
-import time
 import re
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-import requests
 
 from .config import ai_config
+from .database import AISessionLocal
+from .http_client import LLMClient, llm_client as default_llm_client
+from .response_cache import ResponseCache, response_cache as default_response_cache
+from .schema_cache import schema_cache
+from .row_format import rows_to_prompt_table
 from .sql_executor import SQLExecutor
 
+SQL_PATTERN = r'<SQL>(.*?)</SQL>'
+SQL_OPEN_TAG = "<SQL>"
+
+# (event name, data) pairs produced while answering a prompt
+AIEvent = Tuple[str, Dict[str, Any]]
+
 
 class GeminiSQLService:
     """
@@ -18,35 +28,36 @@ class GeminiSQLService:
     generate SQL, execute it, and provide intelligent responses.
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        llm_client: Optional[LLMClient] = None,
+        response_cache: Optional[ResponseCache] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
         self.db = db
         self.sql_executor = SQLExecutor(db)
+        self.llm_client = llm_client or default_llm_client
+        self.response_cache = response_cache or default_response_cache
+        # Extra sessions for running several queries of one turn in parallel
+        self.session_factory = session_factory or AISessionLocal
         
         if not ai_config.OPENROUTER_API_KEY:
             raise ValueError(
                 "OPENROUTER_API_KEY environment variable is not set."
             )
     
+    def _release_connection(self):
+        """
+        End the request session's (read-only) transaction, handing its pooled
+        connection back while we wait on the model. The session checks out a
+        connection again the next time a query runs.
+        """
+        self.db.rollback()
+    
     def _get_schema_context(self) -> str:
-        """Get database schema as context for the AI."""
-        schema_info = self.sql_executor.get_schema_info()
-        if not schema_info["success"]:
-            return "Unable to retrieve database schema."
-        
-        schema_text = "Database Schema:\n\n"
-        for table_name, table_info in schema_info["schema"].items():
-            schema_text += f"Table: {table_name}\n"
-            if table_info["description"]:
-                schema_text += f"Description: {table_info['description']}\n"
-            schema_text += "Columns:\n"
-            for col in table_info["columns"]:
-                key_info = f" ({col['key']})" if col['key'] else ""
-                nullable = " NULL" if col['nullable'] else " NOT NULL"
-                desc = f" - {col['description']}" if col['description'] else ""
-                schema_text += f"  - {col['name']}: {col['type']}{nullable}{key_info}{desc}\n"
-            schema_text += "\n"
-        
-        return schema_text
+        """Get database schema as context for the AI (cached per process)."""
+        return schema_cache.get_prompt(self.db)
     
     def _create_tools_definition(self) -> List[Dict]:
         """Create OpenAI function calling tools definition."""
@@ -93,10 +104,59 @@ class GeminiSQLService:
         
         return {"success": False, "error": f"Unknown function: {function_call['name']}"}
     
+    def _summarize_result(self, result: Dict[str, Any]) -> str:
+        """Prompt text for one successful query result."""
+        row_count = result.get('row_count', 0)
+        rows = result.get('rows', [])
+        
+        if row_count == 0:
+            return "Query executed successfully but returned 0 rows. The data you're looking for might not exist, or the query conditions might be too restrictive."
+        
+        result_summary = f"Query executed successfully. Returned {row_count} rows.\n\n"
+        if rows:
+            # Compact CSV table: column names once, not per row
+            result_summary += "Results (CSV):\n"
+            result_summary += rows_to_prompt_table(result.get("columns") or list(rows[0]), rows[:10])
+            if row_count > 10:
+                result_summary += f"\n... and {row_count - 10} more rows"
+        return result_summary
+    
+    async def _execute_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run the queries from one model turn, off the event loop.
+        
+        A single query uses the request's session. Several queries each get their
+        own pooled session and run concurrently, at most MAX_PARALLEL_QUERIES at a
+        time. Results are returned in the order the queries were given.
+        """
+        for sql_query in queries:
+            print(f"[AI SQL] Executing: {sql_query}")
+        
+        if len(queries) == 1:
+            return [await asyncio.to_thread(self.sql_executor.execute_select, queries[0])]
+        
+        semaphore = asyncio.Semaphore(ai_config.MAX_PARALLEL_QUERIES)
+        
+        async def run(sql_query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self._execute_on_own_session, sql_query)
+        
+        return list(await asyncio.gather(*(run(sql_query) for sql_query in queries)))
+    
+    def _execute_on_own_session(self, sql_query: str) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            return SQLExecutor(db).execute_select(sql_query)
+        finally:
+            db.close()
+    
     async def query(self, user_prompt: str, user_id: int = None, user_role: str = None) -> Dict[str, Any]:
         """
         Process a natural language query, potentially executing SQL queries.
         
+        Answers to repeated (or near-identical) prompts are served from the
+        response cache while the underlying data is unchanged.
+        
         Args:
             user_prompt: The user's natural language question
             user_id: ID of the logged-in user for personalized responses
@@ -105,7 +165,105 @@ class GeminiSQLService:
         Returns:
             Dictionary with the AI's response and any queries executed
         """
-        schema_context = self._get_schema_context()
+        version = await self.response_cache.data_version(self.db) if ai_config.RESPONSE_CACHE_ENABLED else None
+        if version is not None:
+            cached = self.response_cache.get(user_prompt, version, user_id, user_role)
+            if cached is not None:
+                return {**cached, "cached": True}
+        
+        result = await self._answer(user_prompt, user_id, user_role)
+        
+        if version is not None and result.get("success"):
+            self.response_cache.put(user_prompt, version, result, user_id, user_role)
+        return result
+    
+    async def stream(self, user_prompt: str, user_id: int = None, user_role: str = None) -> AsyncIterator[AIEvent]:
+        """
+        Answer a prompt as a sequence of progress events.
+        
+        Events, in order:
+            status        - sent immediately, before any upstream call
+            query         - a generated SQL query (index, query)
+            query_result  - its outcome (index, success, row_count, error)
+            answer_reset  - discard the streamed text, the model asked for more SQL
+            token         - a piece of the final answer text
+            done          - the complete result, same shape as query()
+        """
+        yield "status", {"message": "Thinking..."}
+        
+        version = await self.response_cache.data_version(self.db) if ai_config.RESPONSE_CACHE_ENABLED else None
+        if version is not None:
+            cached = self.response_cache.get(user_prompt, version, user_id, user_role)
+            if cached is not None:
+                yield "token", {"text": cached.get("response") or ""}
+                yield "done", {**cached, "cached": True}
+                return
+        
+        result = None
+        async for name, data in self._answer_events(user_prompt, user_id, user_role, stream=True):
+            if name == "done":
+                result = data
+            yield name, data
+        
+        if version is not None and result is not None and result.get("success"):
+            self.response_cache.put(user_prompt, version, result, user_id, user_role)
+    
+    async def _answer(self, user_prompt: str, user_id: int = None, user_role: str = None) -> Dict[str, Any]:
+        """Run the LLM/SQL loop for a prompt (uncached)."""
+        async for name, data in self._answer_events(user_prompt, user_id, user_role):
+            if name == "done":
+                return data
+        raise AssertionError("unreachable")
+    
+    async def _completion_text(self, messages: List[Dict[str, Any]]) -> str:
+        """One non-streamed model turn."""
+        result = await self.llm_client.chat_completion(messages)
+        if "error" in result:
+            raise ValueError(result["error"].get("message", "Unknown API error"))
+        return result["choices"][0]["message"]["content"]
+    
+    async def _streamed_turn(self, messages: List[Dict[str, Any]], turn: Dict[str, Any]) -> AsyncIterator[AIEvent]:
+        """
+        One streamed model turn, yielding token events for answer text.
+        
+        Text is held back until it is clear the turn does not open with an
+        <SQL> tag, so query turns never reach the client as tokens. The full
+        text is left in turn["text"], and turn["streamed"] says whether any
+        of it was sent.
+        """
+        text = ""
+        streaming = False
+        async for delta in self.llm_client.stream_chat_completion(messages):
+            text += delta
+            if streaming:
+                yield "token", {"text": delta}
+                continue
+            head = text.lstrip().upper()
+            if len(head) < len(SQL_OPEN_TAG) and SQL_OPEN_TAG.startswith(head):
+                continue
+            if head.startswith(SQL_OPEN_TAG):
+                continue
+            streaming = True
+            yield "token", {"text": text.lstrip()}
+        
+        if not streaming and text.strip() and not re.search(SQL_PATTERN, text, re.DOTALL | re.IGNORECASE):
+            # short answer that never got past the hold-back
+            streaming = True
+            yield "token", {"text": text.strip()}
+        turn["text"] = text
+        turn["streamed"] = streaming
+    
+    async def _answer_events(
+        self, user_prompt: str, user_id: int = None, user_role: str = None, stream: bool = False
+    ) -> AsyncIterator[AIEvent]:
+        """
+        The LLM/SQL loop for a prompt, as events (see stream()).
+        
+        With stream=False the model is called without streaming and only
+        query, query_result and done events are produced.
+        """
+        # migrations scan + INFORMATION_SCHEMA queries on a miss: keep them off the event loop
+        schema_context = await asyncio.to_thread(self._get_schema_context)
         
         # Build user context for personalization
         user_context = ""
@@ -201,82 +359,40 @@ LIMIT 20
         ]
         
         executed_queries = []
-        max_retries = 3
-        base_delay = 5
         max_iterations = 3
         
         try:
             for iteration in range(max_iterations):
-                # Call OpenRouter API
-                for attempt in range(max_retries):
-                    try:
-                        request_data = {
-                            "model": ai_config.OPENROUTER_MODEL,
-                            "messages": messages
-                        }
-                        
-                        print(f"[AI] Sending request to OpenRouter with {len(messages)} messages")
-                        
-                        response = requests.post(
-                            f"{ai_config.OPENROUTER_BASE_URL}/chat/completions",
-                            headers={
-                                "Authorization": f"Bearer {ai_config.OPENROUTER_API_KEY}",
-                                "Content-Type": "application/json",
-                                "HTTP-Referer": "http://localhost:3000",
-                                "X-Title": "Tutor Platform AI"
-                            },
-                            json=request_data,
-                            timeout=60
-                        )
-                        
-                        # Log error details if request fails
-                        if not response.ok:
-                            error_detail = response.text
-                            print(f"[AI] OpenRouter error {response.status_code}: {error_detail}")
-                            try:
-                                error_json = response.json()
-                                if "error" in error_json:
-                                    error_detail = error_json["error"].get("message", error_detail)
-                            except:
-                                pass
-                            raise ValueError(f"OpenRouter API error: {error_detail}")
-                        
-                        break
-                    except requests.exceptions.RequestException as e:
-                        error_str = str(e)
-                        if "429" in error_str or "rate" in error_str.lower():
-                            if attempt < max_retries - 1:
-                                delay = base_delay * (2 ** attempt)
-                                print(f"[AI] Rate limited, waiting {delay}s before retry {attempt + 1}/{max_retries}")
-                                time.sleep(delay)
-                            else:
-                                raise
-                        else:
-                            raise
-                
-                result = response.json()
-                
-                if "error" in result:
-                    return {
-                        "success": False,
-                        "error": result["error"].get("message", "Unknown API error"),
-                        "queries_executed": executed_queries
-                    }
-                
-                choice = result["choices"][0]
-                ai_response = choice["message"]["content"]
+                # Call OpenRouter API (pooled, concurrency-limited, non-blocking retries)
+                print(f"[AI] Sending request to OpenRouter with {len(messages)} messages")
+                # don't hold an AI pool connection across the LLM round trip
+                self._release_connection()
+                if stream:
+                    turn = {}
+                    async for event in self._streamed_turn(messages, turn):
+                        yield event
+                    ai_response = turn["text"]
+                else:
+                    turn = {"streamed": False}
+                    ai_response = await self._completion_text(messages)
                 
                 # Extract SQL queries from the response
-                sql_pattern = r'<SQL>(.*?)</SQL>'
-                sql_queries = re.findall(sql_pattern, ai_response, re.DOTALL | re.IGNORECASE)
+                sql_queries = re.findall(SQL_PATTERN, ai_response, re.DOTALL | re.IGNORECASE)
                 
                 if sql_queries:
-                    # Execute the SQL queries
-                    for sql_query in sql_queries:
-                        sql_query = sql_query.strip()
-                        print(f"[AI SQL] Executing: {sql_query}")
-                        
-                        result = self.sql_executor.execute_select(sql_query)
+                    if turn["streamed"]:
+                        yield "answer_reset", {}
+                    
+                    # Independent queries from one turn run concurrently, results kept in order
+                    queries = [sql_query.strip() for sql_query in sql_queries]
+                    offset = len(executed_queries)
+                    for index, sql_query in enumerate(queries, offset + 1):
+                        yield "query", {"index": index, "query": sql_query}
+                    results = await self._execute_queries(queries)
+                    
+                    summaries = []
+                    failures = []
+                    for index, (sql_query, result) in enumerate(zip(queries, results), 1):
                         executed_queries.append({
                             "query": sql_query,
                             "success": result.get("success", False),
@@ -284,52 +400,46 @@ LIMIT 20
                             "rows": result.get("rows", []) if result.get("success") else [],
                             "error": result.get("error") if not result.get("success") else None
                         })
+                        yield "query_result", {
+                            "index": offset + index,
+                            "success": executed_queries[-1]["success"],
+                            "row_count": executed_queries[-1]["row_count"],
+                            "error": executed_queries[-1]["error"]
+                        }
                         
-                        # Add the query results to the conversation for the AI to use
+                        label = f"Query {index}: " if len(queries) > 1 else ""
                         if result.get("success"):
-                            row_count = result.get('row_count', 0)
-                            rows = result.get('rows', [])
-                            
-                            if row_count == 0:
-                                result_summary = "Query executed successfully but returned 0 rows. The data you're looking for might not exist, or the query conditions might be too restrictive."
-                            else:
-                                result_summary = f"Query executed successfully. Returned {row_count} rows.\n\n"
-                                if rows:
-                                    # Format results in a readable way
-                                    result_summary += "Results:\n"
-                                    for idx, row in enumerate(rows[:10], 1):
-                                        result_summary += f"{idx}. {json.dumps(row)}\n"
-                                    if row_count > 10:
-                                        result_summary += f"\n... and {row_count - 10} more rows"
-                            
-                            messages.append({"role": "assistant", "content": ai_response})
-                            messages.append({"role": "user", "content": f"{result_summary}\n\nBased on ONLY these results, provide a brief summary. CRITICAL: Use ONLY the names and details from the results above. Do NOT invent any tutor names. Say 'Here are the tutors...' and list ONLY what the data shows."})
-                            break  # Get AI's interpretation of results
+                            summaries.append(label + self._summarize_result(result))
                         else:
                             error_msg = result.get('error', 'Unknown error')
                             print(f"[AI SQL] Query failed: {error_msg}")
-                            messages.append({"role": "assistant", "content": ai_response})
-                            messages.append({"role": "user", "content": f"That query failed with error: {error_msg}. Please write a corrected query or try a simpler approach."})
-                            break  # Let AI try again
+                            failures.append(f"{label}That query failed with error: {error_msg}.")
                     
-                    # If we executed queries, continue to get the final answer
-                    if executed_queries:
-                        continue
+                    # Add the query results to the conversation for the AI to use
+                    messages.append({"role": "assistant", "content": ai_response})
+                    if summaries:
+                        # Get AI's interpretation of results
+                        messages.append({"role": "user", "content": "\n\n".join(summaries + failures) + "\n\nBased on ONLY these results, provide a brief summary. CRITICAL: Use ONLY the names and details from the results above. Do NOT invent any tutor names. Say 'Here are the tutors...' and list ONLY what the data shows."})
+                    else:
+                        # Let AI try again
+                        messages.append({"role": "user", "content": " ".join(failures) + " Please write a corrected query or try a simpler approach."})
+                    continue
                 
                 # No SQL queries found, this is the final response
                 # Remove SQL tags from the response for cleaner output
-                clean_response = re.sub(r'<SQL>.*?</SQL>', '', ai_response, flags=re.DOTALL | re.IGNORECASE).strip()
+                clean_response = re.sub(SQL_PATTERN, '', ai_response, flags=re.DOTALL | re.IGNORECASE).strip()
                 
-                return {
+                yield "done", {
                     "success": True,
                     "response": clean_response if clean_response else ai_response,
                     "queries_executed": executed_queries,
                     "function_calls": len(executed_queries)
                 }
+                return
             
             # If we exit the loop, return what we have
-            clean_response = re.sub(r'<SQL>.*?</SQL>', '', ai_response, flags=re.DOTALL | re.IGNORECASE).strip()
-            return {
+            clean_response = re.sub(SQL_PATTERN, '', ai_response, flags=re.DOTALL | re.IGNORECASE).strip()
+            yield "done", {
                 "success": True,
                 "response": clean_response if clean_response else ai_response,
                 "queries_executed": executed_queries,
@@ -337,7 +447,7 @@ LIMIT 20
             }
             
         except Exception as e:
-            return {
+            yield "done", {
                 "success": False,
                 "error": str(e),
                 "queries_executed": executed_queries
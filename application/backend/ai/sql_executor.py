@@ -2,10 +2,46 @@
 Safe SQL executor that only allows SELECT queries.
 """
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from .config import ai_config
+from .row_format import convert_rows
+
+# Trailing "LIMIT n", "LIMIT offset, n" or "LIMIT n OFFSET m" of the outer query
+LIMIT_PATTERN = re.compile(r"\bLIMIT\s+(\d+)(?:\s*,\s*(\d+)|\s+OFFSET\s+\d+)?\s*$", re.IGNORECASE)
+# MySQL error raised when MAX_EXECUTION_TIME is exceeded
+TIMEOUT_ERROR_CODE = "3024"
+
+
+def apply_row_limit(query: str, max_rows: int) -> str:
+    """
+    Make sure the outer query returns at most max_rows rows, so the database
+    stops producing rows instead of computing a result we would discard.
+    An existing smaller LIMIT is kept; a larger one is clamped.
+    """
+    stripped = query.strip().rstrip(";").rstrip()
+    match = LIMIT_PATTERN.search(stripped)
+    if not match:
+        return f"{stripped}\nLIMIT {max_rows}"
+    # "LIMIT offset, count" puts the row count second
+    group = 2 if match.group(2) else 1
+    if int(match.group(group)) <= max_rows:
+        return stripped
+    return stripped[:match.start(group)] + str(max_rows) + stripped[match.end(group):]
+
+
+def estimate_plan_rows(plan: List[Dict[str, Any]]) -> int:
+    """
+    Rough row estimate for a MySQL EXPLAIN: tables within one SELECT are joined
+    by nested loops, so their row estimates multiply; separate SELECTs (subqueries,
+    UNION branches) add up.
+    """
+    per_select: Dict[Any, int] = {}
+    for step in plan:
+        rows = step.get("rows") or 1
+        per_select[step.get("id")] = per_select.get(step.get("id"), 1) * int(rows)
+    return sum(per_select.values())
 
 
 class SQLValidator:
@@ -85,41 +121,33 @@ class SQLExecutor:
                 "query": query
             }
         
+        max_rows = ai_config.MAX_QUERY_RESULTS
+        # One extra row tells us whether there are more results
+        limited_query = apply_row_limit(query, max_rows + 1)
+        
         try:
+            rejection = self.check_plan_cost(limited_query)
+            if rejection:
+                return {
+                    "success": False,
+                    "error": rejection,
+                    "query": query
+                }
+            
             # Execute the query
-            result = self.db.execute(text(query))
+            result = self.db.execute(text(limited_query))
             
             # Get column names
             columns = list(result.keys())
             
             # Fetch results with limit
-            rows = result.fetchmany(ai_config.MAX_QUERY_RESULTS)
+            rows = result.fetchmany(max_rows + 1)
+            has_more = len(rows) > max_rows
+            rows = rows[:max_rows]
             
-            # Convert rows to list of dicts for JSON serialization
-            rows_as_dicts = []
-            for row in rows:
-                row_dict = {}
-                for col, value in zip(columns, row):
-                    # Convert non-JSON-serializable types to strings
-                    if value is not None:
-                        # Handle datetime/date/time/timedelta objects
-                        if hasattr(value, 'isoformat'):
-                            row_dict[col] = value.isoformat()
-                        elif hasattr(value, 'total_seconds'):  # timedelta
-                            # Convert timedelta to HH:MM:SS format
-                            total_seconds = int(value.total_seconds())
-                            hours = total_seconds // 3600
-                            minutes = (total_seconds % 3600) // 60
-                            seconds = total_seconds % 60
-                            row_dict[col] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                        else:
-                            row_dict[col] = value
-                    else:
-                        row_dict[col] = value
-                rows_as_dicts.append(row_dict)
-            
-            # Check if there are more results
-            has_more = len(rows) == ai_config.MAX_QUERY_RESULTS
+            # Convert rows to list of dicts for JSON serialization,
+            # with converters chosen once per column
+            rows_as_dicts = convert_rows(columns, rows)
             
             return {
                 "success": True,
@@ -131,12 +159,37 @@ class SQLExecutor:
             }
             
         except Exception as e:
+            error = str(e)
+            if TIMEOUT_ERROR_CODE in error or "maximum statement execution time" in error.lower():
+                error = (
+                    f"Query exceeded the {ai_config.QUERY_TIMEOUT_MS} ms time limit. "
+                    "Use more selective filters or fewer joins."
+                )
             return {
                 "success": False,
-                "error": str(e),
+                "error": error,
                 "query": query
             }
     
+    def check_plan_cost(self, query: str) -> Optional[str]:
+        """
+        EXPLAIN the query and return an error message if the optimizer expects it
+        to examine more than MAX_ESTIMATED_ROWS rows (MySQL only).
+        """
+        if not ai_config.MAX_ESTIMATED_ROWS or self.db.get_bind().dialect.name != "mysql":
+            return None
+        result = self.db.execute(text(f"EXPLAIN {query}"))
+        keys = list(result.keys())
+        plan = [dict(zip(keys, row)) for row in result]
+        estimate = estimate_plan_rows(plan)
+        if estimate > ai_config.MAX_ESTIMATED_ROWS:
+            print(f"[AI SQL] Rejected plan with ~{estimate} rows: {query}")
+            return (
+                f"Query rejected: it would examine an estimated {estimate:,} rows "
+                f"(limit {ai_config.MAX_ESTIMATED_ROWS:,}). Add JOIN conditions or more selective filters."
+            )
+        return None
+    
     def get_schema_info(self) -> Dict[str, Any]:
         """
         Get database schema information to help the AI understand the structure.
@@ -155,32 +208,30 @@ class SQLExecutor:
             tables_result = self.db.execute(text(tables_query))
             tables = [{"table_name": row[0], "description": row[1]} for row in tables_result]
             
-            # Get column information for each table
-            schema_info = {}
-            for table in tables:
-                table_name = table["table_name"]
-                columns_query = f"""
-                    SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_COMMENT
-                    FROM INFORMATION_SCHEMA.COLUMNS 
-                    WHERE TABLE_SCHEMA = DATABASE() 
-                    AND TABLE_NAME = '{table_name}'
-                    ORDER BY ORDINAL_POSITION
-                """
-                columns_result = self.db.execute(text(columns_query))
-                columns = [
-                    {
-                        "name": row[0],
-                        "type": row[1],
-                        "nullable": row[2] == "YES",
-                        "key": row[3],
-                        "description": row[4]
-                    }
-                    for row in columns_result
-                ]
-                schema_info[table_name] = {
+            # Get column information for all tables in one round trip
+            columns_query = """
+                SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_COMMENT
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = DATABASE() 
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """
+            columns_by_table: Dict[str, List[Dict[str, Any]]] = {}
+            for row in self.db.execute(text(columns_query)):
+                columns_by_table.setdefault(row[0], []).append({
+                    "name": row[1],
+                    "type": row[2],
+                    "nullable": row[3] == "YES",
+                    "key": row[4],
+                    "description": row[5]
+                })
+            
+            schema_info = {
+                table["table_name"]: {
                     "description": table["description"],
-                    "columns": columns
+                    "columns": columns_by_table.get(table["table_name"], [])
                 }
+                for table in tables
+            }
             
             return {
                 "success": True,
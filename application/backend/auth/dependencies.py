@@ -0,0 +1,91 @@
+"""
+FastAPI dependencies for the calling user.
+
+    @router.post("/send")
+    def send(req: MessageInfo, user: TokenClaims = Depends(get_current_user)):
+        ...
+
+The user comes from the signed token in "Authorization: Bearer <token>"
+(see auth/tokens.py), which costs no database query. Until every client sends
+the token, a request without one may still name its user with ?user_id=; that
+legacy path looks the user up (directly, not through the identity cache, so a
+soft delete takes effect at once) and can be turned off with
+AUTH_ALLOW_LEGACY_USER_ID=false.
+"""
+import os
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from auth.services.auth_service import get_user_by_id
+from auth.tokens import InvalidToken, TokenClaims, ensure_token_secret, read_token
+from search.database import get_db
+
+AUTH_ALLOW_LEGACY_USER_ID = os.getenv("AUTH_ALLOW_LEGACY_USER_ID", "true").lower() == "true"
+# Pre-signing tokens looked like "token-12"; they carry no proof, so they are ignored
+LEGACY_TOKEN_PREFIX = "token-"
+
+ensure_token_secret(AUTH_ALLOW_LEGACY_USER_ID)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[TokenClaims]:
+    """
+    Claims from the bearer token, or None when no token was sent.
+
+    While the legacy ?user_id= fallback is allowed, an invalid or expired
+    token counts as no token (e.g. one signed before a secret change), so the
+    request falls through to the legacy path instead of failing.
+
+    Raises:
+        HTTPException: 401 for a tampered with or expired token, once legacy mode is off
+    """
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token or token in ("null", "undefined") or token.startswith(LEGACY_TOKEN_PREFIX):
+        return None
+    try:
+        return read_token(token)
+    except InvalidToken as e:
+        if AUTH_ALLOW_LEGACY_USER_ID:
+            return None
+        raise _unauthorized(f"Invalid token: {e}")
+
+
+def get_current_user(
+    claims: Optional[TokenClaims] = Depends(get_optional_user),
+    user_id: Optional[int] = Query(None, description="Legacy: the caller's user id when no token is sent"),
+    db: Session = Depends(get_db),
+) -> TokenClaims:
+    """
+    The calling user, from the bearer token or the legacy user_id parameter.
+
+    Raises:
+        HTTPException: 401 without credentials (400 "user_id not found" while
+            the legacy parameter is allowed), 404 for an unknown legacy user_id
+    """
+    if claims is not None:
+        return claims
+    if not AUTH_ALLOW_LEGACY_USER_ID:
+        raise _unauthorized("Not authenticated")
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="user_id not found")
+    user = get_user_by_id(db, user_id)
+    if not user or user.is_deleted:
+        raise HTTPException(status_code=404, detail="sender id not found")
+    return TokenClaims(user_id=user.user_id, role=user.role, expires_at=0)
+
+
+def require_role(*roles: str):
+    """Dependency factory: the calling user, who must have one of roles (403 otherwise)."""
+    def dependency(user: TokenClaims = Depends(get_current_user)) -> TokenClaims:
+        if user.role not in roles:
+            raise HTTPException(status_code=403, detail="Not allowed for this role")
+        return user
+    return dependency
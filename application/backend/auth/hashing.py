@@ -0,0 +1,162 @@
+"""
+Password hashing off the request path.
+
+argon2 is deliberately CPU and memory heavy, so hashing and verification run
+in a small, bounded process pool instead of the request threadpool. A login
+burst then costs at most PASSWORD_HASH_WORKERS cores. Callers wait on a
+future, and only PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE calls can
+be in flight. Anything beyond that fails fast with HashingBusy (the routers
+answer 503) instead of queueing behind everyone else.
+
+The argon2 cost parameters are set here and nowhere else (ARGON2_* env vars),
+and pwd_context is the one CryptContext the app hashes with. Existing hashes
+keep their own parameters and still verify after a change; verify_and_update()
+also returns a fresh hash when the stored one uses other parameters, so logins
+move users onto the current cost without a password reset.
+
+PASSWORD_HASH_WORKERS=0 runs everything inline, which is handy for tests and
+local development.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# argon2id cost parameters (passlib/argon2-cffi defaults)
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Calls allowed to wait for a free worker before new ones are rejected
+HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", str(max(HASH_WORKERS, 1) * 8)))
+HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+
+def build_context(time_cost: int = ARGON2_TIME_COST, memory_cost: int = ARGON2_MEMORY_COST,
+                  parallelism: int = ARGON2_PARALLELISM) -> CryptContext:
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+pwd_context = build_context()
+
+
+class HashingBusy(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+# Run inside pool workers (module-level so they can be pickled)
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    try:
+        return pwd_context.verify(password, password_hash)
+    except (ValueError, TypeError):
+        # malformed or unknown hash in the database
+        return False
+
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, password_hash)
+    except (ValueError, TypeError):
+        return False, None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# separate lock: done callbacks run inside shutdown(), which holds _pool_lock
+_in_flight_lock = threading.Lock()
+_in_flight = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a process that is running an event loop and threads
+            _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _release(future=None):
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def _run(fn, *args):
+    global _in_flight
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+
+    with _in_flight_lock:
+        if _in_flight >= HASH_WORKERS + HASH_MAX_QUEUE:
+            raise HashingBusy("password hashing is saturated")
+        _in_flight += 1
+    try:
+        future = _get_pool().submit(fn, *args)
+    except BaseException:
+        _release()
+        raise
+    # A call that timed out may still be running in a worker, so its slot is
+    # only freed once the future is really finished (or cancelled)
+    future.add_done_callback(_release)
+    try:
+        return future.result(timeout=HASH_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        future.cancel()
+        raise HashingBusy("password hashing timed out")
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the current argon2 parameters.
+
+    Raises:
+        HashingBusy: The pool is saturated or the call timed out
+    """
+    return _run(_hash, password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """
+    Check a password against a stored hash; malformed hashes never match.
+
+    Raises:
+        HashingBusy: The pool is saturated or the call timed out
+    """
+    return _run(_verify, password, password_hash)
+
+
+def verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password and, if it matches a hash made with outdated argon2
+    parameters, rehash it with the current ones (same worker call).
+
+    Returns:
+        (matches, new hash to store or None)
+
+    Raises:
+        HashingBusy: The pool is saturated or the call timed out
+    """
+    return _run(_verify_and_update, password, password_hash)
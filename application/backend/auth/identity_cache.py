@@ -0,0 +1,160 @@
+"""
+Short-lived cache of user and tutor profile summaries.
+
+Chat, the tutor profile editors and the admin pages keep looking up the same
+users and tutor profiles by primary key, often several times within a second.
+This cache keeps small, immutable summaries of those rows (never ORM objects,
+so nothing is tied to a session or thread) keyed by id. Entries expire after
+IDENTITY_CACHE_TTL_SECONDS, and the least recently used one is evicted once
+IDENTITY_CACHE_MAX_ENTRIES is reached.
+
+Writers call invalidate_user() / invalidate_tutor_profile() after committing
+profile updates, role changes and soft deletes. The cache is per process, so
+other uvicorn workers only see a change once their entry expires. That is why
+the TTL is short and why only display and existence checks go through here,
+never authorization decisions that must be current.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from search.models.tutor_profile import TutorProfile
+from search.models.user import User
+
+IDENTITY_CACHE_ENABLED = os.getenv("IDENTITY_CACHE_ENABLED", "true").lower() == "true"
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30"))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "4096"))
+
+
+@dataclass(frozen=True)
+class UserSummary:
+    user_id: int
+    first_name: str
+    last_name: str
+    sfsu_email: str
+    role: str
+    is_deleted: bool
+
+
+@dataclass(frozen=True)
+class TutorProfileSummary:
+    tutor_id: int
+    status: str
+    bio: Optional[str]
+    hourly_rate_cents: int
+    languages: Optional[str]
+    profile_image_path_full: Optional[str]
+    profile_image_path_thumb: Optional[str]
+
+    # same parsing as the model ("English, Korean" -> ["English", "Korean"])
+    get_languages = TutorProfile.get_languages
+
+
+def _load_user(db: Session, user_id: int) -> Optional[UserSummary]:
+    row = db.query(
+        User.user_id, User.first_name, User.last_name, User.sfsu_email, User.role, User.is_deleted
+    ).filter(User.user_id == user_id).first()
+    return UserSummary(*row) if row else None
+
+
+def load_tutor_profile(db: Session, tutor_id: int) -> Optional[TutorProfileSummary]:
+    """Read a tutor profile summary straight from the database, bypassing the cache."""
+    row = db.query(
+        TutorProfile.tutor_id, TutorProfile.status, TutorProfile.bio, TutorProfile.hourly_rate_cents,
+        TutorProfile.languages, TutorProfile.profile_image_path_full, TutorProfile.profile_image_path_thumb
+    ).filter(TutorProfile.tutor_id == tutor_id).first()
+    return TutorProfileSummary(*row) if row else None
+
+
+class IdentityCache:
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        self.ttl_seconds = IDENTITY_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or IDENTITY_CACHE_MAX_ENTRIES
+        self.enabled = IDENTITY_CACHE_ENABLED if enabled is None else enabled
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by every invalidation, so a load that raced one isn't stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key: Tuple[str, int], db: Session, loader: Callable[[Session, int], Any]):
+        if not self.enabled:
+            return loader(db, key[1])
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader(db, key[1])
+        if value is None:
+            # missing rows aren't cached: a new user may take the id any moment
+            return None
+        with self._lock:
+            if generation != self._generation:
+                return value
+            self._entries[key] = (value, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def get_user(self, db: Session, user_id: int) -> Optional[UserSummary]:
+        """Summary of a user (including soft-deleted ones), or None if there is no such user."""
+        return self._get(("user", user_id), db, _load_user)
+
+    def get_tutor_profile(self, db: Session, tutor_id: int) -> Optional[TutorProfileSummary]:
+        """Summary of a tutor profile, or None if the user has no profile."""
+        return self._get(("tutor_profile", tutor_id), db, load_tutor_profile)
+
+    def invalidate_user(self, *user_ids: int):
+        """Drop cached user and tutor profile entries, e.g. after a role change or soft delete."""
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(("user", user_id), None)
+                self._entries.pop(("tutor_profile", user_id), None)
+
+    def invalidate_tutor_profile(self, *tutor_ids: int):
+        with self._lock:
+            self._generation += 1
+            for tutor_id in tutor_ids:
+                self._entries.pop(("tutor_profile", tutor_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+identity_cache = IdentityCache()
+
+
+def get_identity_cache() -> IdentityCache:
+    """FastAPI dependency for the process-wide identity cache."""
+    return identity_cache
@@ -2,8 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from search.database import get_db
 from auth.schemas.auth_schemas import UserIn, TokenResponse
-from auth.services.auth_service import authenticate_user, get_user, get_user_by_id
-from auth.password_utils import validate_sfsu_email, make_simple_token
+from auth.services.auth_service import authenticate_user, get_user
+from auth.password_utils import validate_sfsu_email
+from auth.tokens import make_token
+from auth.identity_cache import IdentityCache, get_identity_cache
+from auth.hashing import HashingBusy
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
@@ -12,19 +15,29 @@ def login(req: UserIn, db: Session = Depends(get_db)):
     if not validate_sfsu_email(req.email):
         return {"message": "Not a valid @sfsu.edu email."}
 
-    auth_result = authenticate_user(db, req.email, req.password)
+    try:
+        auth_result = authenticate_user(db, req.email, req.password)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail={"message": "Too many logins right now, try again shortly"},
+                            headers={"Retry-After": "1"})
     if auth_result is None:
         raise HTTPException(status_code=401, detail={"message": "Invalid email or password"})
 
     user = auth_result
-    token = make_simple_token(user.user_id)
+    # signed and expiring; carries user_id and role so requests need no user lookup
+    token = make_token(user.user_id, user.role)
     return {
         "token": token, 
         "user_id": user.user_id}
 
 @router.get("/users/{user_id}")
-def get_user_by_id_route(user_id: int, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id)
+def get_user_by_id_route(
+    user_id: int,
+    db: Session = Depends(get_db),
+    identities: IdentityCache = Depends(get_identity_cache)
+):
+    # called for every chat partner and after each login; served from the identity cache
+    user = identities.get_user(db, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="user not found")
@@ -1,15 +1,13 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from search.models.user import User
-from passlib.context import CryptContext
+from auth.hashing import verify_and_update
 import hashlib
 '''
 Known User 
 email: tim.jim@sfsu.edu
 pw: test12
 '''
-pwd_context = CryptContext(schemes =["argon2"], deprecated="auto")
-
 def get_user(db: Session, email:str):
     return db.query(User).filter(
         func.lower(User.sfsu_email) == func.lower(email),
@@ -28,8 +26,19 @@ def authenticate_user(db: Session, email:str, password:str):
         print("no user found for email:", email)
         return None
     print("hash in DB: ", user.password_hash)
-    if not pwd_context.verify(password, user.password_hash):
+    # runs in the hashing pool; raises HashingBusy when it is saturated
+    matches, new_hash = verify_and_update(password, user.password_hash)
+    if not matches:
         print("pwd hash verification failed")
         return None
+
+    if new_hash:
+        # stored hash used older argon2 parameters; upgrade it while we have the password
+        user.password_hash = new_hash
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print("password rehash failed:", e)
     
     return user
@@ -0,0 +1,120 @@
+"""
+Signed, expiring session tokens.
+
+A token carries the user id, role and expiry, signed with HMAC-SHA256:
+
+    base64url(json payload) + "." + base64url(signature)
+
+Checking one is a constant-time signature compare and a clock check, so
+authenticated endpoints need no database query to know who is calling.
+Because nothing is looked up, a role change or soft delete only takes effect
+when the token expires (AUTH_TOKEN_TTL_SECONDS), so keep the TTL modest.
+
+AUTH_TOKEN_SECRET must be set, and be the same on every worker. Without it
+a random secret is generated per process, which is only fine for a single
+local worker that still accepts the legacy ?user_id= fallback; in any other
+setup ensure_token_secret() refuses to start.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AUTH_TOKEN_SECRET = os.getenv("AUTH_TOKEN_SECRET") or secrets.token_urlsafe(32)
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", "43200"))  # 12 hours
+
+
+def _worker_count() -> int:
+    """Uvicorn worker count, from WEB_CONCURRENCY or --workers (workers inherit the parent's argv)."""
+    workers = os.getenv("WEB_CONCURRENCY", "1")
+    argv = sys.argv
+    for index, arg in enumerate(argv):
+        if arg == "--workers" and index + 1 < len(argv):
+            workers = argv[index + 1]
+        elif arg.startswith("--workers="):
+            workers = arg.split("=", 1)[1]
+    try:
+        return int(workers)
+    except ValueError:
+        return 1
+
+
+def ensure_token_secret(allow_legacy: bool):
+    """
+    Refuse to start with a per-process random secret where tokens would break:
+    with several workers (a token only verifies on the worker that issued it)
+    or without the legacy fallback (every restart would log everyone out).
+
+    Raises:
+        RuntimeError: AUTH_TOKEN_SECRET is not set and it is required
+    """
+    if os.getenv("AUTH_TOKEN_SECRET"):
+        return
+    if not allow_legacy or _worker_count() > 1:
+        raise RuntimeError(
+            "AUTH_TOKEN_SECRET must be set (same value on every worker) when running several "
+            "workers or with AUTH_ALLOW_LEGACY_USER_ID=false"
+        )
+    print("WARNING: AUTH_TOKEN_SECRET is not set; session tokens won't survive a restart")
+
+
+class InvalidToken(Exception):
+    """Malformed, tampered with or expired token."""
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    user_id: int
+    role: str
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def make_token(user_id: int, role: str, ttl_seconds: Optional[int] = None, secret: Optional[str] = None) -> str:
+    """Issue a token for user_id/role valid for ttl_seconds (default AUTH_TOKEN_TTL_SECONDS)."""
+    expires_at = int(time.time()) + (AUTH_TOKEN_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+    payload = _b64encode(json.dumps({"sub": user_id, "role": role, "exp": expires_at}, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload, secret or AUTH_TOKEN_SECRET)}"
+
+
+def read_token(token: str, secret: Optional[str] = None) -> TokenClaims:
+    """
+    Verify a token's signature and expiry.
+
+    Raises:
+        InvalidToken: The token is malformed, its signature doesn't match or it has expired
+    """
+    payload, _, signature = (token or "").partition(".")
+    if not payload or not signature:
+        raise InvalidToken("malformed token")
+    if not hmac.compare_digest(signature, _sign(payload, secret or AUTH_TOKEN_SECRET)):
+        raise InvalidToken("bad signature")
+    try:
+        data = json.loads(_b64decode(payload))
+        claims = TokenClaims(user_id=int(data["sub"]), role=str(data["role"]), expires_at=int(data["exp"]))
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("malformed token")
+    if claims.expires_at <= time.time():
+        raise InvalidToken("token expired")
+    return claims
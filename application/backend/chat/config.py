@@ -0,0 +1,39 @@
+"""
+Configuration for the chat WebSocket service.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ChatConfig:
+    """Configuration settings for realtime chat delivery."""
+
+    # Fan-out backend used to reach sockets held by other workers:
+    #   memory - deliver inside this process only (single uvicorn worker)
+    #   unix   - relay through a LocalHub listening on a Unix socket (one host, many workers)
+    #   redis  - Redis pub/sub broker (many hosts); requires the optional `redis` package
+    PUBSUB_BACKEND: str = os.getenv("CHAT_PUBSUB_BACKEND", "memory").lower()
+    # Socket path for "unix", connection URL for "redis"
+    PUBSUB_URL: str = os.getenv("CHAT_PUBSUB_URL", "/run/uvicorn-team08/chat-hub.sock")
+    PUBSUB_CHANNEL: str = os.getenv("CHAT_PUBSUB_CHANNEL", "team08:chat")
+    # A lost hub/broker connection is retried with exponential backoff between these bounds
+    PUBSUB_RECONNECT_MIN_SECONDS: float = float(os.getenv("CHAT_PUBSUB_RECONNECT_MIN_SECONDS", "0.5"))
+    PUBSUB_RECONNECT_MAX_SECONDS: float = float(os.getenv("CHAT_PUBSUB_RECONNECT_MAX_SECONDS", "30"))
+
+    # Outbound delivery: each socket gets a bounded queue drained by its own writer task.
+    # A socket whose queue fills up or whose send exceeds the timeout is evicted.
+    SEND_QUEUE_SIZE: int = int(os.getenv("CHAT_SEND_QUEUE_SIZE", "100"))
+    SEND_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_SEND_TIMEOUT_SECONDS", "5"))
+
+    # Heartbeat: a {"type": "ping"} frame goes to every socket each interval and clients
+    # answer {"type": "pong"}. Sockets that send nothing for IDLE_TIMEOUT are reaped.
+    HEARTBEAT_INTERVAL_SECONDS: float = float(os.getenv("CHAT_HEARTBEAT_INTERVAL_SECONDS", "25"))
+    IDLE_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_IDLE_TIMEOUT_SECONDS", "75"))
+
+    # Read receipts from the socket are coalesced and written once per conversation per interval
+    READ_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("CHAT_READ_FLUSH_INTERVAL_SECONDS", "1"))
+
+
+chat_config = ChatConfig()
@@ -1,14 +1,21 @@
-from chat.schemas.chat_schemas import MessageInfo, MessageResponse
+import json
+from chat.schemas.chat_schemas import MessageInfo, MessageResponse, ReadFrame, TypingFrame
 from chat.services.chat_service import send_message, send_message_with_media, get_chat, get_user_chats, get_unread_count
 from chat.models.chat_message import ChatMessage
-from auth.services.auth_service import get_user_by_id
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from auth.dependencies import get_current_user
+from auth.tokens import TokenClaims
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
 from chat.services.connection_manager import manager
-from search.database import get_db
-from media_handling.service import save_media_file
-from typing import Optional
+from chat.services.read_receipts import read_receipts
+from search.database import get_db, SessionLocal
+from media_handling.service import save_media_file, MediaTooLargeError
+from media_handling.thumbnails import generate_thumbnail, is_thumbnailable
+from typing import Optional, Tuple
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -19,15 +26,9 @@ def get_unread_count_endpoint(user_id: int, db: Session = Depends(get_db)):
     return {"unread_conversations": count}
 
 @router.post("/send", response_model=MessageResponse)
-def send_endpoint(req: MessageInfo, db: Session = Depends(get_db), user_id: int = None):
-    if user_id is None:
-        raise HTTPException(status_code=400, detail="user_id not found")
-
-    sender = get_user_by_id(db, user_id)
-    if not sender:
-        raise HTTPException(status_code=404, detail="sender id not found")
-    
-    message = send_message(db, user_id, req)
+def send_endpoint(req: MessageInfo, db: Session = Depends(get_db), sender: TokenClaims = Depends(get_current_user)):
+    # sender comes from the signed token (no lookup) or the legacy ?user_id=
+    message = send_message(db, sender.user_id, req)
     return MessageResponse(
         message_id=message.message_id,
         sender_id=message.sender_id,
@@ -62,21 +63,24 @@ def mark_conversation_read(receiver_id: int, sender_id: int, db: Session = Depen
 
 @router.post("/send-media", response_model=MessageResponse)
 async def send_media_endpoint(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     receiver_id: int = Form(...),
     content: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    user_id: int = None
+    sender: TokenClaims = Depends(get_current_user)
 ):
-    if user_id is None:
-        raise HTTPException(status_code=400, detail="user_id not found")
+    user_id = sender.user_id
 
-    sender = get_user_by_id(db, user_id)
-    if not sender:
-        raise HTTPException(status_code=404, detail="sender id not found")
-    
     # Save file using media service (saves to /home/atharva/media/ and returns /media/... path)
-    media_path = await save_media_file(file, context="chat")
+    try:
+        media_path = await save_media_file(file, context="chat")
+    except MediaTooLargeError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+
+    # rendered after the response; chat history returns it as thumbnail_path once it exists
+    if is_thumbnailable(media_path):
+        background_tasks.add_task(generate_thumbnail, media_path)
     
     message, media = send_message_with_media(
         db, user_id, receiver_id, content or "", media_path, file.content_type
@@ -103,32 +107,109 @@ def get_user_chats_endpoint(user_id: int, db: Session = Depends(get_db)):
     related_chats = get_user_chats(db, user_id)
     return related_chats
 
+@router.get("/metrics")
+def get_chat_metrics_endpoint():
+    """Live connection count and delivery metrics for the worker that serves this request"""
+    return manager.stats()
+
+# Websocket frame types and the schema of their payload (None: no payload)
+FRAME_SCHEMAS = {"message": MessageInfo, "read": ReadFrame, "typing": TypingFrame, "pong": None}
+
+def parse_frame(raw: str) -> Tuple[str, Optional[BaseModel]]:
+    """
+    Decode and validate one websocket frame.
+
+    Raises:
+        ValueError: Not a JSON object, unknown "type" or missing/invalid fields
+    """
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        raise ValueError("frame is not valid JSON")
+    if not isinstance(data, dict):
+        raise ValueError("frame must be a JSON object")
+    frame_type = data.get("type", "message")
+    if frame_type not in FRAME_SCHEMAS:
+        raise ValueError(f"unknown frame type: {frame_type!r}")
+    schema = FRAME_SCHEMAS[frame_type]
+    if schema is None:
+        return frame_type, None
+    try:
+        return frame_type, schema.model_validate(data)
+    except ValidationError as e:
+        fields = ", ".join(".".join(str(part) for part in error["loc"]) for error in e.errors())
+        raise ValueError(f"invalid {frame_type} frame: {fields}")
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
+    """
+    Realtime chat socket. Every frame is a JSON object with a "type":
+      message - {"receiver_id", "content"}; "type" may be omitted (older clients)
+      read    - {"peer_id", "up_to_message_id"}: everything from peer_id up to that ID was read
+      typing  - {"receiver_id", "is_typing"}
+      pong    - reply to the server's {"type": "ping"} heartbeat
+    A frame that doesn't fit is answered with {"type": "error", "detail"} and
+    otherwise ignored; the socket stays open.
+    """
     await manager.connect(user_id, websocket)
     try:
         while True:
-            data = await websocket.receive_json()
-            receiver_id = data["receiver_id"]
-            content = data["content"]
-            db = next(get_db())
-            chat_message = send_message(db=db, sender_id=user_id, req=data)
-
-            await manager.broadcast_to_pair(
-                user1=user_id,
-                user2=receiver_id,
-                message={
-                    "message_id": chat_message.message_id,
+            raw = await websocket.receive_text()
+            manager.touch(user_id, websocket)
+            try:
+                frame_type, frame = parse_frame(raw)
+            except ValueError as e:
+                manager.send_to_socket(user_id, websocket, {"type": "error", "detail": str(e)})
+                continue
+
+            if frame_type == "message":
+                await handle_message_frame(user_id, websocket, frame)
+            elif frame_type == "read":
+                read_receipts.mark_read(user_id, frame.peer_id, frame.up_to_message_id)
+            elif frame_type == "typing":
+                await manager.publish([frame.receiver_id], {
+                    "type": "typing",
                     "sender_id": user_id,
-                    "receiver_id": receiver_id,
-                    "content": content,
-                    "media_path": None,
-                    "media_type": None,
-                    "created_at": str(chat_message.created_at)
-                }
-            )
+                    "receiver_id": frame.receiver_id,
+                    "is_typing": frame.is_typing
+                })
 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(user_id, websocket)
 
-        
\ No newline at end of file
+def store_message(user_id: int, req: MessageInfo) -> Tuple[ChatMessage, int]:
+    """Save a websocket message; returns it with the receiver's unread count (runs in the threadpool)."""
+    db = SessionLocal()
+    try:
+        chat_message = send_message(db=db, sender_id=user_id, req=req)
+        return chat_message, get_unread_count(db, req.receiver_id)
+    finally:
+        db.close()
+
+async def handle_message_frame(user_id: int, websocket: WebSocket, req: MessageInfo):
+    receiver_id = req.receiver_id
+    try:
+        chat_message, receiver_unread = await run_in_threadpool(store_message, user_id, req)
+    except SQLAlchemyError as e:
+        print(f"[chat] could not store message from user {user_id}: {e}")
+        manager.send_to_socket(user_id, websocket, {"type": "error", "detail": "message could not be saved"})
+        return
+
+    await manager.broadcast_to_pair(
+        user1=user_id,
+        user2=receiver_id,
+        message={
+            "type": "message",
+            "message_id": chat_message.message_id,
+            "sender_id": user_id,
+            "receiver_id": receiver_id,
+            "content": req.content,
+            "media_path": None,
+            "media_type": None,
+            "created_at": str(chat_message.created_at)
+        }
+    )
+    # keeps the receiver's unread badge current without polling /unread-count
+    await manager.publish([receiver_id], {"type": "unread_count", "unread_conversations": receiver_unread})
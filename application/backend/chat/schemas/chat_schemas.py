@@ -9,6 +9,15 @@ class MessageInfo(BaseModel):
     receiver_id: int
     content: str
 
+class ReadFrame(BaseModel):
+    """Websocket read receipt: everything from peer_id up to up_to_message_id was read."""
+    peer_id: int
+    up_to_message_id: int
+
+class TypingFrame(BaseModel):
+    receiver_id: int
+    is_typing: bool = True
+
 class MediaMessageInfo(BaseModel):
     receiver_id: int
     content: Optional[str] = None
@@ -20,5 +29,7 @@ class MessageResponse(BaseModel):
     content: str | None
     media_path: str | None = None
     media_type: str | None = None
+    # small preview for images; None until the background thumbnail is ready
+    thumbnail_path: str | None = None
     created_at: datetime
     is_read: bool = False
\ No newline at end of file
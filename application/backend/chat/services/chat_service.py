@@ -1,6 +1,7 @@
 from chat.models.chat_message import ChatMessage
 from chat.models.chat_media import ChatMedia
 from chat.schemas.chat_schemas import MessageInfo
+from media_handling.thumbnails import existing_thumbnail_path
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -58,6 +59,7 @@ def get_chat(db: Session, user1: int, user2: int):
             "content": msg.content,
             "media_path": media.media_path if media else None,
             "media_type": media.media_type if media else None,
+            "thumbnail_path": existing_thumbnail_path(media.media_path) if media else None,
             "created_at": msg.created_at,
             "is_read": msg.is_read
         })
@@ -82,4 +84,13 @@ def get_unread_count(db: Session, user_id: int) -> int:
     return db.query(ChatMessage.sender_id).filter(
         ChatMessage.receiver_id == user_id,
         ChatMessage.is_read == False
-    ).distinct().count()
\ No newline at end of file
+    ).distinct().count()
+
+def mark_conversation_read_up_to(db: Session, receiver_id: int, sender_id: int, up_to_message_id: int) -> int:
+    """Mark every unread message from sender_id to receiver_id up to a message ID as read (one UPDATE)"""
+    return db.query(ChatMessage).filter(
+        ChatMessage.receiver_id == receiver_id,
+        ChatMessage.sender_id == sender_id,
+        ChatMessage.message_id <= up_to_message_id,
+        ChatMessage.is_read == False
+    ).update({"is_read": True}, synchronize_session=False)
@@ -1,38 +1,227 @@
-from typing import Dict, List
+import asyncio
+import os
+from typing import Dict, List, Optional
 from fastapi import WebSocket
+from chat.config import chat_config
+from chat.services.pubsub import PubSubBackend, create_backend
 """
 Connection Manager class from Fastapi Docs,
 websocket endpoints in chat_router
+
+Sockets are held per worker. Outgoing events are published through a
+pub/sub backend (see pubsub.py) and every worker delivers them to the
+sockets it holds, so recipients on other workers still get them.
+
+Delivery never awaits a client directly: each socket has a bounded queue
+drained by its own writer task, so one slow or dead client cannot hold up
+anyone else. Sockets that overflow their queue or fail/time out a send are
+evicted.
+
+A heartbeat task pings every socket and reaps the ones that have not sent
+anything (a pong or any other frame) within the idle timeout, which catches
+half-open connections that would otherwise linger forever.
 """
 
+class ClientConnection:
+    """A single WebSocket with its own outbound queue and writer task."""
+
+    def __init__(self, manager: "ConnectionManager", user_id: int, websocket: WebSocket):
+        self.manager = manager
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=manager.queue_size)
+        self.last_seen = asyncio.get_running_loop().time()
+        self.writer_task = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message: dict) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _write_loop(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=self.manager.send_timeout)
+                self.manager.messages_sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # timed out or socket is gone; everything still queued is lost with it
+                print(f"error sending to user {self.user_id}: {e!r}")
+                self.manager.messages_dropped += 1
+                self.manager.evict(self, reason="send failed")
+                return
+
+    def close(self):
+        if self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+        # not drops: a client that hangs up normally just misses what was still queued
+        self.manager.messages_unsent += self.queue.qsize()
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]]= {}
+    def __init__(
+        self,
+        backend: Optional[PubSubBackend] = None,
+        queue_size: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.active_connections: Dict[int, List[ClientConnection]]= {}
+        self.backend = backend or create_backend()
+        self.queue_size = queue_size or chat_config.SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or chat_config.SEND_TIMEOUT_SECONDS
+        self.heartbeat_interval = heartbeat_interval or chat_config.HEARTBEAT_INTERVAL_SECONDS
+        self.idle_timeout = idle_timeout or chat_config.IDLE_TIMEOUT_SECONDS
+        self._started = False
+        # created on first start() so it belongs to the running loop
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+        # delivery metrics for this worker
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        # still queued when their socket closed
+        self.messages_unsent = 0
+        self.connections_evicted = 0
+        self.connections_reaped = 0
+
+    async def start(self):
+        """Subscribe to the backend and start the heartbeat; safe to call concurrently and repeatedly."""
+        if self._started:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._started:
+                return
+            await self.backend.start(self._deliver)
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            self._started = True
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                connection.close()
+        self.active_connections.clear()
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+        self._start_lock = None
 
     async def connect(self, user_id:int, websocket:WebSocket):
+        await self.start()
         await websocket.accept()
         if user_id not in self.active_connections:
             self.active_connections[user_id]=[]
-        self.active_connections[user_id].append(websocket)
-        
+        self.active_connections[user_id].append(ClientConnection(self, user_id, websocket))
+
+    def _remove(self, connection: ClientConnection) -> bool:
+        connections = self.active_connections.get(connection.user_id)
+        if not connections or connection not in connections:
+            return False
+        connections.remove(connection)
+        if not connections:
+            del self.active_connections[connection.user_id]
+        connection.close()
+        return True
+
     def disconnect(self, user_id:int, websocket:WebSocket):
-        if user_id in self.active_connections:
-            try:
-                self.active_connections[user_id].remove(websocket)
-            except ValueError:
-                pass
+        for connection in list(self.active_connections.get(user_id, [])):
+            if connection.websocket is websocket:
+                self._remove(connection)
+
+    def touch(self, user_id: int, websocket: WebSocket):
+        """Record that a frame arrived on this socket."""
+        now = asyncio.get_running_loop().time()
+        for connection in self.active_connections.get(user_id, []):
+            if connection.websocket is websocket:
+                connection.last_seen = now
+
+    def heartbeat(self):
+        """Reap sockets idle past the timeout and ping the rest."""
+        now = asyncio.get_running_loop().time()
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                if now - connection.last_seen > self.idle_timeout:
+                    self.connections_reaped += 1
+                    self.evict(connection, reason="idle")
+                elif not connection.enqueue({"type": "ping"}):
+                    self.messages_dropped += 1
+                    self.evict(connection, reason="outbound queue full")
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.heartbeat()
+
+    def evict(self, connection: ClientConnection, reason: str):
+        """Drop a connection that can't keep up and close its socket in the background."""
+        if not self._remove(connection):
+            return
+        self.connections_evicted += 1
+        print(f"evicting socket of user {connection.user_id}: {reason}")
+        asyncio.create_task(self._close_socket(connection.websocket))
+
+    async def _close_socket(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def send_to_socket(self, user_id: int, websocket: WebSocket, message: dict):
+        """Queue a message for one socket only (e.g. an error about a frame it sent)."""
+        for connection in list(self.active_connections.get(user_id, [])):
+            if connection.websocket is websocket and not connection.enqueue(message):
+                self.messages_dropped += 1
+                self.evict(connection, reason="outbound queue full")
 
     async def send_personal_message(self, message:dict, user_id: int):
-        if user_id in self.active_connections:
-            for ws in self.active_connections[user_id]:
-                try:
-                    #needed for testing message being sent to both users
-                    await ws.send_json(message)
-                except Exception as e:
-                    print(f"error sending to user {user_id}: {e}")
+        """Queue a message for every socket this worker holds for user_id."""
+        for connection in list(self.active_connections.get(user_id, [])):
+            if not connection.enqueue(message):
+                self.messages_dropped += 1
+                self.evict(connection, reason="outbound queue full")
+
+    async def publish(self, user_ids: List[int], message: dict):
+        """Fan a message out to every worker holding a socket for any of user_ids."""
+        await self.start()
+        await self.backend.publish({"user_ids": list(dict.fromkeys(user_ids)), "message": message})
+
+    async def _deliver(self, envelope: dict):
+        message = envelope.get("message")
+        for user_id in envelope.get("user_ids", []):
+            await self.send_personal_message(message, user_id)
+
     #sends message to both users as soon as sent by 1
     async def broadcast_to_pair(self, user1:int, user2:int, message:dict):
-        await self.send_personal_message(message, user1)
-        await self.send_personal_message(message, user2)
+        await self.publish([user1, user2], message)
+
+    def stats(self) -> dict:
+        """Delivery metrics for this worker."""
+        depths = [c.queue.qsize() for conns in self.active_connections.values() for c in conns]
+        return {
+            "worker_pid": os.getpid(),
+            "connections": len(depths),
+            "users": len(self.active_connections),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "messages_unsent": self.messages_unsent,
+            "connections_evicted": self.connections_evicted,
+            "connections_reaped": self.connections_reaped,
+        }
 
 manager= ConnectionManager()
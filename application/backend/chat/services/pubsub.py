@@ -0,0 +1,298 @@
+"""
+Pub/sub backends used by ConnectionManager to fan chat events out across workers.
+
+Each worker subscribes once and delivers every envelope it receives to the
+sockets it holds locally, so a message reaches its recipients no matter which
+worker (or host) accepted their WebSocket.
+
+Envelope format: {"user_ids": [int, ...], "message": {...}}
+
+If the hub or broker connection drops, the backend keeps reconnecting with
+exponential backoff (CHAT_PUBSUB_RECONNECT_MIN/MAX_SECONDS). Envelopes
+published while it is down are logged and dropped; the messages themselves
+are already stored, so clients see them in the history.
+
+Run a LocalHub for the "unix" backend with:
+    python -m chat.services.pubsub /run/uvicorn-team08/chat-hub.sock
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+from typing import Awaitable, Callable, Optional, Set
+
+from chat.config import chat_config
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class PubSubBackend:
+    """Base class: publish envelopes and hand every received one to a handler."""
+
+    def __init__(self):
+        self.handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        self.handler = handler
+
+    async def stop(self):
+        self.handler = None
+
+    async def publish(self, envelope: dict):
+        raise NotImplementedError
+
+    async def _reconnect(self, connect: Callable[[], Awaitable[None]]):
+        """Call connect() until it succeeds, backing off exponentially (with jitter) between attempts."""
+        attempt = 0
+        while True:
+            delay = min(chat_config.PUBSUB_RECONNECT_MIN_SECONDS * 2 ** attempt, chat_config.PUBSUB_RECONNECT_MAX_SECONDS)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
+            try:
+                await connect()
+                print(f"[chat pubsub] reconnected after {attempt} attempt(s)")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[chat pubsub] reconnect attempt {attempt} failed: {e!r}")
+
+    async def _dispatch(self, envelope: dict):
+        if self.handler is None:
+            return
+        try:
+            await self.handler(envelope)
+        except Exception as e:
+            print(f"[chat pubsub] error delivering envelope: {e}")
+
+
+class InProcessBackend(PubSubBackend):
+    """Delivers straight to this worker's handler. Only correct with a single worker."""
+
+    async def publish(self, envelope: dict):
+        await self._dispatch(envelope)
+
+
+class UnixSocketBackend(PubSubBackend):
+    """
+    Connects to a LocalHub over a Unix socket. Suitable for several workers on
+    one host, and used as the broker stand-in in tests.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        await super().start(handler)
+        await self._connect()
+        self._task = asyncio.create_task(self._read_loop())
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._reader = None
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._writer = None
+        await super().stop()
+
+    async def publish(self, envelope: dict):
+        if self.handler is None:
+            raise RuntimeError("UnixSocketBackend is not started")
+        if self._writer is None:
+            print("[chat pubsub] hub unavailable, dropping envelope")
+            return
+        try:
+            self._writer.write(json.dumps(envelope).encode() + b"\n")
+            await self._writer.drain()
+        except (ConnectionError, OSError) as e:
+            # the read loop notices the closed connection and reconnects
+            print(f"[chat pubsub] publish to hub failed, dropping envelope: {e!r}")
+
+    async def _read_loop(self):
+        while True:
+            try:
+                while True:
+                    line = await self._reader.readline()
+                    if not line:
+                        print("[chat pubsub] hub connection closed, reconnecting")
+                        break
+                    try:
+                        envelope = json.loads(line)
+                    except ValueError:
+                        continue
+                    await self._dispatch(envelope)
+            except (ConnectionError, OSError) as e:
+                print(f"[chat pubsub] hub connection lost ({e!r}), reconnecting")
+            self._disconnect()
+            await self._reconnect(self._connect)
+
+
+class RedisBackend(PubSubBackend):
+    """Redis pub/sub broker for deployments spanning several hosts."""
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("CHAT_PUBSUB_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        await super().start(handler)
+        self._client = aioredis.from_url(self.url)
+        await self._subscribe()
+        self._task = asyncio.create_task(self._read_loop())
+
+    async def _subscribe(self):
+        self._pubsub = self._client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+
+    async def _close_pubsub(self):
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.close()
+        except Exception:
+            pass
+        self._pubsub = None
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+            except Exception:
+                pass  # the connection may already be gone
+            await self._close_pubsub()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        await super().stop()
+
+    async def publish(self, envelope: dict):
+        await self._client.publish(self.channel, json.dumps(envelope))
+
+    async def _read_loop(self):
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        envelope = json.loads(item["data"])
+                    except ValueError:
+                        continue
+                    await self._dispatch(envelope)
+                print("[chat pubsub] redis subscription ended, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[chat pubsub] redis connection lost ({e!r}), reconnecting")
+            await self._close_pubsub()
+            await self._reconnect(self._subscribe)
+
+
+class LocalHub:
+    """
+    Minimal relay for UnixSocketBackend: every line a client writes is
+    forwarded to all connected clients, including the sender.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for client in list(self._clients):
+                    try:
+                        client.write(line)
+                        await client.drain()
+                    except (ConnectionError, OSError):
+                        self._clients.discard(client)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+def create_backend(name: Optional[str] = None, url: Optional[str] = None, channel: Optional[str] = None) -> PubSubBackend:
+    """Build the backend selected by CHAT_PUBSUB_BACKEND (or the given overrides)."""
+    name = (name or chat_config.PUBSUB_BACKEND).lower()
+    url = url or chat_config.PUBSUB_URL
+    channel = channel or chat_config.PUBSUB_CHANNEL
+
+    if name == "memory":
+        return InProcessBackend()
+    if name == "unix":
+        return UnixSocketBackend(url)
+    if name == "redis":
+        return RedisBackend(url, channel)
+    raise ValueError(f"Unknown CHAT_PUBSUB_BACKEND '{name}'. Use memory, unix or redis.")
+
+
+if __name__ == "__main__":
+    hub_path = sys.argv[1] if len(sys.argv) > 1 else chat_config.PUBSUB_URL
+    print(f"chat hub listening on {hub_path}")
+    asyncio.run(LocalHub(hub_path).serve_forever())
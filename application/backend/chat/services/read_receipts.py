@@ -0,0 +1,108 @@
+"""
+Coalesces read receipts sent over the chat WebSocket.
+
+Clients send {"type": "read", "peer_id": X, "up_to_message_id": N} as they
+scroll. Instead of one commit per frame, the highest N per conversation is
+kept in memory and written with a single UPDATE per conversation every
+flush interval. After each flush the sender is told how far their messages
+have been read and the reader gets a fresh unread badge count.
+"""
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from chat.config import chat_config
+from chat.services.chat_service import mark_conversation_read_up_to, get_unread_count
+from chat.services.connection_manager import ConnectionManager, manager as default_manager
+from search.database import SessionLocal
+
+
+class ReadReceiptBuffer:
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: Optional[float] = None,
+    ):
+        self.manager = manager
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval or chat_config.READ_FLUSH_INTERVAL_SECONDS
+        # (reader_id, peer_id) -> highest message_id read
+        self.pending: Dict[Tuple[int, int], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_read(self, reader_id: int, peer_id: int, up_to_message_id: int):
+        key = (reader_id, peer_id)
+        if up_to_message_id > self.pending.get(key, 0):
+            self.pending[key] = up_to_message_id
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[chat] read receipt flush failed: {e}")
+
+    async def flush(self):
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return
+        try:
+            results = await run_in_threadpool(self._write_batch, batch)
+        except Exception:
+            # keep the receipts for the next flush
+            for (reader_id, peer_id), up_to_message_id in batch.items():
+                self.mark_read(reader_id, peer_id, up_to_message_id)
+            raise
+        for reader_id, peer_id, up_to_message_id, unread in results:
+            await self.manager.publish([peer_id], {
+                "type": "read",
+                "reader_id": reader_id,
+                "peer_id": peer_id,
+                "up_to_message_id": up_to_message_id,
+            })
+            await self.manager.publish([reader_id], {
+                "type": "unread_count",
+                "unread_conversations": unread,
+            })
+
+    def _write_batch(self, batch: Dict[Tuple[int, int], int]) -> List[Tuple[int, int, int, int]]:
+        db = self.session_factory()
+        try:
+            for (reader_id, peer_id), up_to_message_id in batch.items():
+                mark_conversation_read_up_to(db, reader_id, peer_id, up_to_message_id)
+            db.commit()
+
+            unread_by_reader = {
+                reader_id: get_unread_count(db, reader_id)
+                for reader_id in {reader_id for reader_id, _ in batch}
+            }
+            return [
+                (reader_id, peer_id, up_to_message_id, unread_by_reader[reader_id])
+                for (reader_id, peer_id), up_to_message_id in batch.items()
+            ]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+read_receipts = ReadReceiptBuffer(default_manager)
@@ -11,17 +11,39 @@ from chat.routers.chat_router import router as chat_router
 from tutors.router import router as tutors_router
 from ai.router import router as ai_router
 
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import os
 
+from chat.services.connection_manager import manager as chat_manager
+from chat.services.read_receipts import read_receipts
+from media_handling.thumbnails import shutdown_thumbnail_pool
+from auth.hashing import shutdown_hashing_pool
+from media_handling.static import MediaStaticFiles
+from media_handling import service as media_service
+from ai.http_client import llm_client
+
 # ... existing imports ...
 
-app = FastAPI(title="Team08 API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Subscribe this worker to chat fan-out before any socket connects
+    await chat_manager.start()
+    await read_receipts.start()
+    yield
+    await read_receipts.stop()
+    await chat_manager.stop()
+    shutdown_thumbnail_pool()
+    shutdown_hashing_pool()
+    await llm_client.aclose()
+
+app = FastAPI(title="Team08 API", version="0.1.0", lifespan=lifespan)
 
 # Mount media directory for local development
 # In production, Nginx serves this, but this ensures it works locally too.
-if os.path.exists("multimedia"):
-    app.mount("/media", StaticFiles(directory="multimedia"), name="media")
+# Same cache headers as nginx: immutable for uuid-named uploads, ETag + Range for all.
+media_dir = media_service.MEDIA_ROOT if os.getenv("MEDIA_ROOT") else "multimedia"
+if os.path.isdir(media_dir):
+    app.mount("/media", MediaStaticFiles(directory=media_dir), name="media")
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +57,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # admin list endpoints return the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(search_router)
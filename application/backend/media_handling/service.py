@@ -1,11 +1,23 @@
 """
 Media service for handling file uploads and storage.
 Files are stored on the server at /home/atharva/media/ and served by nginx at /media/
+
+With MEDIA_DEDUP=true uploads are also content-addressed: each file is hashed
+while it streams in and hard-linked to a blob named by its SHA-256 under
+MEDIA_ROOT/.cas/ (hidden, so nginx never serves it). An upload whose content
+is already stored becomes another link to the existing blob instead of a
+second copy. The link count is the reference count: delete_media_file drops
+the blob once no media path links to it any more. Each deduplicated file has a
+hidden sidecar (".{filename}.sha256") holding its digest, so a delete finds
+the blob directly without reading the file or scanning the store.
 """
+import hashlib
 import os
+import tempfile
 import uuid
 from typing import Optional
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 # Media root directory on server
 # For local development on Windows, use relative path from backend directory
@@ -23,6 +35,27 @@ VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".avi", ".mkv"}
 # Supported PDF extensions
 PDF_EXTENSIONS = {".pdf"}
 
+# Uploads are copied in chunks of this size so a large video never sits in memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+# Default upper bound for a single upload; callers may pass a tighter max_size
+MAX_UPLOAD_SIZE = int(os.getenv("MEDIA_MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))  # 100MB
+# Permissions for stored files (readable by nginx, writable only by the app)
+MEDIA_FILE_MODE = 0o644
+# Deduplicate identical uploads through the content-addressed blob store
+MEDIA_DEDUP = os.getenv("MEDIA_DEDUP", "false").lower() == "true"
+# Blob store directory under MEDIA_ROOT (dot-prefixed: nginx denies hidden paths)
+CAS_DIR = ".cas"
+# Suffix of the hidden sidecar that records a deduplicated file's digest
+DIGEST_SUFFIX = ".sha256"
+
+
+class MediaTooLargeError(ValueError):
+    """Raised when an upload exceeds the allowed size. Nothing is left on disk."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File exceeds the maximum size of {max_size} bytes")
+
 
 def get_media_category(file_ext: str) -> str:
     """
@@ -60,10 +93,70 @@ def get_media_subdirectory(category: str, context: str = "chat") -> str:
     return f"{category}/{context}"
 
 
+def _write_chunk(out, chunk: bytes, hasher=None):
+    if hasher is not None:
+        hasher.update(chunk)
+    out.write(chunk)
+
+
+async def stream_upload_to_path(
+    file: UploadFile,
+    destination: str,
+    max_size: Optional[int] = None,
+    hasher=None
+) -> int:
+    """
+    Copy an upload to destination in fixed-size chunks without blocking the event loop.
+    
+    Chunks are written to a hidden temp file in the destination directory, which is
+    atomically renamed into place once complete, so readers never see partial files.
+    
+    Args:
+        file: FastAPI UploadFile object
+        destination: Final file system path
+        max_size: Optional size limit in bytes, enforced as the data arrives
+        hasher: Optional hashlib object, updated with every chunk
+        
+    Returns:
+        Number of bytes written
+        
+    Raises:
+        MediaTooLargeError: If the upload exceeds max_size (the temp file is removed)
+        OSError: If file cannot be written
+    """
+    declared_size = getattr(file, "size", None)
+    if max_size is not None and declared_size is not None and declared_size > max_size:
+        raise MediaTooLargeError(max_size)
+
+    fd, temp_path = await run_in_threadpool(
+        tempfile.mkstemp, dir=os.path.dirname(destination), prefix=".upload-", suffix=".part"
+    )
+    written = 0
+    try:
+        # mkstemp creates 0600 files; nginx must be able to read the result
+        os.chmod(temp_path, MEDIA_FILE_MODE)
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_size is not None and written > max_size:
+                    raise MediaTooLargeError(max_size)
+                await run_in_threadpool(_write_chunk, out, chunk, hasher)
+        await run_in_threadpool(os.replace, temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return written
+
+
 async def save_media_file(
     file: UploadFile,
     context: str = "chat",
-    user_id: Optional[int] = None
+    user_id: Optional[int] = None,
+    max_size: Optional[int] = MAX_UPLOAD_SIZE
 ) -> str:
     """
     Save an uploaded file to the media directory and return the relative path.
@@ -72,12 +165,14 @@ async def save_media_file(
         file: FastAPI UploadFile object
         context: Context where media is used ("chat", "profile", etc.)
         user_id: Optional user ID for profile images (e.g., "{user_id}_profile_{uuid}.jpg")
+        max_size: Size limit in bytes (defaults to MAX_UPLOAD_SIZE, None for no limit)
         
     Returns:
         Relative path from media root (e.g., "/media/photos/chat/{uuid}.jpg")
         This path is what should be stored in the database and used in frontend URLs.
         
     Raises:
+        MediaTooLargeError: If the upload exceeds max_size
         OSError: If file cannot be written
     """
     # Get file extension
@@ -106,21 +201,135 @@ async def save_media_file(
     # Full file path on server
     full_file_path = os.path.join(full_dir, unique_filename)
     
-    # Read file content (async)
-    file_content = await file.read()
-    
-    # Save file
-    with open(full_file_path, "wb") as f:
-        f.write(file_content)
+    # Stream to disk in chunks, off the event loop
+    if MEDIA_DEDUP:
+        hasher = hashlib.sha256()
+        await stream_upload_to_path(file, full_file_path, max_size, hasher)
+        await run_in_threadpool(link_to_blob, full_file_path, hasher.hexdigest())
+    else:
+        await stream_upload_to_path(file, full_file_path, max_size)
     
     # Return relative path for database/frontend (starts with /media/)
     return f"/media/{subdir}/{unique_filename}"
 
 
+def get_blob_path(digest: str) -> str:
+    """Blob store location for a SHA-256 hex digest (e.g., MEDIA_ROOT/.cas/ab/abcd...)."""
+    return os.path.join(MEDIA_ROOT, CAS_DIR, digest[:2], digest)
+
+
+def link_to_blob(full_file_path: str, digest: str) -> str:
+    """
+    Make a freshly written file share storage with the blob for its digest.
+    
+    If no blob exists yet, the file itself becomes the blob (a second hard link).
+    Otherwise the file is atomically replaced by a link to the existing blob and
+    its own copy of the bytes is freed.
+    
+    Args:
+        full_file_path: File system path of the stored upload
+        digest: SHA-256 hex digest of its content
+        
+    Returns:
+        Blob file system path
+    """
+    with open(get_digest_path(full_file_path), "w") as f:
+        f.write(digest)
+    os.chmod(get_digest_path(full_file_path), MEDIA_FILE_MODE)
+
+    blob_path = get_blob_path(digest)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    try:
+        os.link(full_file_path, blob_path)
+        return blob_path
+    except FileExistsError:
+        pass
+
+    temp_path = f"{full_file_path}.link"
+    try:
+        os.link(blob_path, temp_path)
+        os.replace(temp_path, full_file_path)
+    except OSError as e:
+        # keep the private copy; the upload itself is still valid
+        print(f"Could not deduplicate {full_file_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return blob_path
+
+
+def get_digest_path(full_file_path: str) -> str:
+    """Sidecar holding the digest of a deduplicated file (e.g., photos/chat/.{uuid}.png.sha256)."""
+    directory, filename = os.path.split(full_file_path)
+    return os.path.join(directory, f".{filename}{DIGEST_SUFFIX}")
+
+
+def _read_digest(full_file_path: str) -> Optional[str]:
+    try:
+        with open(get_digest_path(full_file_path)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _find_blob(full_path: str) -> Optional[str]:
+    """
+    Blob a media file is linked to, or None if it has its own copy.
+    
+    The digest comes from the file's sidecar, so this is a couple of stat
+    calls whatever the size of the file or the store. Files without a sidecar
+    are treated as unlinked; collect_orphaned_blobs() sweeps up their blobs.
+    """
+    stat = os.stat(full_path)
+    if stat.st_nlink < 2:
+        return None
+    digest = _read_digest(full_path)
+    if digest is None:
+        return None
+    blob_path = get_blob_path(digest)
+    try:
+        blob_stat = os.stat(blob_path)
+    except FileNotFoundError:
+        return None
+    if (blob_stat.st_dev, blob_stat.st_ino) != (stat.st_dev, stat.st_ino):
+        return None
+    return blob_path
+
+
+def _release_blob(blob_path: str):
+    """Remove a blob that no media path links to any more."""
+    try:
+        if os.stat(blob_path).st_nlink == 1:
+            os.remove(blob_path)
+    except FileNotFoundError:
+        pass
+
+
+def collect_orphaned_blobs() -> int:
+    """
+    Remove blobs whose media files were all deleted outside delete_media_file.
+    
+    Returns:
+        Number of blobs removed
+    """
+    removed = 0
+    cas_root = os.path.join(MEDIA_ROOT, CAS_DIR)
+    for directory, _, filenames in os.walk(cas_root):
+        for filename in filenames:
+            blob_path = os.path.join(directory, filename)
+            if os.stat(blob_path).st_nlink == 1:
+                os.remove(blob_path)
+                removed += 1
+    return removed
+
+
 def delete_media_file(media_path: str) -> bool:
     """
     Delete a media file from the server.
     
+    Deduplicated files only lose this path; the shared blob is removed along
+    with the last path that references it. Thumbnails of an image are removed
+    with it.
+    
     Args:
         media_path: Relative path from media root (e.g., "/media/photos/chat/{uuid}.jpg")
         
@@ -135,11 +344,33 @@ def delete_media_file(media_path: str) -> bool:
     full_path = os.path.join(MEDIA_ROOT, relative_path)
     
     if os.path.exists(full_path):
+        blob_path = _find_blob(full_path)
         os.remove(full_path)
+        if blob_path:
+            _release_blob(blob_path)
+        try:
+            os.remove(get_digest_path(full_path))
+        except FileNotFoundError:
+            pass
+        _delete_thumbnails(media_path)
         return True
     return False
 
 
+def _delete_thumbnails(media_path: str):
+    """Remove the generated thumbnails of an image, if any."""
+    # imported here: thumbnails imports this module
+    from .thumbnails import is_thumbnailable, thumbnail_paths
+
+    if not is_thumbnailable(media_path):
+        return
+    for thumb_path in thumbnail_paths(media_path):
+        try:
+            os.remove(os.path.join(MEDIA_ROOT, thumb_path[len("/media/"):]))
+        except FileNotFoundError:
+            pass
+
+
 def get_full_file_path(media_path: str) -> Optional[str]:
     """
     Get the full file system path for a media path.
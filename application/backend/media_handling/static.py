@@ -0,0 +1,55 @@
+"""
+Serving /media from the app for local runs (nginx serves it in production).
+
+Uploaded files are named by uuid and never rewritten, so they are sent with
+a year-long immutable Cache-Control. Other files (default_photo.jpg and the
+like can be replaced by hand) get a short max-age. FileResponse supplies the
+ETag/Last-Modified validators, If-None-Match/If-Modified-Since answer 304 and
+Range requests are honoured so videos can seek.
+
+Hidden paths (the .cas blob store, in-flight .upload-*.part files) are never
+served, matching the nginx config.
+"""
+import os
+import re
+from typing import Union
+
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Keep in sync with the map in scripts/templates/nginx.conf.j2
+IMMUTABLE_NAME = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[A-Za-z0-9]+$"
+)
+
+IMMUTABLE_MAX_AGE = int(os.getenv("MEDIA_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+MUTABLE_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", str(24 * 3600)))
+
+
+def media_cache_control(path: str) -> str:
+    """Cache-Control header for a file under /media."""
+    if IMMUTABLE_NAME.search(path):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={MUTABLE_MAX_AGE}"
+
+
+class MediaStaticFiles(StaticFiles):
+    """StaticFiles with media cache headers and hidden paths blocked."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in path.replace("\\", "/").split("/")):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: Union[str, "os.PathLike[str]"],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = media_cache_control(str(full_path))
+        return response
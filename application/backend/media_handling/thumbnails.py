@@ -0,0 +1,146 @@
+"""
+Thumbnail generation for profile and chat photos.
+
+Resizing is CPU-bound, so it runs in a small process pool instead of the
+event loop or the request threadpool. Thumbnails sit next to their original
+in a thumbs/ subdirectory and are always JPEG (plus an optional WebP variant):
+
+    /media/photos/profile/12_profile_{uuid}.png
+    /media/photos/profile/thumbs/12_profile_{uuid}.jpg
+    /media/photos/profile/thumbs/12_profile_{uuid}.webp
+
+Pillow is optional: without it no thumbnails are produced and callers keep
+using the full-size image. delete_media_file() removes an image's thumbnails
+along with it.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from .service import IMAGE_EXTENSIONS, get_full_file_path
+
+try:
+    import PIL  # noqa: F401
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+# Thumbnails are cropped to exactly this size (search cards are square)
+THUMB_SIZE = int(os.getenv("MEDIA_THUMB_SIZE", "256"))
+# Also write a WebP variant next to the JPEG
+THUMB_WEBP = os.getenv("MEDIA_THUMB_WEBP", "true").lower() == "true"
+THUMB_WORKERS = int(os.getenv("MEDIA_THUMB_WORKERS", "2"))
+THUMB_DIR = "thumbs"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_thumbnail_path(media_path: str, ext: str = ".jpg") -> str:
+    """
+    Get the thumbnail media path for an image.
+
+    Args:
+        media_path: Original media path (e.g., "/media/photos/chat/{uuid}.png")
+        ext: Thumbnail extension (".jpg" or ".webp")
+
+    Returns:
+        Thumbnail media path (e.g., "/media/photos/chat/thumbs/{uuid}.jpg")
+    """
+    directory, filename = media_path.rsplit("/", 1)
+    return f"{directory}/{THUMB_DIR}/{os.path.splitext(filename)[0]}{ext}"
+
+
+def thumbnail_paths(media_path: str) -> Tuple[str, str]:
+    """Media paths of the JPEG and WebP thumbnails of an image."""
+    return get_thumbnail_path(media_path), get_thumbnail_path(media_path, ".webp")
+
+
+def existing_thumbnail_path(media_path: Optional[str]) -> Optional[str]:
+    """Thumbnail media path for an image once it has been generated, else None."""
+    if not is_thumbnailable(media_path):
+        return None
+    thumb_path = get_thumbnail_path(media_path)
+    return thumb_path if get_full_file_path(thumb_path) else None
+
+
+def is_thumbnailable(media_path: str) -> bool:
+    """True for image paths that are not themselves thumbnails."""
+    if not media_path or f"/{THUMB_DIR}/" in media_path:
+        return False
+    return os.path.splitext(media_path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def render_thumbnail(source: str, destination: str, size: int, webp_destination: Optional[str] = None) -> None:
+    """
+    Crop and resize source to a size x size JPEG (and optionally WebP).
+    Runs inside a pool worker; files are written to a temp name and renamed.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        thumb = ImageOps.fit(image.convert("RGB"), (size, size), Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    outputs = [(destination, "JPEG", {"quality": 85, "optimize": True})]
+    if webp_destination:
+        outputs.append((webp_destination, "WEBP", {"quality": 80}))
+    for path, image_format, options in outputs:
+        temp_path = f"{path}.part"
+        thumb.save(temp_path, image_format, **options)
+        os.replace(temp_path, path)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: never fork a process that is running an event loop and threads
+        _pool = ProcessPoolExecutor(max_workers=THUMB_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_thumbnail_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _thumbnail_jobs(media_path: str) -> Optional[Tuple[str, str, str, Optional[str]]]:
+    """Resolve (source, destination, thumb media path, webp destination) for an image."""
+    if not PILLOW_AVAILABLE or not is_thumbnailable(media_path):
+        return None
+    source = get_full_file_path(media_path)
+    if source is None:
+        return None
+    thumb_path = get_thumbnail_path(media_path)
+    destination = os.path.join(os.path.dirname(source), THUMB_DIR, os.path.basename(thumb_path))
+    webp_destination = os.path.splitext(destination)[0] + ".webp" if THUMB_WEBP else None
+    return source, destination, thumb_path, webp_destination
+
+
+async def generate_thumbnail(media_path: str) -> Optional[str]:
+    """
+    Generate the thumbnail for an uploaded image in the process pool.
+
+    Args:
+        media_path: Media path of the original (e.g., "/media/photos/chat/{uuid}.jpg")
+
+    Returns:
+        Thumbnail media path, or None if the file is not an image, is missing,
+        Pillow is unavailable or the image could not be decoded
+    """
+    job = _thumbnail_jobs(media_path)
+    if job is None:
+        return None
+    source, destination, thumb_path, webp_destination = job
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_get_pool(), render_thumbnail, source, destination, THUMB_SIZE, webp_destination)
+    except Exception as e:
+        print(f"Thumbnail generation failed for {media_path}: {e}")
+        return None
+    return thumb_path
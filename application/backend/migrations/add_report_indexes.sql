@@ -0,0 +1,15 @@
+-- Migration: Add indexes for report lookups
+-- Description: Reports are looked up by the reported user (user reports page,
+--   per-user summary counts by status) and by the reporter (drop-user related
+--   record counts). Without these every lookup scans the reports table.
+--
+-- This migration is idempotent - it will not fail if indexes already exist
+
+-- Reports about a user, optionally narrowed by status
+CREATE INDEX IF NOT EXISTS idx_reports_reported_status ON reports(reported_user_id, status);
+
+-- Reports submitted by a user
+CREATE INDEX IF NOT EXISTS ix_reports_reporter_id ON reports(reporter_id);
+
+-- Verify indexes were created
+-- Run this after migration: SHOW INDEXES FROM reports;
@@ -0,0 +1,28 @@
+-- Migration: Add precomputed per-student session counters
+-- Description: Backs /api/admin/registered-students when USE_SESSION_COUNTERS=true.
+--   total_sessions = confirmed + completed bookings, pending_sessions = pending bookings.
+--   The booking service keeps the rows up to date once the flag is enabled.
+--
+-- Safe to re-run: the backfill overwrites existing rows with fresh counts.
+-- Run it right before turning the flag on (and again if the flag was ever off
+-- while bookings changed).
+
+CREATE TABLE IF NOT EXISTS student_session_counts (
+    student_id INT NOT NULL PRIMARY KEY,
+    total_sessions INT NOT NULL DEFAULT 0,
+    pending_sessions INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT INTO student_session_counts (student_id, total_sessions, pending_sessions)
+SELECT student_id,
+       SUM(status IN ('confirmed', 'completed')),
+       SUM(status = 'pending')
+FROM bookings
+GROUP BY student_id
+ON DUPLICATE KEY UPDATE
+    total_sessions = VALUES(total_sessions),
+    pending_sessions = VALUES(pending_sessions);
+
+-- Helps the aggregate fallback (USE_SESSION_COUNTERS=false) as well
+CREATE INDEX IF NOT EXISTS idx_bookings_student_status ON bookings(student_id, status);
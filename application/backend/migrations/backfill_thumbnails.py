@@ -0,0 +1,143 @@
+"""
+Backfill thumbnails for images already stored under MEDIA_ROOT/photos.
+
+This script:
+- generates missing thumbnails (and WebP variants) for every photo, in a process pool
+- points tutor_profiles.profile_image_path_thumb at the generated thumbnail
+  wherever it still references the full-size image
+
+Safe to re-run: existing thumbnails are skipped.
+"""
+
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from search.database import SessionLocal
+from search.models.tutor_profile import TutorProfile
+from media_handling import service as media_service
+from media_handling.thumbnails import (
+    PILLOW_AVAILABLE,
+    THUMB_DIR,
+    THUMB_SIZE,
+    THUMB_WEBP,
+    THUMB_WORKERS,
+    get_thumbnail_path,
+    is_thumbnailable,
+    render_thumbnail,
+)
+
+
+def find_missing_thumbnails():
+    """Yield (media_path, source, destination, webp_destination) for photos without a thumbnail."""
+    photos_root = os.path.join(media_service.MEDIA_ROOT, "photos")
+    for directory, subdirs, filenames in os.walk(photos_root):
+        # never thumbnail the thumbnails
+        subdirs[:] = [d for d in subdirs if d != THUMB_DIR]
+        for filename in filenames:
+            source = os.path.join(directory, filename)
+            relative = os.path.relpath(source, media_service.MEDIA_ROOT).replace(os.sep, "/")
+            media_path = f"/media/{relative}"
+            if filename.startswith(".") or not is_thumbnailable(media_path):
+                continue
+            destination = os.path.join(directory, THUMB_DIR, os.path.basename(get_thumbnail_path(media_path)))
+            if os.path.exists(destination):
+                continue
+            webp_destination = os.path.splitext(destination)[0] + ".webp" if THUMB_WEBP else None
+            yield media_path, source, destination, webp_destination
+
+
+def generate_missing_thumbnails() -> int:
+    """Render every missing thumbnail in a process pool."""
+    print(f"Scanning {media_service.MEDIA_ROOT}/photos for images without thumbnails...")
+    jobs = list(find_missing_thumbnails())
+    print(f"Found {len(jobs)} images to thumbnail")
+
+    generated = 0
+    with ProcessPoolExecutor(max_workers=THUMB_WORKERS) as pool:
+        futures = {
+            pool.submit(render_thumbnail, source, destination, THUMB_SIZE, webp_destination): media_path
+            for media_path, source, destination, webp_destination in jobs
+        }
+        for future in as_completed(futures):
+            media_path = futures[future]
+            try:
+                future.result()
+                generated += 1
+            except Exception as e:
+                print(f"  ✗ {media_path}: {e}")
+
+    print(f"✓ Generated {generated} thumbnails")
+    return generated
+
+
+def backfill_tutor_profiles(db: Session) -> int:
+    """Point profile thumbnails at generated files where they still use the full image."""
+    print("\nUpdating tutor_profiles thumbnails...")
+
+    updated_count = 0
+    for profile in db.query(TutorProfile).all():
+        full_path = profile.profile_image_path_full
+        if not is_thumbnailable(full_path):
+            continue
+        if profile.profile_image_path_thumb not in (None, full_path):
+            continue
+
+        thumb_path = get_thumbnail_path(full_path)
+        if media_service.get_full_file_path(thumb_path) is None:
+            continue
+
+        print(f"  Updating tutor_id {profile.tutor_id} profile_image_path_thumb: {profile.profile_image_path_thumb} → {thumb_path}")
+        profile.profile_image_path_thumb = thumb_path
+        updated_count += 1
+
+    if updated_count > 0:
+        db.commit()
+        print(f"✓ Updated {updated_count} tutor_profiles records")
+    else:
+        print("✓ No tutor_profiles records needed updating")
+
+    return updated_count
+
+
+def main():
+    """Main backfill function."""
+    print("=" * 60)
+    print("Thumbnail Backfill Script")
+    print("=" * 60)
+    print()
+
+    if not PILLOW_AVAILABLE:
+        print("✗ Pillow is not installed (pip install Pillow). Nothing to do.")
+        return
+
+    generated = generate_missing_thumbnails()
+
+    db = SessionLocal()
+    try:
+        profiles_count = backfill_tutor_profiles(db)
+
+        print()
+        print("=" * 60)
+        print("Backfill Summary")
+        print("=" * 60)
+        print(f"thumbnails generated: {generated}")
+        print(f"tutor_profiles records updated: {profiles_count}")
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n✗ Error during backfill: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from .schemas import RegistrationRequest, RegistrationResponse
 
 from .service import email_exists, create_user
 from search.database import get_db
+from auth.hashing import HashingBusy
 
 router = APIRouter(prefix="/api", tags=["registration"])
 
@@ -15,7 +16,14 @@ def register_user(data: RegistrationRequest, db: Session = Depends(get_db)):
             detail="email already registered."
         )
 
-    user = create_user(db, data.first_name, data.last_name, data.email, data.password)
+    try:
+        user = create_user(db, data.first_name, data.last_name, data.email, data.password)
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="too many requests right now, try again shortly.",
+            headers={"Retry-After": "1"}
+        )
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
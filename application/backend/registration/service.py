@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from search.models.user import User
-from passlib.context import CryptContext
+from auth.hashing import hash_password
 from sqlalchemy.exc import IntegrityError
 
 def email_exists(db: Session, email: str) -> bool:
@@ -13,8 +13,7 @@ def email_exists(db: Session, email: str) -> bool:
 
 
 def create_user(db: Session, first_name: str, last_name: str, email: str, password: str):
-    pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-    password_hash = pwd_context.hash(password)
+    password_hash = hash_password(password)
 
     user = User(
         sfsu_email=email,
@@ -1,8 +1,10 @@
 from .booking import Booking
 from .availability_slot import AvailabilitySlot
+from .student_session_count import StudentSessionCount
 
 __all__ = [
     "Booking",
     "AvailabilitySlot",
+    "StudentSessionCount",
 ]
 
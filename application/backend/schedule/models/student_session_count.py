@@ -0,0 +1,28 @@
+"""
+Precomputed per-student booking counters for the admin students page.
+"""
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.sql import func
+from search.database import Base
+
+# Booking statuses counted as sessions (total) and as waiting on the tutor (pending)
+SESSION_STATUSES = ("confirmed", "completed")
+PENDING_STATUSES = ("pending",)
+
+
+class StudentSessionCount(Base):
+    """
+    One row per student with the counts /api/admin/registered-students shows.
+
+    Only maintained when USE_SESSION_COUNTERS is enabled; create and backfill
+    the table with migrations/add_student_session_counts.sql first.
+    """
+    __tablename__ = "student_session_counts"
+
+    student_id = Column(Integer, primary_key=True)
+    total_sessions = Column(Integer, nullable=False, default=0)
+    pending_sessions = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<StudentSessionCount(student={self.student_id}, total={self.total_sessions}, pending={self.pending_sessions})>"
@@ -1,14 +1,65 @@
 """
 Service functions for booking operations.
 """
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 
 from ..models.booking import Booking
+from ..models.student_session_count import StudentSessionCount, SESSION_STATUSES, PENDING_STATUSES
+from search.config import settings
 from search.models import TutorProfile, User, Course
 from ..schemas.booking_schemas import BookingCreate
 
 
+def adjust_session_counts(db: Session, student_id: int, old_status: Optional[str], new_status: Optional[str]) -> None:
+    """
+    Move one booking between counters in student_session_counts.
+    
+    Runs in the caller's transaction so the counter commits (or rolls back)
+    together with the booking change. No-op unless USE_SESSION_COUNTERS is set.
+    """
+    if not settings.USE_SESSION_COUNTERS:
+        return
+    total_delta = (new_status in SESSION_STATUSES) - (old_status in SESSION_STATUSES)
+    pending_delta = (new_status in PENDING_STATUSES) - (old_status in PENDING_STATUSES)
+    if not total_delta and not pending_delta:
+        return
+    
+    # One upsert with relative increments: concurrent status changes can't
+    # overwrite each other, and two first bookings can't both try to INSERT
+    db.execute(_counter_upsert(db, student_id, total_delta, pending_delta))
+
+
+def _counter_upsert(db: Session, student_id: int, total_delta: int, pending_delta: int):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE for a student's counters."""
+    values = {
+        "student_id": student_id,
+        "total_sessions": max(total_delta, 0),
+        "pending_sessions": max(pending_delta, 0),
+    }
+    increments = {
+        "total_sessions": StudentSessionCount.total_sessions + total_delta,
+        "pending_sessions": StudentSessionCount.pending_sessions + pending_delta,
+        "updated_at": func.now(),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        return mysql_insert(StudentSessionCount).values(**values).on_duplicate_key_update(**increments)
+    if dialect == "postgresql":
+        insert = postgresql_insert
+    elif dialect == "sqlite":
+        insert = sqlite_insert
+    else:
+        raise NotImplementedError(f"session counters are not supported on {dialect}")
+    return insert(StudentSessionCount).values(**values).on_conflict_do_update(
+        index_elements=[StudentSessionCount.student_id], set_=increments
+    )
+
+
 def create_booking(db: Session, booking_data: BookingCreate) -> Booking:
     """
     Create a new booking.
@@ -52,6 +103,7 @@ def create_booking(db: Session, booking_data: BookingCreate) -> Booking:
     )
     
     db.add(new_booking)
+    adjust_session_counts(db, new_booking.student_id, None, new_booking.status)
     db.commit()
     db.refresh(new_booking)
     
@@ -178,6 +230,7 @@ def update_booking_status(db: Session, booking_id: int, new_status: str, tutor_i
         raise ValueError("Only the tutor associated with this booking can update its status")
     
     # Update status
+    adjust_session_counts(db, booking.student_id, booking.status, new_status)
     booking.status = new_status
     db.commit()
     db.refresh(booking)
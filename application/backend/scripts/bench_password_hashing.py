@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark password verification (logins/sec) with the current argon2 settings.
+
+Usage:
+    python scripts/bench_password_hashing.py [--seconds 5] [--workers 1 2 4] [--clients 16]
+                                             [--time-cost N] [--memory-cost KIB] [--parallelism N]
+    python scripts/bench_password_hashing.py --calibrate [--target-ms 50] [--max-memory KIB] [--parallelism N]
+
+First measures verify() inline on one core, then through the hashing pool
+with each worker count while --clients threads log in concurrently, the way
+request threads would. Cost options override the ARGON2_* env vars.
+
+--calibrate instead searches for the strongest memory/time cost whose median
+verify stays under --target-ms on this machine and prints the ARGON2_* values
+to put in .env. Existing users are rehashed with them on their next login.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PASSWORD = "correct horse battery staple"
+# Memory costs tried by --calibrate (KiB); 19 MiB is the OWASP minimum for argon2id
+CALIBRATE_MEMORY_COSTS = [19456, 32768, 47104, 65536, 98304, 131072, 196608, 262144]
+CALIBRATE_MAX_TIME_COST = 10
+
+
+def bench_inline(hashing, password_hash, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hashing._verify(PASSWORD, password_hash)
+        count += 1
+    return count / seconds
+
+
+def bench_pool(hashing, password_hash, seconds, clients):
+    counts = [0] * clients
+    rejected = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            try:
+                hashing.verify_password(PASSWORD, password_hash)
+                counts[index] += 1
+            except hashing.HashingBusy:
+                rejected[index] += 1
+
+    hashing.verify_password(PASSWORD, password_hash)  # start the workers outside the timing
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds, sum(rejected)
+
+
+def verify_ms(hashing, time_cost, memory_cost, parallelism, samples=5):
+    """Median verify latency in ms for the given parameters."""
+    context = hashing.build_context(time_cost, memory_cost, parallelism)
+    password_hash = context.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify(PASSWORD, password_hash)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(hashing, target_ms, max_memory, parallelism):
+    """Strongest (time_cost, memory_cost) whose median verify is within target_ms."""
+    best = None
+    for memory_cost in [m for m in CALIBRATE_MEMORY_COSTS if m <= max_memory]:
+        fitting = None
+        for time_cost in range(1, CALIBRATE_MAX_TIME_COST + 1):
+            latency = verify_ms(hashing, time_cost, memory_cost, parallelism)
+            print(f"  m={memory_cost:>6}KiB t={time_cost:<2} {latency:7.1f} ms")
+            if latency > target_ms:
+                break
+            fitting = (time_cost, memory_cost, latency)
+        if fitting is None:
+            break  # even t=1 is too slow, more memory won't help
+        if best is None or fitting[0] * fitting[1] > best[0] * best[1]:
+            best = fitting
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark argon2 password verification.")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="pool sizes to try")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent login threads")
+    parser.add_argument("--time-cost", type=int)
+    parser.add_argument("--memory-cost", type=int, help="KiB")
+    parser.add_argument("--parallelism", type=int)
+    parser.add_argument("--calibrate", action="store_true", help="pick cost parameters for --target-ms")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="verify latency budget for --calibrate")
+    parser.add_argument("--max-memory", type=int, default=262144, help="largest memory cost to try (KiB)")
+    args = parser.parse_args()
+
+    # Set before importing auth.hashing so the pool workers see the same values
+    for name, value in (("ARGON2_TIME_COST", args.time_cost), ("ARGON2_MEMORY_COST", args.memory_cost),
+                        ("ARGON2_PARALLELISM", args.parallelism)):
+        if value is not None:
+            os.environ[name] = str(value)
+
+    from auth import hashing
+
+    if args.calibrate:
+        parallelism = args.parallelism or hashing.ARGON2_PARALLELISM
+        print(f"Calibrating argon2id for a {args.target_ms:.0f} ms verify (p={parallelism}, {os.cpu_count()} CPUs)")
+        best = calibrate(hashing, args.target_ms, args.max_memory, parallelism)
+        if best is None:
+            print(f"✗ no parameters verify within {args.target_ms:.0f} ms; raise --target-ms")
+            sys.exit(1)
+        time_cost, memory_cost, latency = best
+        print("=" * 60)
+        print(f"✓ {latency:.1f} ms per verify, about {1000 / latency:.0f} logins/sec per core")
+        print(f"ARGON2_TIME_COST={time_cost}")
+        print(f"ARGON2_MEMORY_COST={memory_cost}")
+        print(f"ARGON2_PARALLELISM={parallelism}")
+        return
+
+    password_hash = hashing._hash(PASSWORD)
+    print("=" * 60)
+    print(f"argon2id t={hashing.ARGON2_TIME_COST} m={hashing.ARGON2_MEMORY_COST}KiB p={hashing.ARGON2_PARALLELISM}"
+          f" on {os.cpu_count()} CPUs")
+    print("=" * 60)
+
+    inline = bench_inline(hashing, password_hash, args.seconds)
+    print(f"inline, 1 core:      {inline:8.1f} logins/sec  ({1000 / inline:.1f} ms per verify)")
+
+    for workers in args.workers:
+        hashing.shutdown_hashing_pool()
+        hashing.HASH_WORKERS = workers
+        rate, rejected = bench_pool(hashing, password_hash, args.seconds, args.clients)
+        print(f"pool, {workers} worker(s):  {rate:8.1f} logins/sec  ({rate / workers:.1f} per core, "
+              f"{rejected} rejected)")
+    hashing.shutdown_hashing_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,14 @@ import yaml
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 
+# Defaults for the optional 'media' section of routes.yaml
+MEDIA_DEFAULTS = {
+    'prefix': '/media',
+    'root': '/home/atharva/media',
+    'max_age': 86400,
+    'immutable_max_age': 31536000,
+}
+
 def main():
     # Get script directory
     script_dir = Path(__file__).parent
@@ -61,7 +69,8 @@ def main():
     try:
         output = template.render(
             server=config['server'],
-            routes=config['routes']
+            routes=config['routes'],
+            media={**MEDIA_DEFAULTS, **(config.get('media') or {})}
         )
     except Exception as e:
         print(f"Error rendering template: {e}", file=sys.stderr)
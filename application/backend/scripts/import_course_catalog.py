@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Import a semester's course catalog from CSV.
+
+Usage:
+    python scripts/import_course_catalog.py catalog.csv [--keep-missing] [--dry-run] [--batch-size N]
+
+The CSV needs department_code, course_number and title columns. New courses
+are inserted, changed titles updated, and (unless --keep-missing) active
+courses that are not in the file are deactivated.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from search.database import SessionLocal
+from admin.services.catalog_import import (
+    DEFAULT_BATCH_SIZE,
+    CatalogImportError,
+    import_catalog,
+    read_catalog_rows,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the course catalog from a CSV file.")
+    parser.add_argument("csv_file", help="CSV with department_code, course_number, title columns")
+    parser.add_argument("--keep-missing", action="store_true", help="don't deactivate courses missing from the file")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without saving")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per upsert batch")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        with open(args.csv_file, newline="", encoding="utf-8-sig") as stream:
+            report = import_catalog(
+                db,
+                read_catalog_rows(stream),
+                deactivate_missing=not args.keep_missing,
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+            )
+    except CatalogImportError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print("=" * 60)
+    print("Catalog Import Summary" + (" (dry run, nothing saved)" if args.dry_run else ""))
+    print("=" * 60)
+    for key in ("rows", "inserted", "updated", "unchanged", "deactivated", "duplicates", "error_count"):
+        print(f"{key}: {report[key]}")
+    if report.get("deactivation_skipped"):
+        print("deactivation skipped: the file had invalid rows")
+    for error in report["errors"]:
+        print(f"  ✗ line {error['line']}: {error['error']}")
+    print(f"took {time.monotonic() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
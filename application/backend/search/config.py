@@ -28,6 +28,10 @@ class Settings:
     ENABLE_CACHE: bool = os.getenv("ENABLE_CACHE", "false").lower() == "true"
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "60"))
     
+    # Keep per-student booking counters in student_session_counts and read the
+    # admin students page from them instead of aggregating bookings
+    USE_SESSION_COUNTERS: bool = os.getenv("USE_SESSION_COUNTERS", "false").lower() == "true"
+    
     # API configuration
     API_HOST: str = os.getenv("API_HOST", "127.0.0.1")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
@@ -16,12 +16,14 @@ from search.models.course import Course
 from search.models.tutor_course import TutorCourse
 from schedule.models.booking import Booking
 from schedule.models.availability_slot import AvailabilitySlot
+from schedule.models.student_session_count import StudentSessionCount
 from chat.models.chat_message import ChatMessage
 from chat.models.chat_media import ChatMedia
 from admin.models.tutor_application import TutorApplication
 from admin.models.tutor_course_request import TutorCourseRequest
 from admin.models.course_request import CourseRequest
 from admin.models.reports import Reports
+from auth.identity_cache import identity_cache
 
 # Create in-memory SQLite database for testing
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -36,6 +38,8 @@ def test_engine():
     )
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    # Cached users/profiles belong to the previous test's database
+    identity_cache.clear()
     yield engine
     # Drop all tables after test
     Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,110 @@
+"""
+Tests for bulk approve/reject of tutor applications and course requests.
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from admin.models.course_request import CourseRequest
+from admin.models.tutor_application import TutorApplication
+from admin.models.tutor_course_request import TutorCourseRequest
+from admin.services.bulk_service import (
+    bulk_update_application_status,
+    bulk_update_course_request_status,
+    bulk_update_tutor_course_request_status,
+)
+from search.models.course import Course
+from search.models.tutor_course import TutorCourse
+from search.models.tutor_profile import TutorProfile
+from search.models.user import User
+
+
+def application(db: Session, user: User, status="pending"):
+    app = TutorApplication(user_id=user.user_id, full_name=f"{user.first_name} {user.last_name}",
+                           email=user.sfsu_email, gpa=3.5, bio="I like teaching", status=status)
+    db.add(app)
+    db.commit()
+    return app
+
+
+def test_bulk_approve_applications(test_engine, test_db, test_user_a, test_user_b, test_tutor_user):
+    """Test: pending applications are approved together, the rest reported per item."""
+    first = application(test_db, test_user_a)
+    second = application(test_db, test_user_b)
+    done = application(test_db, test_user_a, status="rejected")
+    already_tutor = application(test_db, test_tutor_user)
+    ids = [first.application_id, 9999, second.application_id, done.application_id, already_tutor.application_id]
+    commits = []
+    event.listen(test_db, "after_commit", lambda session: commits.append(session))
+
+    report = bulk_update_application_status(test_db, ids, "approved")
+
+    assert len(commits) == 1
+    assert (report["updated"], report["failed"]) == (3, 2)
+    assert [r["id"] for r in report["results"]] == ids
+    assert [r["success"] for r in report["results"]] == [True, False, True, False, True]
+    assert report["results"][1]["detail"] == "Application not found"
+    assert report["results"][3]["detail"] == "Application already rejected"
+
+    profiles = {p.tutor_id for p in test_db.query(TutorProfile)}
+    assert {test_user_a.user_id, test_user_b.user_id, test_tutor_user.user_id} <= profiles
+    test_db.refresh(test_user_a)
+    assert test_user_a.role == "tutor"
+
+
+def test_bulk_reject_applications_creates_nothing(test_db, test_user_a):
+    """Test: rejecting only flips the status."""
+    app = application(test_db, test_user_a)
+
+    report = bulk_update_application_status(test_db, [app.application_id], "rejected")
+
+    assert report["results"][0]["status"] == "rejected"
+    assert test_db.query(TutorProfile).count() == 0
+
+
+def test_bulk_approve_tutor_course_requests(test_db, test_tutor_user):
+    """Test: course rows are added in one go; already-taught courses are reported."""
+    courses = [Course(department_code="CSC", course_number=str(n), title=f"Course {n}") for n in (413, 510, 648)]
+    test_db.add_all(courses)
+    test_db.commit()
+    test_db.add(TutorCourse(tutor_id=test_tutor_user.user_id, course_id=courses[0].course_id))
+    requests = [TutorCourseRequest(tutor_id=test_tutor_user.user_id, course_id=c.course_id) for c in courses]
+    test_db.add_all(requests)
+    test_db.commit()
+
+    report = bulk_update_tutor_course_request_status(test_db, [r.request_id for r in requests], "approved")
+
+    assert [r["success"] for r in report["results"]] == [False, True, True]
+    assert "already has this course" in report["results"][0]["detail"]
+    assert test_db.query(TutorCourse).filter_by(tutor_id=test_tutor_user.user_id).count() == 3
+    assert requests[0].status == "pending"
+
+
+def test_bulk_approve_course_requests_adds_catalog_entries(test_db, test_user_a):
+    """Test: approved coverage requests add each new course once; bad numbers are reported."""
+    test_db.add(Course(department_code="CSC", course_number="648", title="Software Engineering"))
+    requests = [
+        CourseRequest(user_id=test_user_a.user_id, course_number="CSC 648", title="SE"),
+        CourseRequest(user_id=test_user_a.user_id, course_number="MATH-226", title="Calculus I"),
+        CourseRequest(user_id=test_user_a.user_id, course_number="math 226", title="Calculus"),
+        CourseRequest(user_id=test_user_a.user_id, course_number="???", title="Unknown"),
+    ]
+    test_db.add_all(requests)
+    test_db.commit()
+
+    report = bulk_update_course_request_status(test_db, [r.course_req_id for r in requests], "approved")
+
+    assert [r["success"] for r in report["results"]] == [True, True, True, False]
+    assert report["results"][3]["detail"] == "Invalid course_number format"
+    codes = sorted((c.department_code, c.course_number) for c in test_db.query(Course))
+    assert codes == [("CSC", "648"), ("MATH", "226"), ("math", "226")]
+
+
+def test_bulk_request_validation(test_db):
+    """Test: bad statuses and empty id lists are rejected up front."""
+    with pytest.raises(HTTPException) as excinfo:
+        bulk_update_application_status(test_db, [1], "pending")
+    assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException):
+        bulk_update_course_request_status(test_db, [], "approved")
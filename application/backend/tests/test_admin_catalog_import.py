@@ -0,0 +1,150 @@
+"""
+Tests for the bulk course catalog import (CSV upsert + deactivation).
+"""
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from admin.services.catalog_import import CatalogImportError, import_catalog, read_catalog_rows
+from main import app
+from search.database import get_db
+from search.models.course import Course
+
+
+def rows(text):
+    return read_catalog_rows(io.StringIO(text))
+
+
+@pytest.fixture
+def catalog(test_db):
+    courses = [
+        Course(department_code="CSC", course_number="210", title="Intro to Programming", is_active=True),
+        Course(department_code="CSC", course_number="220", title="Data Structures", is_active=True),
+        Course(department_code="MATH", course_number="226", title="Calculus I", is_active=False),
+        Course(department_code="PHYS", course_number="220", title="Physics", is_active=True),
+    ]
+    test_db.add_all(courses)
+    test_db.commit()
+    return courses
+
+
+def active_titles(db):
+    return {
+        (course.department_code, course.course_number): course.title
+        for course in db.query(Course).filter(Course.is_active == True)
+    }
+
+
+def test_import_upserts_and_deactivates(test_db, catalog):
+    """Test: new rows are inserted, titles updated, inactive courses revived, missing ones deactivated."""
+    report = import_catalog(test_db, rows(
+        "department_code,course_number,title\n"
+        "CSC,210,Intro to Programming\n"
+        "CSC,220,Data Structures and Algorithms\n"
+        "MATH,226,Calculus I\n"
+        "CSC,648,Software Engineering\n"
+        "CSC,648,Duplicate Row\n"
+    ))
+
+    assert report["inserted"] == 1
+    assert report["updated"] == 2
+    assert report["unchanged"] == 1
+    assert report["duplicates"] == 1
+    assert report["deactivated"] == 1
+    assert report["error_count"] == 0
+    assert active_titles(test_db) == {
+        ("CSC", "210"): "Intro to Programming",
+        ("CSC", "220"): "Data Structures and Algorithms",
+        ("MATH", "226"): "Calculus I",
+        ("CSC", "648"): "Software Engineering",
+    }
+
+
+def test_invalid_rows_skip_deactivation(test_db, catalog):
+    """Test: bad rows are reported by line and nothing gets deactivated."""
+    report = import_catalog(test_db, rows(
+        "Department_Code,Course_Number,Title,Units\n"
+        "CSC,413,Software Development,3\n"
+        "CSC,,Missing Number,3\n"
+    ))
+
+    assert report["inserted"] == 1
+    assert report["errors"] == [{"line": 3, "error": "department_code, course_number and title are required"}]
+    assert report["deactivation_skipped"] is True
+    assert ("PHYS", "220") in active_titles(test_db)
+
+
+def test_mixed_case_rows_match_existing_courses(test_db, catalog):
+    """Test: lowercase department codes update the existing course instead of adding a duplicate."""
+    report = import_catalog(test_db, rows(
+        "department_code,course_number,title\n"
+        "csc,210,Intro to Programming\n"
+        " Csc ,220,Data Structures and Algorithms\n"
+        "math,226,Calculus I\n"
+        "phys,220,Physics\n"
+        "CSC,220,Duplicate Row\n"
+    ))
+
+    assert report["inserted"] == 0
+    assert report["updated"] == 2
+    assert report["unchanged"] == 2
+    assert report["duplicates"] == 1
+    assert report["deactivated"] == 0
+    assert test_db.query(Course).count() == 4
+    assert active_titles(test_db)[("CSC", "220")] == "Data Structures and Algorithms"
+
+
+def test_dry_run_changes_nothing(test_db, catalog):
+    """Test: a dry run reports the same counts but leaves the table alone."""
+    report = import_catalog(test_db, rows("department_code,course_number,title\nCSC,648,Software Engineering\n"),
+                            dry_run=True)
+
+    assert report["inserted"] == 1 and report["deactivated"] == 3 and report["dry_run"] is True
+    assert set(active_titles(test_db)) == {("CSC", "210"), ("CSC", "220"), ("PHYS", "220")}
+
+
+def test_one_lookup_per_batch(test_engine, test_db, catalog):
+    """Test: existing courses are probed once per batch, not once per row."""
+    lines = "".join(f"ENGR,{n},Course {n}\n" for n in range(100, 125))
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM courses" in statement:
+            statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", count)
+    try:
+        report = import_catalog(test_db, rows("department_code,course_number,title\n" + lines),
+                                deactivate_missing=False, batch_size=10)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", count)
+
+    assert report["inserted"] == 25
+    assert len(statements) == 3
+
+
+def test_missing_columns_rejected(test_db):
+    with pytest.raises(CatalogImportError):
+        import_catalog(test_db, rows("dept,number,title\nCSC,210,Intro\n"))
+
+
+def test_import_endpoint(test_db, catalog):
+    """Test: the endpoint accepts a multipart CSV upload and returns the report."""
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        csv_bytes = "﻿department_code,course_number,title\nCSC,210,Intro to Programming\n".encode()
+        response = client.post("/api/admin/import-catalog", params={"deactivate_missing": "false"},
+                               files={"file": ("catalog.csv", csv_bytes, "text/csv")})
+        bad = client.post("/api/admin/import-catalog", files={"file": ("catalog.csv", b"title\nIntro\n", "text/csv")})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["unchanged"] == 1 and response.json()["deactivated"] == 0
+    assert bad.status_code == 400
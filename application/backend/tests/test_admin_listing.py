@@ -0,0 +1,170 @@
+"""
+Tests for the shared admin listing layer (filters, sorting, cursor pagination).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from admin.models.course_request import CourseRequest
+from admin.models.reports import Reports
+from admin.models.tutor_application import TutorApplication
+from admin.models.tutor_course_request import TutorCourseRequest
+from admin.services.admin_service import (
+    get_all_course_requests,
+    get_all_courses,
+    get_all_reports,
+    get_all_tutor_applications,
+    get_all_tutor_course_requests,
+)
+from search.database import get_db
+from search.models.course import Course
+from main import app
+
+
+@pytest.fixture
+def reports(test_db: Session, test_user_a, test_user_b):
+    start = datetime(2025, 1, 1)
+    # two reports share a timestamp so the id tie-breaker matters
+    times = [start, start + timedelta(days=1), start + timedelta(days=1), start + timedelta(days=2), start + timedelta(days=3)]
+    statuses = ["submitted", "closed", "submitted", "reviewing", "submitted"]
+    rows = [
+        Reports(reporter_id=test_user_a.user_id, reported_user_id=test_user_b.user_id,
+                reason=f"reason {i}", status=status, created_at=created_at)
+        for i, (created_at, status) in enumerate(zip(times, statuses))
+    ]
+    test_db.add_all(rows)
+    test_db.commit()
+    return rows
+
+
+def walk(fetch, **listing):
+    """Follow next_cursor until the last page; returns the pages."""
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor=cursor, **listing)
+        pages.append(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_unpaginated_listing_returns_everything(test_db, reports):
+    """Test: without a limit every row comes back, newest first."""
+    page = get_all_reports(test_db)
+
+    assert page.next_cursor is None
+    assert [item["reason"] for item in page.items] == ["reason 4", "reason 3", "reason 2", "reason 1", "reason 0"]
+
+
+def test_cursor_pages_cover_every_row_once(test_db, reports):
+    """Test: keyset pages never skip or repeat rows, including timestamp ties."""
+    for order in ("desc", "asc"):
+        pages = walk(lambda **kw: get_all_reports(test_db, **kw), limit=2, order=order)
+        ids = [item["report_id"] for page in pages for item in page]
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert sorted(ids) == sorted(r.report_id for r in reports)
+        assert len(set(ids)) == len(ids)
+
+
+def test_status_filter_and_sort(test_db, reports):
+    """Test: status filters in SQL; sort keys are validated."""
+    submitted = get_all_reports(test_db, status="submitted").items
+    assert {item["status"] for item in submitted} == {"submitted"}
+    assert len(submitted) == 3
+
+    with pytest.raises(HTTPException) as excinfo:
+        get_all_reports(test_db, status="deleted")
+    assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException):
+        get_all_reports(test_db, sort="reason")
+
+
+def test_cursor_must_match_sort(test_db, reports):
+    """Test: a cursor from one sort can't be replayed against another."""
+    cursor = get_all_reports(test_db, limit=2).next_cursor
+
+    with pytest.raises(HTTPException):
+        get_all_reports(test_db, limit=2, cursor=cursor, sort="status")
+    with pytest.raises(HTTPException):
+        get_all_reports(test_db, cursor="not-a-cursor")
+
+
+def test_listing_fetches_projection_in_one_query(test_engine, test_db, test_user_a):
+    """Test: course requests come back with requester info from one SELECT of plain columns."""
+    test_db.add_all([
+        CourseRequest(user_id=test_user_a.user_id, course_number=f"CSC {n}", title=f"Course {n}")
+        for n in range(5)
+    ])
+    test_db.commit()
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    items = get_all_course_requests(test_db, limit=3).items
+
+    assert len(statements) == 1
+    assert [item["course_number"] for item in items] == ["CSC 0", "CSC 1", "CSC 2"]
+    assert items[0]["user_name"] == "User A"
+    assert items[0]["email"] == "user.a@sfsu.edu"
+
+
+def test_courses_multi_column_sort_and_active_filter(test_db):
+    """Test: courses page by (department, number) and filter on is_active."""
+    test_db.add_all([
+        Course(department_code="MATH", course_number="226", title="Calculus I", is_active=True),
+        Course(department_code="CSC", course_number="648", title="Software Engineering", is_active=True),
+        Course(department_code="CSC", course_number="413", title="Software Development", is_active=False),
+        Course(department_code="CSC", course_number="510", title="Analysis of Algorithms", is_active=True),
+    ])
+    test_db.commit()
+
+    pages = walk(lambda **kw: get_all_courses(test_db, **kw), limit=1)
+    codes = [f"{c['department_code']} {c['course_number']}" for page in pages for c in page]
+    assert codes == ["CSC 413", "CSC 510", "CSC 648", "MATH 226"]
+
+    inactive = get_all_courses(test_db, status="inactive").items
+    assert [c["course_number"] for c in inactive] == ["413"]
+
+
+def test_tutor_course_requests_keep_nested_shape(test_db, test_tutor_user):
+    """Test: projected rows are reshaped into the nested course/tutor response."""
+    course = Course(department_code="CSC", course_number="648", title="Software Engineering")
+    test_db.add(course)
+    test_db.commit()
+    test_db.add(TutorCourseRequest(tutor_id=test_tutor_user.user_id, course_id=course.course_id))
+    test_db.commit()
+
+    item = get_all_tutor_course_requests(test_db, status="pending").items[0]
+
+    assert item["course"]["title"] == "Software Engineering"
+    assert item["tutor"]["user"] == {"user_id": test_tutor_user.user_id, "first_name": "Tutor", "last_name": "Test"}
+
+
+def test_endpoints_expose_next_cursor(test_db, reports, test_user_a):
+    """Test: list endpoints page via ?limit and X-Next-Cursor; applications use next_cursor."""
+    test_db.add_all([
+        TutorApplication(user_id=test_user_a.user_id, full_name=f"Applicant {n}", email="a@sfsu.edu", gpa=3.0 + n / 10)
+        for n in range(3)
+    ])
+    test_db.commit()
+
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        first = client.get("/api/admin/allreports", params={"limit": 3})
+        second = client.get("/api/admin/allreports", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+        applications = client.get("/api/admin/all-tutor-applications", params={"limit": 2, "sort": "gpa"}).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200 and len(first.json()) == 3
+    assert len(second.json()) == 2 and "X-Next-Cursor" not in second.headers
+    assert [a["full_name"] for a in applications["items"]] == ["Applicant 2", "Applicant 1"]
+    assert applications["next_cursor"]
@@ -0,0 +1,153 @@
+"""
+Tests for the registered students admin listing and its session counters.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from admin.services.admin_service import get_registered_students
+from schedule.models.booking import Booking
+from schedule.models.student_session_count import StudentSessionCount
+from schedule.schemas.booking_schemas import BookingCreate
+from schedule.services.booking_service import adjust_session_counts, create_booking, update_booking_status
+from search.config import settings
+from search.models.course import Course
+from search.models.user import User
+
+
+def add_bookings(db: Session, student_id: int, tutor_id: int, statuses):
+    start = datetime(2025, 1, 6, 9, 0)
+    for offset, status in enumerate(statuses):
+        db.add(Booking(
+            tutor_id=tutor_id,
+            student_id=student_id,
+            start_time=start + timedelta(hours=offset),
+            end_time=start + timedelta(hours=offset, minutes=50),
+            status=status
+        ))
+    db.commit()
+
+
+def add_student(db: Session, first_name: str, last_name: str, email: str):
+    user = User(sfsu_email=email, first_name=first_name, last_name=last_name, role="student", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def students(test_db, test_user_a, test_user_b, test_tutor_user):
+    add_bookings(test_db, test_user_a.user_id, test_tutor_user.user_id, ["confirmed", "completed", "pending", "cancelled"])
+    add_bookings(test_db, test_user_b.user_id, test_tutor_user.user_id, ["pending", "pending"])
+    return test_user_a, test_user_b
+
+
+def test_counts_from_one_query(test_engine, test_db, students, test_user):
+    """Test: every student's counts come back from a single SELECT."""
+    user_a, user_b = students
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = get_registered_students(test_db)
+
+    assert len(statements) == 1
+    by_id = {item["user_id"]: item for item in result["items"]}
+    assert (by_id[user_a.user_id]["total_sessions"], by_id[user_a.user_id]["pending_sessions"]) == (2, 1)
+    assert (by_id[user_b.user_id]["total_sessions"], by_id[user_b.user_id]["pending_sessions"]) == (0, 2)
+    assert (by_id[test_user.user_id]["total_sessions"], by_id[test_user.user_id]["pending_sessions"]) == (0, 0)
+    assert result["total"] == 3
+
+
+def test_tutors_and_deleted_users_excluded(test_db, students, test_tutor_user):
+    """Test: tutors and soft-deleted users are not listed."""
+    user_a, user_b = students
+    user_b.is_deleted = True
+    test_db.commit()
+
+    ids = [item["user_id"] for item in get_registered_students(test_db)["items"]]
+
+    assert ids == [user_a.user_id]
+
+
+def test_search_sort_and_pagination(test_db, students):
+    """Test: search filters, sort orders and pages are applied in SQL."""
+    user_a, user_b = students
+    add_student(test_db, "Ada", "Lovelace", "ada@sfsu.edu")
+
+    assert [i["first_name"] for i in get_registered_students(test_db, search="LOVE")["items"]] == ["Ada"]
+    assert get_registered_students(test_db, sort="sessions")["items"][0]["user_id"] == user_a.user_id
+
+    page = get_registered_students(test_db, sort="email", page=2, page_size=2)
+    assert page["total"] == 3
+    assert (page["page"], page["page_size"]) == (2, 2)
+    assert [i["email"] for i in page["items"]] == ["user.b@sfsu.edu"]
+
+
+def test_invalid_sort_rejected(test_db):
+    """Test: an unknown sort key is a 400."""
+    with pytest.raises(HTTPException) as excinfo:
+        get_registered_students(test_db, sort="password")
+    assert excinfo.value.status_code == 400
+
+
+def test_counters_follow_booking_status(test_db, test_user_a, test_tutor_user, monkeypatch):
+    """Test: with counters enabled, booking changes keep student_session_counts in step."""
+    monkeypatch.setattr(settings, "USE_SESSION_COUNTERS", True)
+    course = Course(department_code="CSC", course_number="648", title="Software Engineering")
+    test_db.add(course)
+    test_db.commit()
+
+    def book(hour):
+        return create_booking(test_db, BookingCreate(
+            tutor_id=test_tutor_user.user_id,
+            student_id=test_user_a.user_id,
+            course_id=course.course_id,
+            start_time=datetime(2025, 1, 6, hour),
+            end_time=datetime(2025, 1, 6, hour, 50)
+        ))
+
+    first, second = book(9), book(10)
+    update_booking_status(test_db, first.booking_id, "confirmed", test_tutor_user.user_id)
+    update_booking_status(test_db, first.booking_id, "completed", test_tutor_user.user_id)
+    update_booking_status(test_db, second.booking_id, "cancelled", test_tutor_user.user_id)
+    book(11)
+
+    counter = test_db.query(StudentSessionCount).filter_by(student_id=test_user_a.user_id).one()
+    assert (counter.total_sessions, counter.pending_sessions) == (1, 1)
+
+    from_counters = get_registered_students(test_db)["items"]
+    monkeypatch.setattr(settings, "USE_SESSION_COUNTERS", False)
+    assert from_counters == get_registered_students(test_db)["items"]
+
+
+def test_counter_row_created_once(test_db, test_user_a, monkeypatch):
+    """Test: two first-time adjustments in one transaction upsert a single row instead of racing to INSERT."""
+    monkeypatch.setattr(settings, "USE_SESSION_COUNTERS", True)
+
+    adjust_session_counts(test_db, test_user_a.user_id, None, "pending")
+    adjust_session_counts(test_db, test_user_a.user_id, None, "confirmed")
+    adjust_session_counts(test_db, test_user_a.user_id, "pending", "cancelled")
+    test_db.commit()
+
+    counter = test_db.query(StudentSessionCount).filter_by(student_id=test_user_a.user_id).one()
+    assert (counter.total_sessions, counter.pending_sessions) == (1, 0)
+
+
+def test_counters_untouched_when_disabled(test_db, test_user_a, test_tutor_user):
+    """Test: the counters table is not written unless enabled."""
+    course = Course(department_code="CSC", course_number="413", title="Software Development")
+    test_db.add(course)
+    test_db.commit()
+
+    create_booking(test_db, BookingCreate(
+        tutor_id=test_tutor_user.user_id,
+        student_id=test_user_a.user_id,
+        course_id=course.course_id,
+        start_time=datetime(2025, 1, 6, 9),
+        end_time=datetime(2025, 1, 6, 9, 50)
+    ))
+
+    assert test_db.query(StudentSessionCount).count() == 0
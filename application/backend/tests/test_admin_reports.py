@@ -0,0 +1,96 @@
+"""
+Tests for report name resolution and the per-user report summary.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from admin.models.reports import Reports
+from admin.services.admin_service import get_report_summary, get_user_id_by_name, resolve_users_by_name
+from main import app
+from search.database import get_db
+from search.models.user import User
+
+
+@pytest.fixture
+def people(test_db: Session):
+    names = [("Ana", "Lopez"), ("Anabel", "Smith"), ("Dana", "Anderson"), ("Mark", "Ana"), ("Ann", "Lo"), ("Zo_e", "Kim")]
+    users = [
+        User(first_name=first, last_name=last, sfsu_email=f"{first.lower()}.{last.lower()}@sfsu.edu",
+             role="student", password_hash="x")
+        for first, last in names
+    ]
+    test_db.add_all(users)
+    test_db.commit()
+    return {f"{user.first_name} {user.last_name}": user for user in users}
+
+
+def names(users):
+    return [f"{user.first_name} {user.last_name}" for user in users]
+
+
+def test_resolve_ranks_exact_before_prefix(test_db, people):
+    """Test: exact first/last name matches rank above prefixes; no substring matches."""
+    assert names(resolve_users_by_name(test_db, "ana")) == ["Mark Ana", "Ana Lopez", "Anabel Smith"]
+    assert get_user_id_by_name(test_db, "  ANA ") == people["Mark Ana"].user_id
+
+
+def test_resolve_full_name(test_db, people):
+    """Test: two-part names match first and last name prefixes, exact full name first."""
+    assert names(resolve_users_by_name(test_db, "an lo")) == ["Ann Lo", "Ana Lopez"]
+    assert names(resolve_users_by_name(test_db, "ana lopez")) == ["Ana Lopez"]
+
+
+def test_resolve_escapes_wildcards(test_db, people):
+    assert names(resolve_users_by_name(test_db, "zo_")) == ["Zo_e Kim"]
+    assert resolve_users_by_name(test_db, "%") == []
+    assert get_user_id_by_name(test_db, "nobody") is None
+
+
+def test_report_summary_counts_by_status(test_engine, test_db, people):
+    """Test: the summary counts each status per reported user in one query, most open first."""
+    ana, mark = people["Ana Lopez"], people["Mark Ana"]
+    test_db.add_all([
+        Reports(reporter_id=ana.user_id, reported_user_id=mark.user_id, reason="late", status="closed"),
+        Reports(reporter_id=ana.user_id, reported_user_id=mark.user_id, reason="rude", status="submitted"),
+        Reports(reporter_id=mark.user_id, reported_user_id=ana.user_id, reason="spam", status="submitted"),
+        Reports(reporter_id=mark.user_id, reported_user_id=ana.user_id, reason="spam", status="reviewing"),
+    ])
+    test_db.commit()
+    ana_id, mark_id = ana.user_id, mark.user_id
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", count)
+    try:
+        summary = get_report_summary(test_db)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
+    assert [(row["user_id"], row["submitted"], row["reviewing"], row["closed"], row["total"]) for row in summary] == [
+        (ana_id, 1, 1, 0, 2),
+        (mark_id, 1, 0, 1, 2),
+    ]
+    assert get_report_summary(test_db, user_ids=[mark_id])[0]["first_name"] == "Mark"
+
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        by_name = client.get("/api/admin/report-summary", params={"name": "ana lopez"}).json()
+        reports = client.get("/api/admin/userreports", params={"name": "ana"}).json()
+        unknown = client.get("/api/admin/report-summary", params={"name": "nobody"}).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [row["user_id"] for row in by_name] == [ana_id]
+    # "ana" resolves to the exact last-name match, Mark Ana
+    assert sorted(report["reason"] for report in reports) == ["late", "rude"]
+    assert unknown == []
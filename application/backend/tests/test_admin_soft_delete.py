@@ -5,7 +5,12 @@ import pytest
 from sqlalchemy.orm import Session
 from search.models.user import User
 from search.models.tutor_profile import TutorProfile
-from admin.services.admin_service import drop_user
+from admin.services.admin_service import count_related_records, drop_user, drop_users
+from admin.models.reports import Reports
+from chat.models.chat_message import ChatMessage
+from schedule.models.booking import Booking
+from datetime import datetime
+from sqlalchemy import event
 from auth.services.auth_service import get_user
 from fastapi import HTTPException
 
@@ -117,3 +122,73 @@ def test_drop_nonexistent_user(test_db: Session):
         drop_user(test_db, 99999)
     assert exc_info.value.status_code == 404
 
+
+def add_related_records(test_db: Session, user_a: User, user_b: User):
+    """A booking, three messages (one to self) and a report between two users."""
+    test_db.add_all([
+        Booking(tutor_id=user_b.user_id, student_id=user_a.user_id,
+                start_time=datetime(2025, 1, 6, 9), end_time=datetime(2025, 1, 6, 10), status="confirmed"),
+        ChatMessage(sender_id=user_a.user_id, receiver_id=user_b.user_id, content="hi"),
+        ChatMessage(sender_id=user_b.user_id, receiver_id=user_a.user_id, content="hello"),
+        ChatMessage(sender_id=user_a.user_id, receiver_id=user_a.user_id, content="note to self"),
+        Reports(reporter_id=user_a.user_id, reported_user_id=user_b.user_id, reason="No-show"),
+    ])
+    test_db.commit()
+
+
+def test_count_related_records_single_query(test_engine, test_db: Session, test_user_a: User, test_user_b: User):
+    """Test: counts for several users come from one statement, self-rows counted once."""
+    add_related_records(test_db, test_user_a, test_user_b)
+    user_a_id, user_b_id = test_user_a.user_id, test_user_b.user_id
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    counts = count_related_records(test_db, [user_a_id, user_b_id, 99999])
+
+    assert len(statements) == 1
+    assert counts[user_a_id] == {"bookings": 1, "messages": 3, "reports_submitted": 1, "reports_received": 0}
+    assert counts[user_b_id] == {"bookings": 1, "messages": 2, "reports_submitted": 0, "reports_received": 1}
+    assert counts[99999] == {"bookings": 0, "messages": 0, "reports_submitted": 0, "reports_received": 0}
+
+
+def test_drop_user_reports_related_records(test_db: Session, test_user_a: User, test_user_b: User):
+    """Test: drop_user still returns the related-record summary."""
+    add_related_records(test_db, test_user_a, test_user_b)
+
+    result = drop_user(test_db, test_user_a.user_id)
+
+    assert result["related_records_deleted"] == {"bookings": 1, "messages": 3, "reports_submitted": 1, "reports_received": 0}
+
+
+def test_drop_users_bulk(test_db: Session, test_user_a: User, test_user_b: User, test_tutor_user: User):
+    """Test: bulk drop deletes valid users together and reports the rest per user."""
+    add_related_records(test_db, test_user_a, test_user_b)
+
+    result = drop_users(test_db, [test_user_a.user_id, test_user_b.user_id, test_tutor_user.user_id, 99999], role="student")
+
+    assert result["deleted_count"] == 2
+    statuses = {r["user_id"]: r["status"] for r in result["results"]}
+    assert statuses == {
+        test_user_a.user_id: "deleted",
+        test_user_b.user_id: "deleted",
+        test_tutor_user.user_id: "role_mismatch",
+        99999: "not_found",
+    }
+    assert result["related_records_deleted"] == {"bookings": 2, "messages": 5, "reports_submitted": 1, "reports_received": 1}
+    test_db.refresh(test_user_a)
+    test_db.refresh(test_tutor_user)
+    assert test_user_a.is_deleted is True
+    assert test_user_a.sfsu_email.startswith(f"deleted_{test_user_a.user_id}_")
+    assert test_tutor_user.is_deleted is False
+
+    again = drop_users(test_db, [test_user_a.user_id])
+    assert again["deleted_count"] == 0
+    assert again["results"][0]["status"] == "already_deleted"
+
+
+def test_drop_users_deactivates_tutor_profiles(test_db: Session, test_tutor_user: User):
+    """Test: bulk-dropped tutors are hidden from search."""
+    drop_users(test_db, [test_tutor_user.user_id])
+
+    profile = test_db.query(TutorProfile).filter(TutorProfile.tutor_id == test_tutor_user.user_id).first()
+    assert profile.status == "rejected"
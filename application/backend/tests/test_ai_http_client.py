@@ -0,0 +1,267 @@
+"""
+Tests for the async OpenRouter client, against a local stub server.
+"""
+import asyncio
+import json
+import socket
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ai.config import ai_config
+from ai.http_client import LLMClient, OpenRouterError, cancel_on_disconnect
+from ai.response_cache import ResponseCache
+from ai.service import GeminiSQLService
+
+
+class StubOpenRouter:
+    """Minimal /chat/completions server with scriptable replies."""
+
+    def __init__(self):
+        self.calls = []
+        self.replies = []  # (status, body) consumed in order, then default_reply
+        self.default_reply = (200, completion("Here are the tutors."))
+        self.delay = 0.0
+        self.chunk_delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+        self.app = FastAPI()
+        self.app.post("/api/v1/chat/completions")(self.chat_completions)
+
+    async def chat_completions(self, request: Request):
+        self.calls.append({"headers": dict(request.headers), "body": await request.json()})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            deadline = asyncio.get_running_loop().time() + self.delay
+            while asyncio.get_running_loop().time() < deadline:
+                if await request.is_disconnected():
+                    self.cancelled += 1
+                    return JSONResponse({}, status_code=499)
+                await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        status, body = self.replies.pop(0) if self.replies else self.default_reply
+        if status == 200 and self.calls[-1]["body"].get("stream"):
+            return StreamingResponse(self.sse_chunks(body), media_type="text/event-stream")
+        return JSONResponse(body, status_code=status)
+
+    async def sse_chunks(self, body):
+        yield ": OPENROUTER PROCESSING\n\n"
+        for word in body["choices"][0]["message"]["content"].split(" "):
+            await asyncio.sleep(self.chunk_delay)
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+def completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest_asyncio.fixture
+async def stub_server():
+    stub = StubOpenRouter()
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(stub.app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    stub.base_url = f"http://127.0.0.1:{port}/api/v1"
+    yield stub
+    server.should_exit = True
+    await serve_task
+
+
+@pytest_asyncio.fixture
+async def client(stub_server):
+    llm = LLMClient(base_url=stub_server.base_url, api_key="test-key", max_concurrency=2, retry_base_delay=0.01)
+    yield llm
+    await llm.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_returns_body_and_sends_auth(stub_server, client):
+    """Test: a successful completion is decoded and carries the API key."""
+    result = await client.chat_completion([{"role": "user", "content": "hi"}], model="stub-model")
+
+    assert result["choices"][0]["message"]["content"] == "Here are the tutors."
+    assert stub_server.calls[0]["headers"]["authorization"] == "Bearer test-key"
+    assert stub_server.calls[0]["body"]["model"] == "stub-model"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_with_backoff(stub_server, client):
+    """Test: 429 and 503 responses are retried until the upstream succeeds."""
+    stub_server.replies = [(429, {"error": {"message": "rate limited"}}), (503, {})]
+
+    result = await client.chat_completion([{"role": "user", "content": "hi"}])
+
+    assert len(stub_server.calls) == 3
+    assert result["choices"][0]["message"]["content"] == "Here are the tutors."
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried(stub_server, client):
+    """Test: a 402 fails immediately with the upstream message."""
+    stub_server.replies = [(402, {"error": {"message": "Insufficient credits"}})]
+
+    with pytest.raises(OpenRouterError) as excinfo:
+        await client.chat_completion([{"role": "user", "content": "hi"}])
+
+    assert excinfo.value.status_code == 402
+    assert "402" in str(excinfo.value) and "Insufficient credits" in str(excinfo.value)
+    assert len(stub_server.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_semaphore_caps_in_flight_requests(stub_server, client):
+    """Test: no more than max_concurrency calls reach the upstream at once."""
+    stub_server.delay = 0.1
+
+    await asyncio.gather(*[client.chat_completion([{"role": "user", "content": str(i)}]) for i in range(6)])
+
+    assert len(stub_server.calls) == 6
+    assert stub_server.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_call(stub_server, client):
+    """Test: other coroutines keep running while an LLM call is outstanding."""
+    stub_server.delay = 0.3
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    await client.chat_completion([{"role": "user", "content": "hi"}])
+    ticker_task.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_cancellation_releases_slot_and_aborts_upstream(stub_server, client):
+    """Test: cancelling a caller frees its semaphore slot and drops the upstream request."""
+    stub_server.delay = 5
+    task = asyncio.create_task(client.chat_completion([{"role": "user", "content": "hi"}]))
+    while stub_server.in_flight == 0:
+        await asyncio.sleep(0.01)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert client.in_flight == 0
+    for _ in range(100):
+        if stub_server.cancelled:
+            break
+        await asyncio.sleep(0.01)
+    assert stub_server.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_cancels_query():
+    """Test: a client disconnect cancels the awaited query."""
+    class DisconnectedRequest:
+        async def is_disconnected(self):
+            return True
+
+    cancelled = asyncio.Event()
+
+    async def slow_query():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancel_on_disconnect(DisconnectedRequest(), slow_query(), poll_interval=0.01)
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_service_query_uses_async_client(stub_server, client, test_db, monkeypatch):
+    """Test: GeminiSQLService.query goes through the injected client."""
+    monkeypatch.setattr(ai_config, "OPENROUTER_API_KEY", "test-key")
+    service = GeminiSQLService(test_db, llm_client=client, response_cache=ResponseCache())
+
+    result = await service.query("who tutors math?")
+
+    assert result["success"] is True
+    assert result["response"] == "Here are the tutors."
+    assert len(stub_server.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas_as_they_arrive(stub_server, client):
+    """Test: streamed text arrives piece by piece, comments and [DONE] skipped."""
+    stub_server.chunk_delay = 0.1
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    arrivals = []
+
+    async for delta in client.stream_chat_completion([{"role": "user", "content": "hi"}]):
+        arrivals.append((loop.time() - started, delta))
+
+    assert "".join(delta for _, delta in arrivals) == "Here are the tutors. "
+    assert stub_server.calls[0]["body"]["stream"] is True
+    assert arrivals[0][0] < 0.2 < arrivals[-1][0]
+    assert client.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_stream_consumer_does_not_hold_slot(stub_server, client):
+    """Test: the slot is released when the upstream stream ends, even if the caller hasn't read it all."""
+    stub_server.chunk_delay = 0.05
+    stream = client.stream_chat_completion([{"role": "user", "content": "hi"}])
+    first = await stream.__anext__()
+    assert client.in_flight == 1
+
+    deadline = asyncio.get_running_loop().time() + 2
+    while client.in_flight and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+    assert client.in_flight == 0
+
+    rest = [delta async for delta in stream]
+    assert first + "".join(rest) == "Here are the tutors. "
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_early_aborts_upstream(stub_server, client):
+    """Test: a consumer that stops reading cancels the upstream read and frees the slot."""
+    stub_server.chunk_delay = 0.2
+    stream = client.stream_chat_completion([{"role": "user", "content": "hi"}])
+    await stream.__anext__()
+    await stream.aclose()
+    assert client.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_byte(stub_server, client):
+    """Test: a 429 before the stream starts is retried; a 402 is raised."""
+    stub_server.replies = [(429, {"error": {"message": "rate limited"}})]
+    text = "".join([delta async for delta in client.stream_chat_completion([{"role": "user", "content": "hi"}])])
+    assert text == "Here are the tutors. "
+    assert len(stub_server.calls) == 2
+
+    stub_server.replies = [(402, {"error": {"message": "Insufficient credits"}})]
+    with pytest.raises(OpenRouterError) as excinfo:
+        async for _ in client.stream_chat_completion([{"role": "user", "content": "hi"}]):
+            pass
+    assert excinfo.value.status_code == 402
@@ -0,0 +1,132 @@
+"""
+Tests for running several model-generated queries of one turn concurrently.
+"""
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai.config import ai_config
+from ai.response_cache import ResponseCache
+from ai.service import GeminiSQLService
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def keys(self):
+        return ["n"]
+
+    def fetchmany(self, size):
+        return [(self.value,)]
+
+
+class SlowSessionFactory:
+    """Hands out sessions whose queries take `delay` seconds; tracks concurrency."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.opened = 0
+        self.closed = 0
+
+    def __call__(self):
+        self.opened += 1
+        return SlowSession(self)
+
+
+class SlowSession:
+    def __init__(self, factory):
+        self.factory = factory
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+    def execute(self, statement):
+        factory = self.factory
+        with factory.lock:
+            factory.active += 1
+            factory.max_active = max(factory.max_active, factory.active)
+        try:
+            time.sleep(factory.delay)
+        finally:
+            with factory.lock:
+                factory.active -= 1
+        return FakeResult(int(re.search(r"SELECT (\d+)", str(statement)).group(1)))
+
+    def close(self):
+        self.factory.closed += 1
+
+
+class ScriptedLLM:
+    """Returns the scripted replies in order and records the prompts it was sent."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def chat_completion(self, messages, model=None):
+        self.prompts.append(messages[-1]["content"])
+        return {"choices": [{"message": {"content": self.replies.pop(0)}}]}
+
+
+def make_service(test_db, llm, factory):
+    return GeminiSQLService(test_db, llm_client=llm, response_cache=ResponseCache(), session_factory=factory)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setattr(ai_config, "OPENROUTER_API_KEY", "test-key")
+
+
+@pytest.mark.asyncio
+async def test_queries_run_concurrently_in_order(test_db):
+    """Test: three queries of one turn overlap, and results come back in order."""
+    factory = SlowSessionFactory(delay=0.2)
+    llm = ScriptedLLM("<SQL>SELECT 1</SQL> <SQL>SELECT 2</SQL> <SQL>SELECT 3</SQL>", "Here is everything.")
+    service = make_service(test_db, llm, factory)
+
+    started = time.monotonic()
+    result = await service.query("tutors for CSC 648 and their availability")
+    elapsed = time.monotonic() - started
+
+    assert result["success"] is True
+    assert [q["rows"][0]["n"] for q in result["queries_executed"]] == [1, 2, 3]
+    assert factory.max_active == 3
+    assert elapsed < 0.5
+    assert factory.opened == factory.closed == 3
+    follow_up = llm.prompts[-1]
+    assert follow_up.index("Query 1:") < follow_up.index("Query 2:") < follow_up.index("Query 3:")
+
+
+@pytest.mark.asyncio
+async def test_parallelism_is_capped_per_turn(test_db, monkeypatch):
+    """Test: no more than MAX_PARALLEL_QUERIES run at once."""
+    monkeypatch.setattr(ai_config, "MAX_PARALLEL_QUERIES", 2)
+    factory = SlowSessionFactory(delay=0.05)
+    sql = " ".join(f"<SQL>SELECT {n}</SQL>" for n in range(1, 6))
+    service = make_service(test_db, ScriptedLLM(sql, "Done."), factory)
+
+    result = await service.query("five things at once")
+
+    assert len(result["queries_executed"]) == 5
+    assert factory.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_query_reported_alongside_successes(test_db):
+    """Test: a rejected query does not hide the results of the others."""
+    factory = SlowSessionFactory(delay=0)
+    llm = ScriptedLLM("<SQL>SELECT 1</SQL> <SQL>DELETE FROM users</SQL>", "Partial answer.")
+    service = make_service(test_db, llm, factory)
+
+    result = await service.query("two things")
+
+    assert [q["success"] for q in result["queries_executed"]] == [True, False]
+    assert "Query 1: Query executed successfully" in llm.prompts[-1]
+    assert "Query 2: That query failed" in llm.prompts[-1]
@@ -0,0 +1,179 @@
+"""
+Tests for the AI response cache.
+"""
+import time
+
+import pytest
+
+from ai import response_cache as response_cache_module
+from ai.config import ai_config
+from ai.response_cache import (
+    ResponseCache, cache_scope, get_data_version, key_terms, normalize_prompt, prompt_tokens
+)
+from ai.service import GeminiSQLService
+from search.models.user import User
+
+VERSION = ("v1",)
+ANSWER = {"success": True, "response": "Here are the math tutors.", "queries_executed": [], "function_calls": 1}
+
+
+def test_normalize_prompt():
+    """Test: case, punctuation and spacing do not matter."""
+    assert normalize_prompt("  Find MATH tutors,  on Thursday! ") == "find math tutors on thursday"
+
+
+def test_prompt_tokens_drop_stopwords_and_plurals():
+    """Test: similarity tokens ignore filler words and plural endings."""
+    assert prompt_tokens("find me math tutors on thursdays") == {"math", "tutor", "thursday"}
+
+
+def test_exact_hit():
+    """Test: the same prompt (modulo formatting) is an exact hit."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("Find math tutors on Thursday", VERSION, ANSWER, user_role="student")
+
+    assert cache.get("find math tutors on thursday?", VERSION, user_role="student") == ANSWER
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similar_hit():
+    """Test: a rephrasing with the same content words is a similarity hit."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("find math tutors available on thursdays", VERSION, ANSWER, user_role="student")
+
+    assert cache.get("show me math tutors available thursday", VERSION, user_role="student") == ANSWER
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_different_question_misses():
+    """Test: changing a meaningful word is not treated as the same question."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("find math tutors on thursday", VERSION, ANSWER, user_role="student")
+
+    assert cache.get("find math tutors on tuesday", VERSION, user_role="student") is None
+    assert cache.get("find biology tutors on thursday", VERSION, user_role="student") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_key_terms():
+    """Test: numbers, weekdays and mid-sentence capitalized words are key terms."""
+    assert key_terms("Find tutors for MATH 226 on Thursdays after 3pm") == {"math", "226", "thursday", "after", "3pm"}
+    assert key_terms("Is Ada free? I need help.") == {"ada"}
+
+
+def test_near_match_requires_same_key_terms():
+    """Test: long prompts differing only in a number, day or name are not near-matches."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    base = "find tutors for math {} available on {} afternoon near library with good reviews and low price"
+    cache.put(base.format(226, "thursday"), VERSION, ANSWER)
+    named = "show tutors named {} who teach calculus statistics linear algebra geometry physics chemistry"
+    cache.put(named.format("Ada"), VERSION, ANSWER)
+
+    # similar enough by tokens alone, but a different course, day or person
+    assert cache.get(base.format(227, "thursday"), VERSION) is None
+    assert cache.get(base.format(226, "friday"), VERSION) is None
+    assert cache.get(named.format("Alan"), VERSION) is None
+    assert cache.get("show me tutors for math 226 available thursday afternoon near library with good reviews "
+                     "and low prices", VERSION) == ANSWER
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_role_and_data_version_are_part_of_key():
+    """Test: answers are not shared across roles or data versions."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("find math tutors", VERSION, ANSWER, user_role="student")
+
+    assert cache.get("find math tutors", VERSION, user_role="admin") is None
+    assert cache.get("find math tutors", ("v2",), user_role="student") is None
+
+
+def test_personal_prompts_are_scoped_to_user():
+    """Test: 'my bookings' and tutor prompts are never shared between users."""
+    assert cache_scope("show my bookings", 5, "student") == ("student", 5)
+    assert cache_scope("find math tutors", 5, "tutor") == ("tutor", 5)
+    assert cache_scope("find math tutors", 5, "student") == ("student", None)
+
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("show my bookings", VERSION, ANSWER, user_id=5, user_role="student")
+    assert cache.get("show my bookings", VERSION, user_id=6, user_role="student") is None
+    assert cache.get("show my bookings", VERSION, user_id=5, user_role="student") == ANSWER
+
+
+def test_ttl_expiry(monkeypatch):
+    """Test: entries expire after the TTL."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("find math tutors", VERSION, ANSWER)
+
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: real_monotonic() + 61)
+
+    assert cache.get("find math tutors", VERSION) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction():
+    """Test: the least recently used entry is evicted when full."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("find math tutors", VERSION, ANSWER)
+    cache.put("find physics tutors", VERSION, ANSWER)
+    cache.get("find math tutors", VERSION)
+    cache.put("find history tutors", VERSION, ANSWER)
+
+    assert cache.get("find physics tutors", VERSION) is None
+    assert cache.get("find math tutors", VERSION) == ANSWER
+    assert cache.stats()["evictions"] == 1
+
+
+def test_data_version_changes_with_data(test_db, test_user):
+    """Test: adding a user changes the data version stamp."""
+    before = get_data_version(test_db)
+    test_db.add(User(sfsu_email="new@sfsu.edu", first_name="New", last_name="User", role="student", password_hash="x"))
+    test_db.commit()
+
+    assert before is not None
+    assert get_data_version(test_db) != before
+
+
+@pytest.mark.asyncio
+async def test_data_version_is_reused_for_its_ttl(test_db, test_user, monkeypatch):
+    """Test: the stamp is computed once per TTL window, not once per request."""
+    calls = []
+    monkeypatch.setattr(response_cache_module, "get_data_version", lambda db: calls.append(db) or ("v",))
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8, data_version_ttl_seconds=5)
+
+    assert await cache.data_version(test_db) == ("v",)
+    assert await cache.data_version(test_db) == ("v",)
+    assert len(calls) == 1
+
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: real_monotonic() + 6)
+    await cache.data_version(test_db)
+    assert len(calls) == 2
+
+
+class CountingLLM:
+    """Fake LLM client that always answers without SQL."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def chat_completion(self, messages, model=None):
+        self.calls += 1
+        return {"choices": [{"message": {"content": "Here are the math tutors."}}]}
+
+
+@pytest.mark.asyncio
+async def test_service_serves_repeats_from_cache(test_db, monkeypatch):
+    """Test: a repeated prompt does not call the LLM again and is flagged as cached."""
+    monkeypatch.setattr(ai_config, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(ai_config, "RESPONSE_CACHE_ENABLED", True)
+    llm = CountingLLM()
+    service = GeminiSQLService(test_db, llm_client=llm, response_cache=ResponseCache(10, 60, 0.8))
+
+    first = await service.query("Find math tutors", user_role="student")
+    second = await service.query("find math tutors?", user_role="student")
+
+    assert llm.calls == 1
+    assert first.get("cached") is None
+    assert second["cached"] is True
+    assert second["response"] == first["response"]
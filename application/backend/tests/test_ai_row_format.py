@@ -0,0 +1,60 @@
+"""
+Tests for AI result row conversion and prompt encoding.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from ai.row_format import convert_rows, rows_to_prompt_table
+
+
+def test_convert_rows_per_column_types():
+    """Test: dates, times, TIME (timedelta), decimals and NULLs become JSON-safe values."""
+    columns = ["id", "name", "created_at", "day", "start_time", "slot", "rate"]
+    rows = [
+        (1, "Ada", datetime(2025, 3, 4, 10, 30), date(2025, 3, 4), time(9, 0), timedelta(hours=13, minutes=5), Decimal("25.00")),
+        (2, None, None, date(2025, 3, 5), time(17, 15), timedelta(hours=1), Decimal("19.50")),
+    ]
+
+    converted = convert_rows(columns, rows)
+
+    assert converted[0] == {
+        "id": 1,
+        "name": "Ada",
+        "created_at": "2025-03-04T10:30:00",
+        "day": "2025-03-04",
+        "start_time": "09:00:00",
+        "slot": "13:05:00",
+        "rate": 25,
+    }
+    assert converted[1]["name"] is None
+    assert converted[1]["created_at"] is None
+    assert converted[1]["slot"] == "01:00:00"
+    assert converted[1]["rate"] == 19.5
+
+
+def test_convert_rows_plain_values_untouched():
+    """Test: rows of JSON-safe values are zipped straight into dicts."""
+    assert convert_rows(["a", "b"], [(1, "x"), (None, "y")]) == [{"a": 1, "b": "x"}, {"a": None, "b": "y"}]
+
+
+def test_convert_rows_mixed_column_types():
+    """Test: a column mixing types still converts every value correctly."""
+    converted = convert_rows(["v"], [(date(2025, 1, 1),), ("n/a",)])
+
+    assert converted == [{"v": "2025-01-01"}, {"v": "n/a"}]
+
+
+def test_rows_to_prompt_table_is_compact_csv():
+    """Test: columns are listed once, NULL is empty and commas are quoted."""
+    rows = [
+        {"first_name": "Ada", "last_name": "Lovelace", "bio": "Math, CS"},
+        {"first_name": "Alan", "last_name": None, "bio": "Logic"},
+    ]
+
+    table = rows_to_prompt_table(["first_name", "last_name", "bio"], rows)
+
+    assert table == (
+        "first_name,last_name,bio\n"
+        'Ada,Lovelace,"Math, CS"\n'
+        "Alan,,Logic\n"
+    )
@@ -0,0 +1,173 @@
+"""
+Tests for the cached AI schema context.
+"""
+import time
+
+import pytest
+
+from ai import schema_cache as schema_cache_module
+from ai.schema_cache import SchemaCache, format_schema_context
+from ai.sql_executor import SQLExecutor
+
+SCHEMA = {
+    "users": {
+        "description": "All users",
+        "columns": [
+            {"name": "user_id", "type": "int", "nullable": False, "key": "PRI", "description": ""},
+            {"name": "first_name", "type": "varchar", "nullable": True, "key": "", "description": ""},
+        ],
+    }
+}
+
+
+@pytest.fixture
+def schema_calls(monkeypatch):
+    """Count get_schema_info lookups; set .fail to make the next ones fail."""
+    calls = {"count": 0, "fail": False}
+
+    def fake_get_schema_info(self):
+        calls["count"] += 1
+        if calls["fail"]:
+            return {"success": False, "error": "db down"}
+        return {"success": True, "schema": SCHEMA}
+
+    monkeypatch.setattr(SQLExecutor, "get_schema_info", fake_get_schema_info)
+    return calls
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / "001_init.sql").write_text("CREATE TABLE users (user_id INT);")
+    return tmp_path
+
+
+def test_prompt_is_built_once(schema_calls, migrations_dir):
+    """Test: repeated prompts reuse the snapshot and its rendered text."""
+    cache = SchemaCache(migrations_dir=migrations_dir, ttl_seconds=0)
+
+    first = cache.get_prompt(db=None)
+    second = cache.get_prompt(db=None)
+
+    assert first == second == format_schema_context(SCHEMA)
+    assert "Table: users" in first
+    assert schema_calls["count"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_migration_invalidates(schema_calls, migrations_dir):
+    """Test: adding a migration file triggers a reload."""
+    cache = SchemaCache(migrations_dir=migrations_dir, ttl_seconds=0)
+    cache.get_prompt(db=None)
+
+    (migrations_dir / "002_add_column.sql").write_text("ALTER TABLE users ADD COLUMN x INT;")
+    cache.get_prompt(db=None)
+
+    assert schema_calls["count"] == 2
+
+
+def test_explicit_invalidate(schema_calls, migrations_dir):
+    """Test: invalidate() forces the next lookup to hit the database."""
+    cache = SchemaCache(migrations_dir=migrations_dir, ttl_seconds=0)
+    cache.get_schema(db=None)
+    cache.invalidate()
+    cache.get_schema(db=None)
+
+    assert schema_calls["count"] == 2
+
+
+def test_failures_are_not_cached(schema_calls, migrations_dir):
+    """Test: a failed lookup is retried on the next request."""
+    cache = SchemaCache(migrations_dir=migrations_dir, ttl_seconds=0)
+    schema_calls["fail"] = True
+    assert cache.get_prompt(db=None) == "Unable to retrieve database schema."
+
+    schema_calls["fail"] = False
+    assert "Table: users" in cache.get_prompt(db=None)
+    assert schema_calls["count"] == 2
+
+
+def test_ttl_expiry(schema_calls, migrations_dir, monkeypatch):
+    """Test: with a TTL the snapshot is refreshed once it is too old."""
+    cache = SchemaCache(migrations_dir=migrations_dir, ttl_seconds=60)
+    cache.get_schema(db=None)
+
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(schema_cache_module.time, "monotonic", lambda: real_monotonic() + 61)
+    cache.get_schema(db=None)
+
+    assert schema_calls["count"] == 2
+
+
+class RecordingSession:
+    """Stands in for a MySQL session: records SQL and serves canned INFORMATION_SCHEMA rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "INFORMATION_SCHEMA.TABLES" in sql:
+            return iter([("users", "All users"), ("courses", "")])
+        return iter([
+            ("courses", "course_id", "int", "NO", "PRI", ""),
+            ("users", "user_id", "int", "NO", "PRI", ""),
+            ("users", "first_name", "varchar", "YES", "", ""),
+        ])
+
+
+def test_get_schema_info_uses_two_queries():
+    """Test: columns for every table come back from a single query."""
+    db = RecordingSession()
+
+    result = SQLExecutor(db).get_schema_info()
+
+    assert result["success"] is True
+    assert len(db.statements) == 2
+    assert list(result["schema"]) == ["users", "courses"]
+    assert [c["name"] for c in result["schema"]["users"]["columns"]] == ["user_id", "first_name"]
+    assert result["schema"]["users"]["columns"][1]["nullable"] is True
+
+
+def test_schema_endpoint_loads_off_event_loop(monkeypatch):
+    """Test: /api/ai/schema builds the snapshot in a worker thread, not on the event loop."""
+    import asyncio
+    from fastapi.testclient import TestClient
+    from ai.database import get_ai_db
+    from ai.router import schema_cache
+    from main import app
+
+    def fake_get_schema(db):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        return {"success": True, "schema": SCHEMA}
+
+    monkeypatch.setattr(schema_cache, "get_schema", fake_get_schema)
+    app.dependency_overrides[get_ai_db] = lambda: None
+    try:
+        response = TestClient(app).get("/api/ai/schema")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["schema_info"] == SCHEMA
+
+
+def test_cache_admin_endpoints_require_admin(test_db):
+    """Test: schema refresh and cache stats reject anonymous and non-admin callers."""
+    from fastapi.testclient import TestClient
+    from auth.tokens import make_token
+    from main import app
+    from search.database import get_db
+
+    app.dependency_overrides[get_db] = lambda: test_db
+    try:
+        client = TestClient(app)
+        student = {"Authorization": f"Bearer {make_token(1, 'student')}"}
+        admin = {"Authorization": f"Bearer {make_token(2, 'admin')}"}
+        for method, path in [("post", "/api/ai/schema/refresh"), ("get", "/api/ai/cache-stats")]:
+            assert getattr(client, method)(path).status_code in (400, 401)
+            assert getattr(client, method)(path, headers=student).status_code == 403
+            assert getattr(client, method)(path, headers=admin).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,138 @@
+"""
+Tests for the limits applied to model-generated SQL.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from ai.config import ai_config
+from ai.database import create_ai_engine
+from ai.sql_executor import SQLExecutor, apply_row_limit, estimate_plan_rows
+
+TEN_ROWS = "(SELECT 1 n UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 UNION ALL SELECT 5 " \
+           "UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9 UNION ALL SELECT 10)"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT * FROM users", "SELECT * FROM users\nLIMIT 101"),
+    ("SELECT * FROM users;", "SELECT * FROM users\nLIMIT 101"),
+    ("SELECT * FROM users LIMIT 20", "SELECT * FROM users LIMIT 20"),
+    ("SELECT * FROM users LIMIT 5000", "SELECT * FROM users LIMIT 101"),
+    ("SELECT * FROM users limit 10, 5000", "SELECT * FROM users limit 10, 101"),
+    ("SELECT * FROM users LIMIT 5000 OFFSET 3", "SELECT * FROM users LIMIT 101 OFFSET 3"),
+    ("SELECT * FROM (SELECT * FROM users LIMIT 3) u", "SELECT * FROM (SELECT * FROM users LIMIT 3) u\nLIMIT 101"),
+])
+def test_apply_row_limit(query, expected):
+    """Test: a LIMIT is injected, kept or clamped on the outer query."""
+    assert apply_row_limit(query, 101) == expected
+
+
+def test_estimate_plan_rows_multiplies_joins_and_adds_selects():
+    """Test: joined tables multiply, separate SELECTs add."""
+    plan = [
+        {"id": 1, "rows": 1000},
+        {"id": 1, "rows": 500},
+        {"id": 2, "rows": 20},
+        {"id": 2, "rows": None},
+    ]
+    assert estimate_plan_rows(plan) == 1000 * 500 + 20
+
+
+def test_result_capped_with_has_more(test_engine, test_db):
+    """Test: a 1000-row result is cut off by the database, not after fetching it."""
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = SQLExecutor(test_db).execute_select(f"SELECT a.n FROM {TEN_ROWS} a, {TEN_ROWS} b, {TEN_ROWS} c")
+
+    assert result["success"] is True
+    assert result["row_count"] == ai_config.MAX_QUERY_RESULTS
+    assert result["has_more"] is True
+    assert statements[-1].endswith(f"LIMIT {ai_config.MAX_QUERY_RESULTS + 1}")
+
+
+def test_small_result_has_no_more(test_db):
+    """Test: has_more stays False when everything fits."""
+    result = SQLExecutor(test_db).execute_select(f"SELECT n FROM {TEN_ROWS} t")
+
+    assert result["row_count"] == 10
+    assert result["has_more"] is False
+
+
+class FakeResult:
+    def __init__(self, keys, rows):
+        self._keys = keys
+        self._rows = rows
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def fetchmany(self, size):
+        return self._rows[:size]
+
+
+class FakeMySQLSession:
+    """Session stand-in reporting a MySQL dialect, with a scripted EXPLAIN plan."""
+
+    def __init__(self, plan, error=None):
+        self.plan = plan
+        self.error = error
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+
+    def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("EXPLAIN"):
+            return FakeResult(["id", "table", "rows"], self.plan)
+        if self.error:
+            raise self.error
+        return FakeResult(["n"], [(1,)])
+
+
+def test_expensive_plan_rejected_before_execution():
+    """Test: a cross join estimated above the threshold never runs."""
+    db = FakeMySQLSession(plan=[(1, "users", 50000), (1, "bookings", 80000)])
+
+    result = SQLExecutor(db).execute_select("SELECT * FROM users, bookings")
+
+    assert result["success"] is False
+    assert "estimated" in result["error"]
+    assert len(db.statements) == 1 and db.statements[0].startswith("EXPLAIN")
+
+
+def test_cheap_plan_executes():
+    """Test: plans under the threshold run normally."""
+    db = FakeMySQLSession(plan=[(1, "users", 200)])
+
+    result = SQLExecutor(db).execute_select("SELECT n FROM users")
+
+    assert result["success"] is True
+    assert len(db.statements) == 2
+
+
+def test_timeout_error_is_explained():
+    """Test: MAX_EXECUTION_TIME interruptions come back as a readable error."""
+    db = FakeMySQLSession(
+        plan=[(1, "users", 10)],
+        error=Exception("(3024, 'Query execution was interrupted, maximum statement execution time exceeded')"),
+    )
+
+    result = SQLExecutor(db).execute_select("SELECT n FROM users")
+
+    assert result["success"] is False
+    assert "time limit" in result["error"]
+
+
+def test_ai_engine_is_separate_pool():
+    """Test: the AI engine can be built independently of the main engine."""
+    engine = create_ai_engine("sqlite://")
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT 1").scalar() == 1
+    engine.dispose()
@@ -0,0 +1,153 @@
+"""
+Tests for the streaming (server-sent events) variant of the AI query endpoint.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai.config import ai_config
+from ai.database import get_ai_db
+from ai.response_cache import ResponseCache
+from ai.service import GeminiSQLService
+from main import app
+
+
+class StreamingLLM:
+    """Streams the scripted replies in order, a few characters per delta."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+
+    async def stream_chat_completion(self, messages, model=None):
+        reply = self.replies.pop(0)
+        for start in range(0, len(reply), 3):
+            yield reply[start:start + 3]
+
+    async def chat_completion(self, messages, model=None):
+        return {"choices": [{"message": {"content": self.replies.pop(0)}}]}
+
+
+def make_service(test_db, llm, cache=None):
+    return GeminiSQLService(test_db, llm_client=llm, response_cache=cache or ResponseCache())
+
+
+async def collect(service, prompt):
+    return [event async for event in service.stream(prompt)]
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setattr(ai_config, "OPENROUTER_API_KEY", "test-key")
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_progress_then_tokens(test_db):
+    """Test: status first, then query progress, then answer tokens, then done."""
+    llm = StreamingLLM("<SQL>SELECT 1 AS n</SQL>", "Here are the tutors: Ada and Alan.")
+
+    events = await collect(make_service(test_db, llm), "who tutors math?")
+    names = [name for name, _ in events]
+
+    assert names[0] == "status"
+    assert names.index("query") < names.index("query_result") < names.index("token")
+    assert names[-1] == "done"
+    assert events[names.index("query")][1] == {"index": 1, "query": "SELECT 1 AS n"}
+    assert events[names.index("query_result")][1]["row_count"] == 1
+    tokens = "".join(data["text"] for name, data in events if name == "token")
+    assert tokens == "Here are the tutors: Ada and Alan."
+    assert "<SQL" not in tokens
+    done = events[-1][1]
+    assert done["success"] is True
+    assert done["response"] == tokens
+    assert done["queries_executed"][0]["rows"] == [{"n": 1}]
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_when_answer_turns_into_query(test_db):
+    """Test: text that later contains SQL is retracted with answer_reset."""
+    llm = StreamingLLM("Let me check. <SQL>SELECT 2 AS n</SQL>", "Found one.")
+
+    events = await collect(make_service(test_db, llm), "anything")
+    names = [name for name, _ in events]
+
+    assert names.index("token") < names.index("answer_reset") < names.index("query")
+    tokens_after_reset = "".join(
+        data["text"] for name, data in events[names.index("answer_reset"):] if name == "token"
+    )
+    assert tokens_after_reset == "Found one."
+    assert events[-1][1]["response"] == "Found one."
+
+
+@pytest.mark.asyncio
+async def test_stream_serves_cached_answer(test_db):
+    """Test: a repeated prompt is answered from the cache in one token event."""
+    cache = ResponseCache()
+    await collect(make_service(test_db, StreamingLLM("<SQL>SELECT 1 AS n</SQL>", "Cached answer."), cache), "cache me")
+
+    events = await collect(make_service(test_db, StreamingLLM(), cache), "cache me")
+
+    assert [name for name, _ in events] == ["status", "token", "done"]
+    assert events[1][1]["text"] == "Cached answer."
+    assert events[-1][1]["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_upstream_failure_in_done(test_db):
+    """Test: an upstream error ends the stream with an unsuccessful done event."""
+    class FailingLLM:
+        async def stream_chat_completion(self, messages, model=None):
+            raise ValueError("OpenRouter API error 402: Insufficient credits")
+            yield
+
+    events = await collect(make_service(test_db, FailingLLM()), "hi")
+
+    assert events[-1][0] == "done"
+    assert events[-1][1]["success"] is False
+    assert "Insufficient credits" in events[-1][1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_no_connection_held_during_model_calls(test_db):
+    """Test: the request session has no open transaction (pooled connection) while the model runs."""
+    held = []
+
+    class RecordingLLM(StreamingLLM):
+        async def stream_chat_completion(self, messages, model=None):
+            held.append(test_db.in_transaction())
+            async for delta in super().stream_chat_completion(messages, model):
+                yield delta
+
+        async def chat_completion(self, messages, model=None):
+            held.append(test_db.in_transaction())
+            return await super().chat_completion(messages, model)
+
+    cache = ResponseCache()
+    await collect(make_service(test_db, RecordingLLM("<SQL>SELECT 1 AS n</SQL>", "One."), cache), "one")
+    await make_service(test_db, RecordingLLM("<SQL>SELECT 2 AS n</SQL>", "Two."), cache).query("two")
+
+    assert held == [False, False, False, False]
+
+
+def test_stream_endpoint_sends_server_sent_events(test_db, monkeypatch):
+    """Test: /api/ai/query/stream returns text/event-stream frames ending in done."""
+    llm = StreamingLLM("<SQL>SELECT 3 AS n</SQL>", "Three.")
+    monkeypatch.setattr("ai.service.default_llm_client", llm)
+    monkeypatch.setattr("ai.service.default_response_cache", ResponseCache())
+    app.dependency_overrides[get_ai_db] = lambda: test_db
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/ai/query/stream", json={"prompt": "three"})
+    finally:
+        app.dependency_overrides.pop(get_ai_db, None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-accel-buffering"] == "no"
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert frames[0].startswith("event: status")
+    event, data = frames[-1].split("\n")
+    assert event == "event: done"
+    done = json.loads(data[len("data: "):])
+    assert done["response"] == "Three."
+    assert done["queries_executed"][0]["row_count"] == 1
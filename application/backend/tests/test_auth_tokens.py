@@ -0,0 +1,108 @@
+"""
+Tests for signed session tokens and the current-user dependency.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from auth import dependencies, tokens
+from auth.tokens import InvalidToken, make_token, read_token
+from main import app
+from search.database import get_db
+
+
+def test_token_round_trip():
+    claims = read_token(make_token(42, "tutor"))
+    assert (claims.user_id, claims.role) == (42, "tutor")
+
+
+def test_tampered_and_expired_tokens_rejected():
+    token = make_token(42, "student")
+    payload, signature = token.split(".")
+    forged_payload = make_token(1, "admin").split(".")[0]
+
+    with pytest.raises(InvalidToken):
+        read_token(f"{forged_payload}.{signature}")
+    with pytest.raises(InvalidToken):
+        read_token(token, secret="another-secret")
+    with pytest.raises(InvalidToken):
+        read_token(make_token(42, "student", ttl_seconds=-1))
+    with pytest.raises(InvalidToken):
+        read_token("token-42")
+
+
+@pytest.fixture
+def client(test_db):
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_send_with_token_needs_no_user_lookup(client, test_engine, test_user_a, test_user_b):
+    """Test: a signed token identifies the sender without selecting from users."""
+    sender_id, receiver_id = test_user_a.user_id, test_user_b.user_id
+    token = make_token(sender_id, "student")
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", count)
+    try:
+        response = client.post("/api/chat/send", json={"receiver_id": receiver_id, "content": "hi"},
+                               headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(test_engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert response.json()["sender_id"] == sender_id
+    assert not [s for s in statements if "FROM users" in s]
+
+
+def test_invalid_token_falls_back_while_legacy_allowed(client, test_user_a, test_user_b, monkeypatch):
+    """Test: a stale token (e.g. from before a restart) uses ?user_id= in legacy mode, 401 without it."""
+    stale = make_token(test_user_a.user_id, "student", secret="previous-secret")
+    request = dict(json={"receiver_id": test_user_b.user_id, "content": "hi"},
+                   headers={"Authorization": f"Bearer {stale}"},
+                   params={"user_id": test_user_a.user_id})
+
+    legacy = client.post("/api/chat/send", **request)
+    monkeypatch.setattr(dependencies, "AUTH_ALLOW_LEGACY_USER_ID", False)
+    strict = client.post("/api/chat/send", **request)
+
+    assert legacy.status_code == 200 and legacy.json()["sender_id"] == test_user_a.user_id
+    assert strict.status_code == 401
+
+
+def test_secret_required_for_several_workers(monkeypatch):
+    monkeypatch.delenv("AUTH_TOKEN_SECRET", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(tokens.sys, "argv", ["uvicorn", "main:app"])
+    tokens.ensure_token_secret(allow_legacy=True)
+
+    with pytest.raises(RuntimeError):
+        tokens.ensure_token_secret(allow_legacy=False)
+    monkeypatch.setattr(tokens.sys, "argv", ["uvicorn", "main:app", "--workers", "2"])
+    with pytest.raises(RuntimeError):
+        tokens.ensure_token_secret(allow_legacy=True)
+
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "configured")
+    tokens.ensure_token_secret(allow_legacy=False)
+
+
+def test_legacy_user_id_fallback(client, test_user_a, test_user_b, monkeypatch):
+    """Test: without a token ?user_id= still works, unless the legacy path is turned off."""
+    body = {"receiver_id": test_user_b.user_id, "content": "hi"}
+    legacy = client.post("/api/chat/send", json=body, params={"user_id": test_user_a.user_id},
+                         headers={"Authorization": f"Bearer token-{test_user_a.user_id}"})
+    unknown = client.post("/api/chat/send", json=body, params={"user_id": 99999})
+
+    monkeypatch.setattr(dependencies, "AUTH_ALLOW_LEGACY_USER_ID", False)
+    disabled = client.post("/api/chat/send", json=body, params={"user_id": test_user_a.user_id})
+
+    assert legacy.status_code == 200 and legacy.json()["sender_id"] == test_user_a.user_id
+    assert unknown.status_code == 404
+    assert disabled.status_code == 401
@@ -0,0 +1,183 @@
+"""
+Tests for per-connection outbound queues in ConnectionManager.
+"""
+import asyncio
+
+import pytest
+
+from chat.services.connection_manager import ConnectionManager
+from chat.services.pubsub import InProcessBackend
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that can be made slow or broken."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.fail:
+            raise RuntimeError("socket is gone")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met before timeout")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_delay_other_recipients():
+    """Test: a slow client's socket does not hold up delivery to the other user."""
+    manager = ConnectionManager(backend=InProcessBackend(), send_timeout=5)
+    slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+    await manager.connect(1, slow)
+    await manager.connect(2, fast)
+
+    await manager.broadcast_to_pair(1, 2, {"content": "hi"})
+
+    await wait_for(lambda: fast.sent, timeout=0.5)
+    assert slow.sent == []
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_send_evicts_connection():
+    """Test: a socket whose send raises is removed and closed."""
+    manager = ConnectionManager(backend=InProcessBackend())
+    broken, healthy = FakeWebSocket(fail=True), FakeWebSocket()
+    await manager.connect(1, broken)
+    await manager.connect(1, healthy)
+
+    await manager.send_personal_message({"content": "hi"}, 1)
+
+    await wait_for(lambda: manager.connections_evicted == 1)
+    assert [c.websocket for c in manager.active_connections[1]] == [healthy]
+    await wait_for(lambda: broken.closed_with == 1011)
+    assert healthy.sent == [{"content": "hi"}]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_evicts_connection():
+    """Test: a send that exceeds the timeout evicts the socket."""
+    manager = ConnectionManager(backend=InProcessBackend(), send_timeout=0.05)
+    stuck = FakeWebSocket(delay=1.0)
+    await manager.connect(1, stuck)
+
+    await manager.send_personal_message({"content": "hi"}, 1)
+
+    await wait_for(lambda: manager.connections_evicted == 1)
+    assert 1 not in manager.active_connections
+    assert manager.messages_dropped == 1
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_overflow_drops_and_evicts():
+    """Test: a socket that falls a full queue behind is evicted and drops are counted."""
+    manager = ConnectionManager(backend=InProcessBackend(), queue_size=2, send_timeout=5)
+    stalled = FakeWebSocket(delay=1.0)
+    await manager.connect(1, stalled)
+
+    for i in range(4):
+        await manager.send_personal_message({"n": i}, 1)
+
+    assert manager.connections_evicted == 1
+    assert 1 not in manager.active_connections
+    assert manager.messages_dropped >= 1
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_normal_disconnect_is_not_a_drop():
+    """Test: frames still queued when a client hangs up count as unsent, not dropped."""
+    manager = ConnectionManager(backend=InProcessBackend(), send_timeout=5)
+    slow = FakeWebSocket(delay=1.0)
+    await manager.connect(1, slow)
+
+    for i in range(3):
+        await manager.send_personal_message({"n": i}, 1)
+    await asyncio.sleep(0)
+    manager.disconnect(1, slow)
+
+    stats = manager.stats()
+    assert stats["messages_dropped"] == 0
+    assert stats["messages_unsent"] == 2  # the first one was already being sent
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_stats_report_queue_depth():
+    """Test: stats() reports connections and queued messages."""
+    manager = ConnectionManager(backend=InProcessBackend(), send_timeout=5)
+    await manager.connect(1, FakeWebSocket(delay=1.0))
+    await manager.connect(2, FakeWebSocket())
+
+    for i in range(3):
+        await manager.send_personal_message({"n": i}, 1)
+    await asyncio.sleep(0)
+
+    stats = manager.stats()
+    assert stats["connections"] == 2
+    assert stats["users"] == 2
+    assert stats["queue_depth_max"] >= 2
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_pings_live_sockets():
+    """Test: a heartbeat queues a ping frame for every live socket."""
+    manager = ConnectionManager(backend=InProcessBackend(), heartbeat_interval=60)
+    ws = FakeWebSocket()
+    await manager.connect(1, ws)
+
+    manager.heartbeat()
+
+    await wait_for(lambda: ws.sent)
+    assert ws.sent == [{"type": "ping"}]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_reaps_idle_sockets():
+    """Test: sockets silent past the idle timeout are reaped; touched ones survive."""
+    manager = ConnectionManager(backend=InProcessBackend(), heartbeat_interval=60, idle_timeout=0.05)
+    silent, chatty = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(1, silent)
+    await manager.connect(2, chatty)
+
+    await asyncio.sleep(0.1)
+    manager.touch(2, chatty)
+    manager.heartbeat()
+
+    assert 1 not in manager.active_connections
+    assert 2 in manager.active_connections
+    assert manager.stats()["connections_reaped"] == 1
+    await wait_for(lambda: silent.closed_with == 1011)
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_task_runs_on_interval():
+    """Test: once started the manager pings on its own schedule."""
+    manager = ConnectionManager(backend=InProcessBackend(), heartbeat_interval=0.02)
+    ws = FakeWebSocket()
+    await manager.connect(1, ws)
+
+    await wait_for(lambda: {"type": "ping"} in ws.sent)
+    await manager.stop()
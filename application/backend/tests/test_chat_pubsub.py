@@ -0,0 +1,152 @@
+"""
+Tests for cross-worker chat fan-out through the pub/sub backends.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from chat.config import chat_config
+from chat.services.connection_manager import ConnectionManager
+from chat.services.pubsub import InProcessBackend, LocalHub, UnixSocketBackend, create_backend
+
+
+class FakeWebSocket:
+    """Records frames sent to it in place of a real WebSocket."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        pass
+
+
+@pytest.fixture
+def hub_path():
+    """Short socket path (Unix socket paths are limited to ~100 chars)."""
+    temp_dir = tempfile.mkdtemp(prefix="hub")
+    yield os.path.join(temp_dir, "chat.sock")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met before timeout")
+        await asyncio.sleep(0.01)
+
+
+def test_create_backend_selects_by_name():
+    """Test: create_backend maps names to backends and rejects unknown ones."""
+    assert isinstance(create_backend("memory"), InProcessBackend)
+    assert isinstance(create_backend("unix", url="/tmp/x.sock"), UnixSocketBackend)
+    with pytest.raises(ValueError):
+        create_backend("carrier-pigeon")
+
+
+@pytest.mark.asyncio
+async def test_in_process_broadcast_reaches_both_users():
+    """Test: with the memory backend both users of a pair get the message once."""
+    manager = ConnectionManager(backend=InProcessBackend())
+    ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(1, ws_a)
+    await manager.connect(2, ws_b)
+
+    await manager.broadcast_to_pair(1, 2, {"content": "hi"})
+
+    await wait_for(lambda: ws_a.sent and ws_b.sent)
+    assert ws_a.sent == [{"content": "hi"}]
+    assert ws_b.sent == [{"content": "hi"}]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_unix_hub_fans_out_across_workers(hub_path):
+    """Test: a message published on one worker reaches a socket held by another."""
+    hub = LocalHub(hub_path)
+    await hub.start()
+    worker_1 = ConnectionManager(backend=UnixSocketBackend(hub_path))
+    worker_2 = ConnectionManager(backend=UnixSocketBackend(hub_path))
+    try:
+        ws_sender, ws_receiver = FakeWebSocket(), FakeWebSocket()
+        await worker_1.connect(1, ws_sender)
+        await worker_2.connect(2, ws_receiver)
+
+        await worker_1.broadcast_to_pair(1, 2, {"content": "across workers"})
+
+        await wait_for(lambda: ws_sender.sent and ws_receiver.sent)
+        assert ws_sender.sent == [{"content": "across workers"}]
+        assert ws_receiver.sent == [{"content": "across workers"}]
+    finally:
+        await worker_1.stop()
+        await worker_2.stop()
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_start_subscribes_once():
+    """Test: sockets connecting at the same time start the backend only once."""
+    class CountingBackend(InProcessBackend):
+        starts = 0
+
+        async def start(self, handler):
+            CountingBackend.starts += 1
+            await asyncio.sleep(0.01)
+            await super().start(handler)
+
+    manager = ConnectionManager(backend=CountingBackend())
+    await asyncio.gather(*(manager.connect(user_id, FakeWebSocket()) for user_id in range(5)))
+
+    assert CountingBackend.starts == 1
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_reconnects_after_hub_restart(hub_path, monkeypatch):
+    """Test: when the hub goes away and comes back, fan-out resumes without a worker restart."""
+    monkeypatch.setattr(chat_config, "PUBSUB_RECONNECT_MIN_SECONDS", 0.01)
+    monkeypatch.setattr(chat_config, "PUBSUB_RECONNECT_MAX_SECONDS", 0.05)
+    hub = LocalHub(hub_path)
+    await hub.start()
+    backend = UnixSocketBackend(hub_path)
+    manager = ConnectionManager(backend=backend)
+    try:
+        ws = FakeWebSocket()
+        await manager.connect(1, ws)
+        await manager.publish([1], {"content": "before"})
+        await wait_for(lambda: ws.sent)
+        await hub.stop()
+        await wait_for(lambda: backend._writer is None)
+
+        # published while the hub is down: dropped, not raised
+        await manager.publish([1], {"content": "lost"})
+
+        await hub.start()
+        await wait_for(lambda: backend._writer is not None)
+        await manager.publish([1], {"content": "back"})
+
+        await wait_for(lambda: len(ws.sent) == 2)
+        assert ws.sent == [{"content": "before"}, {"content": "back"}]
+    finally:
+        await manager.stop()
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_removes_empty_user_entry():
+    """Test: disconnecting a user's last socket drops them from active_connections."""
+    manager = ConnectionManager(backend=InProcessBackend())
+    ws = FakeWebSocket()
+    await manager.connect(7, ws)
+    manager.disconnect(7, ws)
+    assert 7 not in manager.active_connections
+    await manager.stop()
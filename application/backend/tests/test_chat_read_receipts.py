@@ -0,0 +1,98 @@
+"""
+Tests for coalesced read receipts sent over the chat WebSocket.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from search.models.user import User
+from chat.models.chat_message import ChatMessage
+from chat.schemas.chat_schemas import MessageInfo
+from chat.services.chat_service import send_message
+from chat.services.read_receipts import ReadReceiptBuffer
+
+
+class RecordingManager:
+    """Captures published frames instead of delivering them."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, user_ids, message):
+        self.published.append((list(user_ids), message))
+
+
+def send(db, sender, receiver, n):
+    return [send_message(db, sender.user_id, MessageInfo(receiver_id=receiver.user_id, content=f"m{i}")) for i in range(n)]
+
+
+@pytest.fixture
+def buffer(test_engine):
+    return ReadReceiptBuffer(
+        RecordingManager(),
+        session_factory=sessionmaker(autocommit=False, autoflush=False, bind=test_engine),
+        flush_interval=60,
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_marks_messages_up_to_id(buffer, test_db: Session, test_user_a: User, test_user_b: User):
+    """Test: a read frame marks messages up to the given ID read and leaves later ones unread."""
+    messages = send(test_db, test_user_a, test_user_b, 3)
+
+    buffer.mark_read(test_user_b.user_id, test_user_a.user_id, messages[1].message_id)
+    await buffer.flush()
+
+    test_db.expire_all()
+    assert [m.is_read for m in test_db.query(ChatMessage).order_by(ChatMessage.message_id)] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_frames_coalesce_into_one_update_per_conversation(buffer, test_engine, test_db: Session, test_user_a: User, test_user_b: User):
+    """Test: many read frames for one conversation produce a single UPDATE."""
+    messages = send(test_db, test_user_a, test_user_b, 5)
+    for message in messages:
+        buffer.mark_read(test_user_b.user_id, test_user_a.user_id, message.message_id)
+    # an out-of-order, older receipt must not move the marker backwards
+    buffer.mark_read(test_user_b.user_id, test_user_a.user_id, messages[0].message_id)
+
+    updates = []
+
+    @event.listens_for(test_engine, "before_cursor_execute")
+    def count_updates(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(statement)
+
+    try:
+        await buffer.flush()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", count_updates)
+
+    assert len(updates) == 1
+    test_db.expire_all()
+    assert all(m.is_read for m in test_db.query(ChatMessage))
+
+
+@pytest.mark.asyncio
+async def test_flush_notifies_sender_and_reader(buffer, test_db: Session, test_user_a: User, test_user_b: User):
+    """Test: after a flush the sender gets a read frame and the reader a fresh unread count."""
+    messages = send(test_db, test_user_a, test_user_b, 2)
+
+    buffer.mark_read(test_user_b.user_id, test_user_a.user_id, messages[-1].message_id)
+    await buffer.flush()
+
+    published = buffer.manager.published
+    assert ([test_user_a.user_id], {
+        "type": "read",
+        "reader_id": test_user_b.user_id,
+        "peer_id": test_user_a.user_id,
+        "up_to_message_id": messages[-1].message_id,
+    }) in published
+    assert ([test_user_b.user_id], {"type": "unread_count", "unread_conversations": 0}) in published
+
+
+@pytest.mark.asyncio
+async def test_empty_flush_does_nothing(buffer):
+    """Test: flushing with nothing pending publishes nothing."""
+    await buffer.flush()
+    assert buffer.manager.published == []
@@ -0,0 +1,49 @@
+"""
+Tests for frame handling on the chat WebSocket.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from chat.models.chat_message import ChatMessage
+from chat.routers.chat_router import parse_frame
+from main import app
+
+
+def test_parse_frame_rejects_bad_frames():
+    """Test: non-JSON, non-object, unknown and incomplete frames raise ValueError."""
+    assert parse_frame('{"receiver_id": 2, "content": "hi"}')[0] == "message"
+    assert parse_frame('{"type": "pong"}') == ("pong", None)
+    for raw, detail in [
+        ("not json", "not valid JSON"),
+        ("[1, 2]", "JSON object"),
+        ('{"type": "shout"}', "unknown frame type"),
+        ('{"type": "read", "peer_id": 2}', "up_to_message_id"),
+        ('{"type": "typing", "receiver_id": "someone"}', "receiver_id"),
+    ]:
+        with pytest.raises(ValueError, match=detail):
+            parse_frame(raw)
+
+
+def test_bad_frames_get_error_and_socket_stays_open(test_engine, test_user_a, test_user_b, monkeypatch):
+    """Test: invalid frames are answered with an error frame and later frames still work."""
+    monkeypatch.setattr("chat.routers.chat_router.SessionLocal", sessionmaker(bind=test_engine))
+    sender, receiver = test_user_a.user_id, test_user_b.user_id
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/chat/ws/{sender}") as websocket:
+            websocket.send_text("not json")
+            assert websocket.receive_json() == {"type": "error", "detail": "frame is not valid JSON"}
+            websocket.send_json({"type": "read", "peer_id": receiver})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_json({"receiver_id": receiver, "content": "hello"})
+            message = websocket.receive_json()
+
+    assert message["type"] == "message"
+    assert (message["sender_id"], message["receiver_id"], message["content"]) == (sender, receiver, "hello")
+    db = sessionmaker(bind=test_engine)()
+    try:
+        assert db.query(ChatMessage).filter(ChatMessage.sender_id == sender).count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,108 @@
+"""
+Tests for the user / tutor profile identity cache.
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from admin.services.admin_service import drop_user
+from auth.identity_cache import IdentityCache, identity_cache
+from main import app
+from search.database import get_db
+from search.models.tutor_profile import TutorProfile
+from tutors.service import update_tutor_bio, update_tutor_languages
+
+
+@pytest.fixture
+def statements(test_engine):
+    seen = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", count)
+    yield seen
+    event.remove(test_engine, "before_cursor_execute", count)
+
+
+def test_repeated_lookups_hit_the_cache(test_db, test_user_a, statements):
+    user_id = test_user_a.user_id
+    statements.clear()
+
+    first = identity_cache.get_user(test_db, user_id)
+    second = identity_cache.get_user(test_db, user_id)
+
+    assert first is second
+    assert (first.first_name, first.role) == ("User", "student")
+    assert len(statements) == 1
+    assert identity_cache.get_user(test_db, 99999) is None
+
+
+def test_ttl_and_size_bounds(test_db, test_user_a, test_user_b, test_tutor_user, statements):
+    ids = [test_user_a.user_id, test_user_b.user_id, test_tutor_user.user_id]
+
+    expiring = IdentityCache(ttl_seconds=0, max_entries=10, enabled=True)
+    statements.clear()
+    expiring.get_user(test_db, ids[0])
+    expiring.get_user(test_db, ids[0])
+    assert len(statements) == 2
+
+    small = IdentityCache(ttl_seconds=60, max_entries=2, enabled=True)
+    for user_id in ids:
+        small.get_user(test_db, user_id)
+    assert small.stats()["entries"] == 2 and small.evictions == 1
+    statements.clear()
+    small.get_user(test_db, ids[0])  # least recently used, evicted
+    assert len(statements) == 1
+
+
+def test_soft_delete_invalidates(test_db, test_user_a):
+    user_id = test_user_a.user_id
+    assert identity_cache.get_user(test_db, user_id).is_deleted is False
+
+    drop_user(test_db, user_id)
+
+    assert identity_cache.get_user(test_db, user_id).is_deleted is True
+
+
+def test_tutor_update_reads_database_not_cache(test_db, test_tutor_user, statements):
+    """Test: an update returns the row as stored, even if the cached profile is stale, and refreshes the cache."""
+    tutor_id = test_tutor_user.user_id
+    identity_cache.get_tutor_profile(test_db, tutor_id)
+    test_db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).update({"hourly_rate_cents": 4200})
+    test_db.commit()
+    statements.clear()
+
+    profile = update_tutor_bio(test_db, tutor_id, "New bio")
+
+    assert (profile.bio, profile.hourly_rate_cents) == ("New bio", 4200)
+    assert [s.split()[0] for s in statements] == ["UPDATE", "SELECT"]
+    assert identity_cache.get_tutor_profile(test_db, tutor_id).hourly_rate_cents == 4200
+
+    profile = update_tutor_languages(test_db, tutor_id, ["English", "Korean"])
+    assert profile.get_languages() == ["English", "Korean"]
+
+
+def test_tutor_update_missing_profile(test_db, test_user_a):
+    """Test: updating a user without a tutor profile is a 404."""
+    with pytest.raises(HTTPException) as exc:
+        update_tutor_bio(test_db, test_user_a.user_id, "New bio")
+    assert exc.value.status_code == 404
+
+
+def test_user_route_uses_cache(test_db, test_user_a, statements):
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        statements.clear()
+        responses = [client.get(f"/api/users/{test_user_a.user_id}") for _ in range(3)]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].json()["sfsu_email"] == "user.a@sfsu.edu"
+    assert len([s for s in statements if "FROM users" in s]) == 1
@@ -250,6 +250,155 @@ class TestSaveMediaFile:
         assert "." in media_path.split("/")[-1]
 
 
+class TestStreamingUpload:
+    """Tests for chunked streaming of uploads to disk."""
+    
+    @pytest.mark.asyncio
+    async def test_multi_chunk_upload_is_copied_intact(self, temp_media_root, monkeypatch):
+        """Test that a file spanning many chunks is written byte-for-byte."""
+        from media_handling.service import save_media_file, get_full_file_path
+        monkeypatch.setattr(media_service_module, "UPLOAD_CHUNK_SIZE", 7)
+        content = bytes(range(256)) * 10
+        upload_file = UploadFile(file=BytesIO(content), filename="clip.mp4")
+        
+        media_path = await save_media_file(upload_file, context="chat")
+        
+        with open(get_full_file_path(media_path), "rb") as f:
+            assert f.read() == content
+    
+    @pytest.mark.asyncio
+    async def test_oversized_upload_rejected_without_leftovers(self, temp_media_root, monkeypatch):
+        """Test that exceeding max_size raises and leaves no partial or temp file behind."""
+        from media_handling.service import save_media_file, MediaTooLargeError
+        monkeypatch.setattr(media_service_module, "UPLOAD_CHUNK_SIZE", 4)
+        upload_file = UploadFile(file=BytesIO(b"x" * 100), filename="big.mp4")
+        
+        with pytest.raises(MediaTooLargeError):
+            await save_media_file(upload_file, context="chat", max_size=10)
+        
+        videos_dir = os.path.join(temp_media_root, "videos", "chat")
+        assert os.listdir(videos_dir) == []
+    
+    @pytest.mark.asyncio
+    async def test_upload_at_size_limit_is_accepted(self, temp_media_root):
+        """Test that a file exactly max_size bytes long is saved."""
+        from media_handling.service import save_media_file, get_full_file_path
+        upload_file = UploadFile(file=BytesIO(b"y" * 10), filename="ok.pdf")
+        
+        media_path = await save_media_file(upload_file, context="chat", max_size=10)
+        
+        assert os.path.getsize(get_full_file_path(media_path)) == 10
+    
+    @pytest.mark.asyncio
+    async def test_saved_file_is_world_readable(self, temp_media_root):
+        """Test that the temp file's 0600 mode is not carried over to the stored file."""
+        from media_handling.service import save_media_file, get_full_file_path
+        upload_file = UploadFile(file=BytesIO(b"z"), filename="pic.png")
+        
+        media_path = await save_media_file(upload_file, context="chat")
+        
+        assert os.stat(get_full_file_path(media_path)).st_mode & 0o777 == 0o644
+
+
+class TestContentAddressedStorage:
+    """Tests for deduplicated (MEDIA_DEDUP) storage."""
+    
+    @pytest.fixture
+    def dedup(self, temp_media_root, monkeypatch):
+        monkeypatch.setattr(media_service_module, "MEDIA_DEDUP", True)
+    
+    async def save(self, content, filename="shared.pdf"):
+        from media_handling.service import save_media_file
+        return await save_media_file(UploadFile(file=BytesIO(content), filename=filename), context="chat")
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_uploads_share_one_blob(self, dedup):
+        """Test that identical uploads get their own paths but one copy on disk."""
+        from media_handling.service import get_full_file_path, get_blob_path
+        import hashlib
+        content = b"%PDF- same handout"
+        
+        first = await self.save(content)
+        second = await self.save(content)
+        
+        assert first != second
+        first_stat = os.stat(get_full_file_path(first))
+        second_stat = os.stat(get_full_file_path(second))
+        assert first_stat.st_ino == second_stat.st_ino
+        blob_path = get_blob_path(hashlib.sha256(content).hexdigest())
+        assert os.stat(blob_path).st_ino == first_stat.st_ino
+        assert os.stat(blob_path).st_nlink == 3
+        with open(get_full_file_path(second), "rb") as f:
+            assert f.read() == content
+    
+    @pytest.mark.asyncio
+    async def test_different_content_gets_different_blobs(self, dedup):
+        """Test that distinct uploads are not linked together."""
+        from media_handling.service import get_full_file_path
+        first = await self.save(b"one")
+        second = await self.save(b"two")
+        
+        assert os.stat(get_full_file_path(first)).st_ino != os.stat(get_full_file_path(second)).st_ino
+    
+    @pytest.mark.asyncio
+    async def test_blob_removed_with_last_reference(self, dedup):
+        """Test that delete_media_file keeps the blob until no path references it."""
+        from media_handling.service import delete_media_file, get_full_file_path, get_blob_path
+        import hashlib
+        content = b"shared image bytes"
+        blob_path = get_blob_path(hashlib.sha256(content).hexdigest())
+        first = await self.save(content, "pic.png")
+        second = await self.save(content, "pic.png")
+        
+        assert delete_media_file(first) is True
+        assert os.path.exists(blob_path)
+        assert get_full_file_path(second) is not None
+        
+        assert delete_media_file(second) is True
+        assert not os.path.exists(blob_path)
+    
+    @pytest.mark.asyncio
+    async def test_delete_goes_straight_to_blob(self, dedup, monkeypatch):
+        """Test that deleting from a large store neither scans .cas nor reads the file."""
+        from media_handling.service import delete_media_file, get_blob_path, get_full_file_path
+        import builtins
+        import hashlib
+        for i in range(50):
+            await self.save(f"other blob {i}".encode(), f"other{i}.pdf")
+        content = b"large lecture video"
+        blob_path = get_blob_path(hashlib.sha256(content).hexdigest())
+        media_path = await self.save(content, "lecture.mp4")
+        copy_path = await self.save(content, "lecture.mp4")
+        full_path = get_full_file_path(media_path)
+        
+        def no_scans(*args, **kwargs):
+            raise AssertionError("delete_media_file should not scan directories")
+        real_open = builtins.open
+        def no_media_reads(file, *args, **kwargs):
+            assert file != full_path, "delete_media_file should not open the file"
+            return real_open(file, *args, **kwargs)
+        with monkeypatch.context() as patched:
+            for name in ("scandir", "listdir", "walk"):
+                patched.setattr(os, name, no_scans)
+            patched.setattr(builtins, "open", no_media_reads)
+            assert delete_media_file(media_path) is True
+            assert os.path.exists(blob_path)
+            assert delete_media_file(copy_path) is True
+        
+        assert not os.path.exists(blob_path)
+        assert not any(name.endswith(".sha256") for name in os.listdir(os.path.dirname(full_path)))
+    
+    @pytest.mark.asyncio
+    async def test_collect_orphaned_blobs(self, dedup):
+        """Test that blobs whose files were removed directly are swept."""
+        from media_handling.service import collect_orphaned_blobs, get_full_file_path
+        media_path = await self.save(b"orphan")
+        os.remove(get_full_file_path(media_path))
+        
+        assert collect_orphaned_blobs() == 1
+        assert collect_orphaned_blobs() == 0
+
+
 class TestDeleteMediaFile:
     """Tests for deleting media files."""
     
@@ -0,0 +1,83 @@
+"""
+Tests for serving /media locally with cache headers and conditional/range requests.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from media_handling.static import MediaStaticFiles, media_cache_control
+
+UUID_NAME = "442b0fd2-30ee-4c26-9a04-f2f684c69c36.mp4"
+
+
+@pytest.fixture
+def media_client():
+    temp_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(temp_dir, "videos", "chat"))
+    os.makedirs(os.path.join(temp_dir, "photos", "profile"))
+    os.makedirs(os.path.join(temp_dir, ".cas", "ab"))
+    with open(os.path.join(temp_dir, "videos", "chat", UUID_NAME), "wb") as f:
+        f.write(bytes(range(256)) * 4)
+    with open(os.path.join(temp_dir, "photos", "profile", "default_photo.jpg"), "wb") as f:
+        f.write(b"default")
+    with open(os.path.join(temp_dir, ".cas", "ab", "abcdef"), "wb") as f:
+        f.write(b"blob")
+
+    app = FastAPI()
+    app.mount("/media", MediaStaticFiles(directory=temp_dir), name="media")
+    yield TestClient(app)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_cache_control_by_name():
+    """Test: uuid-named files are immutable, hand-managed files are not."""
+    assert "immutable" in media_cache_control(f"/media/videos/chat/{UUID_NAME}")
+    assert "immutable" in media_cache_control("/media/photos/profile/5_profile_442b0fd2-30ee-4c26-9a04-f2f684c69c36.jpg")
+    assert "immutable" not in media_cache_control("/media/photos/profile/default_photo.jpg")
+
+
+def test_uuid_file_served_immutable_with_etag(media_client):
+    """Test: uploads carry an immutable Cache-Control and an ETag."""
+    response = media_client.get(f"/media/videos/chat/{UUID_NAME}")
+
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["etag"]
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_if_none_match_returns_304(media_client):
+    """Test: revalidating with the ETag returns 304 without a body."""
+    etag = media_client.get(f"/media/videos/chat/{UUID_NAME}").headers["etag"]
+
+    response = media_client.get(f"/media/videos/chat/{UUID_NAME}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_range_request_returns_partial_content(media_client):
+    """Test: video seeking gets 206 with just the requested bytes."""
+    response = media_client.get(f"/media/videos/chat/{UUID_NAME}", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.content == bytes(range(10, 20))
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+
+
+def test_mutable_file_gets_short_max_age(media_client):
+    """Test: default_photo.jpg may be replaced, so it is not marked immutable."""
+    response = media_client.get("/media/photos/profile/default_photo.jpg")
+
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+
+
+def test_hidden_paths_not_served(media_client):
+    """Test: the blob store and other dot-paths are never served."""
+    assert media_client.get("/media/.cas/ab/abcdef").status_code == 404
@@ -0,0 +1,125 @@
+"""
+Tests for password hashing in the bounded process pool.
+"""
+import time
+from concurrent.futures import Future
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth import hashing
+from auth.services.auth_service import authenticate_user
+from main import app
+from search.database import get_db
+
+
+@pytest.fixture
+def cheap_argon2(monkeypatch):
+    """Inline hashing with low cost parameters so the tests stay fast."""
+    monkeypatch.setattr(hashing, "pwd_context", hashing.build_context(time_cost=1, memory_cost=1024, parallelism=1))
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 0)
+
+
+def test_hash_and_verify_inline(cheap_argon2):
+    password_hash = hashing.hash_password("s3cret")
+    assert password_hash.startswith("$argon2id$")
+    assert "m=1024,t=1,p=1" in password_hash
+    assert hashing.verify_password("s3cret", password_hash)
+    assert not hashing.verify_password("wrong", password_hash)
+    # malformed hashes from the database never match instead of raising
+    assert not hashing.verify_password("s3cret", "test_hash")
+
+
+def test_login_rehashes_outdated_hash(test_db, test_user, cheap_argon2, monkeypatch):
+    """Test: a successful login with old cost parameters stores a hash with the current ones."""
+    old_hash = hashing.build_context(time_cost=2, memory_cost=1024, parallelism=1).hash("s3cret")
+    test_user.password_hash = old_hash
+    test_db.commit()
+
+    assert authenticate_user(test_db, test_user.sfsu_email, "wrong") is None
+    test_db.refresh(test_user)
+    assert test_user.password_hash == old_hash
+
+    assert authenticate_user(test_db, test_user.sfsu_email, "s3cret").user_id == test_user.user_id
+    test_db.refresh(test_user)
+    assert "m=1024,t=1,p=1" in test_user.password_hash
+    assert not hashing.pwd_context.needs_update(test_user.password_hash)
+
+    # already current: nothing to rewrite
+    current_hash = test_user.password_hash
+    authenticate_user(test_db, test_user.sfsu_email, "s3cret")
+    assert test_user.password_hash == current_hash
+
+
+def test_saturated_pool_rejects_immediately(monkeypatch):
+    """Test: once workers + queue are taken, calls fail fast without touching the pool."""
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_MAX_QUEUE", 1)
+    monkeypatch.setattr(hashing, "_in_flight", 2)
+    monkeypatch.setattr(hashing, "_get_pool", lambda: pytest.fail("pool should not be used"))
+
+    with pytest.raises(hashing.HashingBusy):
+        hashing.verify_password("s3cret", "hash")
+    assert hashing._in_flight == 2
+
+
+def test_pool_round_trip(monkeypatch):
+    """Test: hashing runs in a worker process and the in-flight count is released."""
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setenv("ARGON2_MEMORY_COST", "1024")
+    monkeypatch.setenv("ARGON2_TIME_COST", "1")
+    try:
+        password_hash = hashing.hash_password("s3cret")
+        assert "m=1024,t=1" in password_hash  # parameters come from the worker's env
+        assert hashing.verify_password("s3cret", password_hash)
+    finally:
+        hashing.shutdown_hashing_pool()
+    # the slot is released by a done callback, which may run just after result() returns
+    deadline = time.monotonic() + 5
+    while hashing._in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hashing._in_flight == 0
+
+
+def test_timed_out_call_keeps_its_slot(monkeypatch):
+    """Test: a call that timed out still counts as in flight until its worker finishes."""
+    pending = Future()
+
+    class StuckPool:
+        def submit(self, fn, *args):
+            pending.set_running_or_notify_cancel()  # already in a worker, can't be cancelled
+            return pending
+
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_MAX_QUEUE", 0)
+    monkeypatch.setattr(hashing, "HASH_TIMEOUT_SECONDS", 0.01)
+    monkeypatch.setattr(hashing, "_get_pool", lambda: StuckPool())
+
+    with pytest.raises(hashing.HashingBusy, match="timed out"):
+        hashing.verify_password("s3cret", "hash")
+    assert hashing._in_flight == 1
+    with pytest.raises(hashing.HashingBusy, match="saturated"):
+        hashing.verify_password("s3cret", "hash")
+
+    pending.set_result(True)
+    assert hashing._in_flight == 0
+
+
+def test_login_returns_503_when_busy(test_db, test_user, monkeypatch):
+    def busy(password, password_hash):
+        raise hashing.HashingBusy("password hashing is saturated")
+
+    monkeypatch.setattr("auth.services.auth_service.verify_and_update", busy)
+
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        response = client.post("/api/login", json={"email": test_user.sfsu_email, "password": "whatever"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
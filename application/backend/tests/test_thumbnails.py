@@ -0,0 +1,145 @@
+"""
+Tests for server-side thumbnail generation.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+Image = pytest.importorskip("PIL.Image")
+
+from media_handling import service as media_service
+from media_handling import thumbnails
+from chat.services.chat_service import get_chat, send_message_with_media
+from media_handling.thumbnails import (
+    existing_thumbnail_path, generate_thumbnail, get_thumbnail_path, is_thumbnailable, shutdown_thumbnail_pool
+)
+from search.models.tutor_profile import TutorProfile
+from tutors.service import process_profile_image, update_tutor_profile_image
+
+
+@pytest.fixture
+def temp_media_root():
+    temp_dir = tempfile.mkdtemp()
+    original_media_root = media_service.MEDIA_ROOT
+    media_service.MEDIA_ROOT = temp_dir
+    yield temp_dir
+    media_service.MEDIA_ROOT = original_media_root
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def thumbnail_pool():
+    yield
+    shutdown_thumbnail_pool()
+
+
+def write_image(media_root, media_path, size=(800, 600), image_format="PNG"):
+    file_path = os.path.join(media_root, media_path[len("/media/"):])
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    Image.new("RGB", size, (200, 40, 40)).save(file_path, image_format)
+    return file_path
+
+
+def test_get_thumbnail_path():
+    """Test: thumbnails live in a thumbs/ subdirectory with a .jpg extension."""
+    assert get_thumbnail_path("/media/photos/chat/abc.png") == "/media/photos/chat/thumbs/abc.jpg"
+    assert get_thumbnail_path("/media/photos/chat/abc.png", ".webp") == "/media/photos/chat/thumbs/abc.webp"
+
+
+def test_is_thumbnailable():
+    """Test: only original images are thumbnailed."""
+    assert is_thumbnailable("/media/photos/chat/abc.png")
+    assert not is_thumbnailable("/media/photos/chat/thumbs/abc.jpg")
+    assert not is_thumbnailable("/media/pdfs/chat/abc.pdf")
+    assert not is_thumbnailable(None)
+
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_writes_square_jpeg_and_webp(temp_media_root, thumbnail_pool):
+    """Test: generate_thumbnail writes a cropped JPEG (and WebP) next to the original."""
+    write_image(temp_media_root, "/media/photos/chat/pic.png")
+
+    thumb_path = await generate_thumbnail("/media/photos/chat/pic.png")
+
+    assert thumb_path == "/media/photos/chat/thumbs/pic.jpg"
+    thumb_file = media_service.get_full_file_path(thumb_path)
+    assert thumb_file is not None
+    with Image.open(thumb_file) as thumb:
+        assert thumb.format == "JPEG"
+        assert thumb.size == (thumbnails.THUMB_SIZE, thumbnails.THUMB_SIZE)
+    if thumbnails.THUMB_WEBP:
+        assert os.path.exists(os.path.splitext(thumb_file)[0] + ".webp")
+
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_skips_missing_and_invalid(temp_media_root, thumbnail_pool):
+    """Test: missing files, non-images and undecodable files produce no thumbnail."""
+    assert await generate_thumbnail("/media/photos/chat/missing.png") is None
+    assert await generate_thumbnail("/media/pdfs/chat/doc.pdf") is None
+
+    broken = os.path.join(temp_media_root, "photos", "chat", "broken.png")
+    os.makedirs(os.path.dirname(broken), exist_ok=True)
+    with open(broken, "wb") as f:
+        f.write(b"not an image")
+    assert await generate_thumbnail("/media/photos/chat/broken.png") is None
+
+
+@pytest.mark.asyncio
+async def test_process_profile_image_updates_thumb_path(test_engine, test_db, test_tutor_user, temp_media_root, thumbnail_pool):
+    """Test: after the background stage the profile points at the generated thumbnail."""
+    media_path = f"/media/photos/profile/{test_tutor_user.user_id}_profile_x.png"
+    write_image(temp_media_root, media_path)
+    update_tutor_profile_image(test_db, test_tutor_user.user_id, media_path)
+
+    session_factory = sessionmaker(bind=test_engine)
+    thumb_path = await process_profile_image(test_tutor_user.user_id, media_path, session_factory)
+
+    test_db.expire_all()
+    profile = test_db.query(TutorProfile).filter(TutorProfile.tutor_id == test_tutor_user.user_id).first()
+    assert thumb_path == get_thumbnail_path(media_path)
+    assert profile.profile_image_path_full == media_path
+    assert profile.profile_image_path_thumb == thumb_path
+
+
+@pytest.mark.asyncio
+async def test_process_profile_image_ignores_superseded_upload(test_engine, test_db, test_tutor_user, temp_media_root, thumbnail_pool):
+    """Test: a thumbnail for an older upload does not overwrite a newer image."""
+    old_path = f"/media/photos/profile/{test_tutor_user.user_id}_profile_old.png"
+    new_path = f"/media/photos/profile/{test_tutor_user.user_id}_profile_new.png"
+    write_image(temp_media_root, old_path)
+    update_tutor_profile_image(test_db, test_tutor_user.user_id, new_path)
+
+    await process_profile_image(test_tutor_user.user_id, old_path, sessionmaker(bind=test_engine))
+
+    test_db.expire_all()
+    profile = test_db.query(TutorProfile).filter(TutorProfile.tutor_id == test_tutor_user.user_id).first()
+    assert profile.profile_image_path_thumb == new_path
+
+
+@pytest.mark.asyncio
+async def test_chat_history_returns_thumbnail_once_generated(test_db, test_user_a, test_user_b, temp_media_root, thumbnail_pool):
+    """Test: chat history carries thumbnail_path for images whose thumbnail exists."""
+    write_image(temp_media_root, "/media/photos/chat/pic.png")
+    send_message_with_media(test_db, test_user_a.user_id, test_user_b.user_id, "", "/media/photos/chat/pic.png", "image/png")
+
+    assert get_chat(test_db, test_user_a.user_id, test_user_b.user_id)[0]["thumbnail_path"] is None
+    await generate_thumbnail("/media/photos/chat/pic.png")
+    assert get_chat(test_db, test_user_a.user_id, test_user_b.user_id)[0]["thumbnail_path"] == \
+        "/media/photos/chat/thumbs/pic.jpg"
+
+
+@pytest.mark.asyncio
+async def test_delete_media_file_removes_thumbnails(temp_media_root, thumbnail_pool):
+    """Test: deleting an image also deletes its JPEG and WebP thumbnails."""
+    write_image(temp_media_root, "/media/photos/chat/pic.png")
+    await generate_thumbnail("/media/photos/chat/pic.png")
+    assert existing_thumbnail_path("/media/photos/chat/pic.png")
+
+    assert media_service.delete_media_file("/media/photos/chat/pic.png")
+
+    thumbs_dir = os.path.join(temp_media_root, "photos", "chat", "thumbs")
+    assert os.listdir(thumbs_dir) == []
+    assert existing_thumbnail_path("/media/photos/chat/pic.png") is None
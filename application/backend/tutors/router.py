@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, File, UploadFile
 from sqlalchemy.orm import Session
 from search.database import get_db
 from .schemas import (
@@ -9,8 +9,8 @@ from .schemas import (
     TutorLanguagesUpdate,
     TutorLanguagesResponse,
 )
-from .service import update_tutor_price, update_tutor_bio, update_tutor_languages, update_tutor_profile_image
-from media_handling.service import save_media_file
+from .service import update_tutor_price, update_tutor_bio, update_tutor_languages, update_tutor_profile_image, process_profile_image
+from media_handling.service import save_media_file, MediaTooLargeError
 
 router = APIRouter(prefix="/api/tutors", tags=["tutors"])
 
@@ -90,33 +90,30 @@ def update_tutor_languages_endpoint(
 @router.post("/{tutor_id}/profile-image")
 async def upload_profile_image_endpoint(
     tutor_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """
     Upload a profile image for a tutor.
     Accepts image files (jpg, png, gif, webp).
-    Returns the new profile image URL.
+    Returns the new profile image URL. The thumbnail path starts out as the
+    full image and is switched to a generated thumbnail once it is ready.
     """
     # Validate file type
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Validate file size (max 5MB)
+    # Max 5MB, enforced while the file is streamed to disk
     MAX_SIZE = 5 * 1024 * 1024  # 5MB
-    contents = await file.read()
-    if len(contents) > MAX_SIZE:
-        raise HTTPException(status_code=400, detail="Image must be less than 5MB")
-    
-    # Reset file position for save_media_file
-    await file.seek(0)
     
     try:
         # Save the file using media_handling service
-        media_path = await save_media_file(file, context="profile", user_id=tutor_id)
+        media_path = await save_media_file(file, context="profile", user_id=tutor_id, max_size=MAX_SIZE)
         
         # Update the tutor profile in database
         profile = update_tutor_profile_image(db, tutor_id, media_path)
+        background_tasks.add_task(process_profile_image, tutor_id, media_path)
         
         return {
             "tutor_id": profile.tutor_id,
@@ -128,6 +125,9 @@ async def upload_profile_image_endpoint(
     except HTTPException:
         raise
     
+    except MediaTooLargeError:
+        raise HTTPException(status_code=400, detail="Image must be less than 5MB")
+    
     except Exception as error:
         print(f"Profile image upload error: {error}")
         raise HTTPException(status_code=500, detail="Failed to upload profile image")
\ No newline at end of file
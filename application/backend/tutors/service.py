@@ -1,44 +1,48 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Optional, List
+from search.database import SessionLocal
 from search.models.tutor_profile import TutorProfile
+from media_handling.thumbnails import generate_thumbnail
+from auth.identity_cache import TutorProfileSummary, identity_cache, load_tutor_profile
 
-def update_tutor_price(db: Session, tutor_id: int, hourly_rate_cents: int) -> TutorProfile:
-  
-    if hourly_rate_cents < 0:
-        raise ValueError("hourly rate must be positive")
 
-    profile = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
+def _update_profile(db: Session, tutor_id: int, **values) -> TutorProfileSummary:
+    """
+    Apply values to a tutor profile with one UPDATE and return the new summary,
+    re-selected from the database. Writes never read through the identity
+    cache, so the result cannot echo stale cached fields.
+    """
+    updated = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+    identity_cache.invalidate_tutor_profile(tutor_id)
+    profile = load_tutor_profile(db, tutor_id) if updated else None
     if not profile:
         raise HTTPException(status_code=404, detail="tutor profile not found")
-
-    profile.hourly_rate_cents = hourly_rate_cents
-    db.commit()
-    db.refresh(profile)
     return profile
 
-def update_tutor_bio(db: Session, tutor_id: int, bio: Optional[str]) -> TutorProfile:
+
+def update_tutor_price(db: Session, tutor_id: int, hourly_rate_cents: int) -> TutorProfileSummary:
+  
+    if hourly_rate_cents < 0:
+        raise ValueError("hourly rate must be positive")
+
+    return _update_profile(db, tutor_id, hourly_rate_cents=hourly_rate_cents)
+
+def update_tutor_bio(db: Session, tutor_id: int, bio: Optional[str]) -> TutorProfileSummary:
  
     if bio is not None and len(bio) > 250:
         raise ValueError("bio must be 250 characters or less")
 
-    profile = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="tutor profile not found")
-
-    profile.bio = bio
-    db.commit()
-    db.refresh(profile)
-    return profile
+    return _update_profile(db, tutor_id, bio=bio)
 
-def update_tutor_languages(db: Session, tutor_id: int, languages: Optional[List[str]]) -> TutorProfile:
-    
-    profile = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="tutor profile not found")
+def update_tutor_languages(db: Session, tutor_id: int, languages: Optional[List[str]]) -> TutorProfileSummary:
 
     if languages is None:
-        profile.languages = None
+        languages_str = None
     else:
         if not languages:
             raise ValueError("language not provided")
@@ -50,26 +54,48 @@ def update_tutor_languages(db: Session, tutor_id: int, languages: Optional[List[
         if len(languages_str) > 250:
             raise ValueError("languages must be 250 characters or less")
 
-        profile.languages = languages_str
-
-    db.commit()
-    db.refresh(profile)
-    return profile
+    return _update_profile(db, tutor_id, languages=languages_str)
 
 def update_tutor_profile_image(
     db: Session, 
     tutor_id: int, 
     image_path_full: str,
     image_path_thumb: Optional[str] = None
-) -> TutorProfile:
+) -> TutorProfileSummary:
     """Update tutor profile image paths in the database."""
-    profile = db.query(TutorProfile).filter(TutorProfile.tutor_id == tutor_id).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="tutor profile not found")
+    return _update_profile(
+        db,
+        tutor_id,
+        profile_image_path_full=image_path_full,
+        profile_image_path_thumb=image_path_thumb or image_path_full
+    )
 
-    profile.profile_image_path_full = image_path_full
-    profile.profile_image_path_thumb = image_path_thumb or image_path_full
-    
+def update_tutor_profile_thumbnail(db: Session, tutor_id: int, image_path_full: str, image_path_thumb: str) -> bool:
+    """Set the thumbnail path, unless the tutor has uploaded a newer image since."""
+    updated = db.query(TutorProfile).filter(
+        TutorProfile.tutor_id == tutor_id,
+        TutorProfile.profile_image_path_full == image_path_full
+    ).update({"profile_image_path_thumb": image_path_thumb}, synchronize_session=False)
     db.commit()
-    db.refresh(profile)
-    return profile
\ No newline at end of file
+    identity_cache.invalidate_tutor_profile(tutor_id)
+    return updated > 0
+
+async def process_profile_image(
+    tutor_id: int,
+    image_path_full: str,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Optional[str]:
+    """Background stage after a profile upload: build the thumbnail and store its path."""
+    image_path_thumb = await generate_thumbnail(image_path_full)
+    if not image_path_thumb:
+        return None
+
+    def store():
+        db = session_factory()
+        try:
+            return update_tutor_profile_thumbnail(db, tutor_id, image_path_full, image_path_thumb)
+        finally:
+            db.close()
+
+    await run_in_threadpool(store)
+    return image_path_thumb
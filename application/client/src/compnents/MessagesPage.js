@@ -9,6 +9,12 @@ import { getMediaUrl } from '../media_handling';
 const CHAT_API_BASE = process.env.REACT_APP_API_URL ||
   (window.location.hostname === 'localhost' ? 'http://localhost:8000' : `http://${window.location.hostname}`);
 
+// Signed session token from login; the backend falls back to ?user_id= without it
+const authHeaders = () => {
+  const token = localStorage.getItem('authToken');
+  return token ? { Authorization: `Bearer ${token}` } : {};
+};
+
 const userCache = {};
 
 const fetchUserInfo = async (userId) => {
@@ -203,6 +209,13 @@ const MessagesPage = () => {
 
       wsRef.current.onmessage = (event) => {
         const data = JSON.parse(event.data);
+        if (data.type === 'ping') {
+          // heartbeat: the server reaps sockets that stop answering
+          wsRef.current?.send(JSON.stringify({ type: 'pong' }));
+          return;
+        }
+        // read receipts, typing and unread-count frames are not chat messages
+        if (data.type && data.type !== 'message') return;
         if (data.sender_id === selectedPartnerId || data.receiver_id === selectedPartnerId) {
           setMessages(prev => {
             const exists = prev.some(m => m.message_id === data.message_id);
@@ -400,6 +413,7 @@ const MessagesPage = () => {
 
         const response = await fetch(`${CHAT_API_BASE}/api/chat/send-media?user_id=${currentUserId}`, {
           method: 'POST',
+          headers: authHeaders(),
           body: formData,
         });
 
@@ -444,6 +458,7 @@ const MessagesPage = () => {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
+              ...authHeaders(),
             },
             body: JSON.stringify({
               receiver_id: selectedPartnerId,
@@ -498,9 +513,11 @@ const MessagesPage = () => {
     const mediaUrl = getMediaUrl(message.media_path);
 
     if (message.media_type?.startsWith('image/')) {
+      // the thumbnail is null until the server has generated it
+      const previewUrl = message.thumbnail_path ? getMediaUrl(message.thumbnail_path) : mediaUrl;
       return (
         <img
-          src={mediaUrl}
+          src={previewUrl}
           alt="Shared"
           style={styles.mediaImage}
           onClick={() => window.open(mediaUrl, '_blank')}
@@ -1174,8 +1174,36 @@ export default function SearchPage() {
   const [aiResponse, setAiResponse] = useState(null);
   const [aiLoading, setAiLoading] = useState(false);
   const [aiError, setAiError] = useState(null);
+  const [aiStatus, setAiStatus] = useState(null);
+
+  // Apply one server-sent event from /api/ai/query/stream
+  const handleAiStreamEvent = (event, data) => {
+    if (event === 'status') {
+      setAiStatus(data.message);
+    } else if (event === 'query') {
+      setAiStatus('Searching the database...');
+    } else if (event === 'query_result') {
+      setAiStatus(data.success ? `Found ${data.row_count} results, writing answer...` : 'Retrying the search...');
+    } else if (event === 'token') {
+      setAiLoading(false);
+      setAiResponse(prev => ({ ...(prev || {}), response: ((prev && prev.response) || '') + data.text }));
+    } else if (event === 'answer_reset') {
+      setAiLoading(true);
+      setAiResponse(null);
+    } else if (event === 'done') {
+      if (data.success) {
+        // Extract tutor data from query results if available
+        const tutorData = extractTutorDataFromAI(data);
+        console.log('[AI] Tutor data extracted:', tutorData);
+        setAiResponse({ ...data, tutorCards: tutorData });
+      } else {
+        setAiResponse(null);
+        setAiError(data.error || 'AI query failed');
+      }
+    }
+  };
 
-  // Handle AI Query
+  // Handle AI Query (streamed: progress events, then the answer as it is written)
   const handleAskAi = async () => {
     if (!searchQuery.trim()) {
       setAiError('Please enter a question to ask AI');
@@ -1186,6 +1214,7 @@ export default function SearchPage() {
     setAiLoading(true);
     setAiError(null);
     setAiResponse(null);
+    setAiStatus(null);
 
     try {
       const apiBaseUrl = process.env.REACT_APP_API_URL || '';
@@ -1197,7 +1226,7 @@ export default function SearchPage() {
         user_role: user?.role || null
       };
 
-      const response = await fetch(`${apiBaseUrl}/api/ai/query`, {
+      const response = await fetch(`${apiBaseUrl}/api/ai/query/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -1205,21 +1234,37 @@ export default function SearchPage() {
         body: JSON.stringify(requestBody)
       });
 
-      const data = await response.json();
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        setAiError(data.detail || 'AI query failed');
+        return;
+      }
 
-      if (data.success) {
-        // Extract tutor data from query results if available
-        const tutorData = extractTutorDataFromAI(data);
-        console.log('[AI] Tutor data extracted:', tutorData);
-        setAiResponse({ ...data, tutorCards: tutorData });
-      } else {
-        setAiError(data.error || 'AI query failed');
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+          let event = 'message';
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          }
+          if (data) handleAiStreamEvent(event, JSON.parse(data));
+        }
       }
     } catch (err) {
       console.error('AI Query error:', err);
       setAiError('Failed to connect to AI service');
     } finally {
       setAiLoading(false);
+      setAiStatus(null);
     }
   };
 
@@ -2097,7 +2142,7 @@ export default function SearchPage() {
                           borderRadius: '50%',
                           animation: 'spin 1s linear infinite'
                         }}></div>
-                        <p style={{ color: darkMode ? '#aaa' : '#666', margin: 0 }}>Asking Gator...</p>
+                        <p style={{ color: darkMode ? '#aaa' : '#666', margin: 0 }}>{aiStatus || 'Asking Gator...'}</p>
                         <style>{`@keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }`}</style>
                       </div>
                     )}